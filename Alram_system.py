@@ -1,25 +1,38 @@
-from machine import Pin, SPI
-from time import sleep
-from lora import LoRa
-
-lora = LoRa(spi=SPI(1), cs=Pin(18), reset=Pin(14), irq=Pin(26))
-
-buzzer = Pin(15, Pin.OUT)
-led_alarm = Pin(2, Pin.OUT)
-
-
-stumps = {f"x{i}": "active" for i in range(1, 6)}
+import hal
+from lora_receiver import LoRaReceiver, PacketDispatcher, PacketRing
+from lora_uplink import LoRaUplink
+from metrics import NULL_REGISTRY, JsonSnapshots, Registry, perf_counter
+from stump_state import StumpStateTable
+from pin_pattern import PinPattern
+
+# Radio, alarm pins and uplink, created by setup() through the hardware abstraction layer
+lora_irq = lora = alarm_pattern = uplink = receiver = None
+
+stumps = StumpStateTable(f"x{i}" for i in range(1, 6))  # Reads and assigns like the old dict of state strings
+
+# Metrics are off unless ALAIDS_METRICS names a JSON snapshot file; NULL_REGISTRY makes every update an empty call
+try:
+    from os import environ
+    METRICS_PATH = environ.get("ALAIDS_METRICS")
+except ImportError:  # MicroPython has no environment; set a path here to enable metrics
+    METRICS_PATH = None
+
+metrics = Registry() if METRICS_PATH else NULL_REGISTRY
+metrics_file = None
+if METRICS_PATH:
+    metrics_file = JsonSnapshots(metrics, METRICS_PATH, interval=300)  # Infrequent writes spare the flash
+alerts_total = metrics.counter("alerts_total", "ALERT packets received")
+alarms_total = metrics.counter("alarms_total", "Base camp alarms started")
+alert_time = metrics.histogram("alert_handling_seconds", "ALERT packet dispatch to alarm pattern started")
+uplink_bytes = metrics.counter("uplink_bytes_total", "Bytes put on air by the coalesced uplink")
+metrics.gauge("alarms_sounding", "Stumps with an alarm raised", fn=stumps.alarm_count)
 
 
 def trigger_alarm(stump):
-        print(f"ALERT from {stump}: Activating Base Camp Alarm!")
-    for _ in range(5):
-        buzzer.on()
-        led_alarm.on()
-        sleep(0.5)
-        buzzer.off()
-        led_alarm.off()
-        sleep(0.5)
+    print(f"ALERT from {stump}: Activating Base Camp Alarm!")
+    alarms_total.inc()
+    stumps.set_alarm(stump)
+    alarm_pattern.start(repeats=5)
 
 
 def destroy_stump(stump):
@@ -27,7 +40,7 @@ def destroy_stump(stump):
     if stump in stumps and stumps[stump] != "destroyed":
         stumps[stump] = "destroyed"
         print(f"Stump {stump} is DESTROYED! Alerting all other stumps...")
-        lora.send(f"DESTROY {stump}")
+        uplink.queue_event("DESTROY", stump)
     else:
         print(f"Stump {stump} already destroyed or invalid!")
 
@@ -37,7 +50,7 @@ def manually_turn_off_stump(stump):
     if stump in stumps and stumps[stump] == "active":
         stumps[stump] = "off"
         print(f"Stump {stump} turned OFF!")
-        lora.send(f"OFF {stump}")
+        uplink.queue_event("OFF", stump)
     else:
         print(f"Stump {stump} is already OFF or not active!")
 
@@ -47,7 +60,7 @@ def restore_stump(stump):
     if stump in stumps and stumps[stump] != "active":
         stumps[stump] = "active"
         print(f"Stump {stump} RESTORED to active mode!")
-        lora.send(f"RESTORE {stump}")
+        uplink.queue_event("RESTORE", stump)
     else:
         print(f"Stump {stump} is already active or invalid!")
 
@@ -55,22 +68,64 @@ def restore_stump(stump):
 def alarm_off(stump):
     """Turns off the alarm system for a specific stump"""
     print(f"Alarm OFF for {stump}")
-    buzzer.off()
-    led_alarm.off()
-    lora.send(f"ALARM_OFF {stump}")
+    if stump in stumps:
+        stumps.set_alarm(stump, False)
+    alarm_pattern.stop()
+    uplink.queue_event("ALARM_OFF", stump)
+
+
+def handle_alert(packet):
+    start = perf_counter()
+    alerts_total.inc()
+    stump = packet.decode("utf-8").strip().split()[-1]
+    if stumps.get(stump) == "active":
+        trigger_alarm(stump)
+        alert_time.observe_since(start)
+
+
+def handle_status(packet):
+    uplink.queue_status(stumps)
+
+
+def handle_ack(packet):
+    uplink.acknowledge(int(packet.decode("utf-8").strip().split()[-1]))
+
+
+def send_replies():
+    """Answers STATUS requests from the receive path; the requests dispatched together share one report"""
+    if uplink.status is not None:
+        uplink_bytes.inc(uplink.flush())
+
+
+# Packets are received on the radio interrupt and dispatched as they arrive, even while input() blocks
+dispatcher = PacketDispatcher(PacketRing(capacity=16))
+dispatcher.on(b"ALERT", handle_alert, prefix=False)
+dispatcher.on(b"STATUS", handle_status)
+dispatcher.on(b"ACK", handle_ack)
+metrics.gauge("lora_interrupts", "Radio interrupts taken", fn=lambda: receiver.interrupts)
+metrics.gauge("packets_dropped", "Packets lost to a full receive ring", fn=lambda: dispatcher.ring.dropped)
+metrics.gauge("packets_unhandled", "Packets no handler matched", fn=lambda: dispatcher.unhandled)
+
+
+def setup():
+    """Creates the radio, alarm pins and timer; nothing touches hardware before this runs"""
+    global lora_irq, lora, alarm_pattern, uplink, receiver
+    lora_irq = hal.pin(26, hal.IN)
+    lora = hal.lora(hal.spi(1), cs=hal.pin(18, hal.OUT), reset=hal.pin(14, hal.OUT), irq=lora_irq)
+    buzzer = hal.pin(15, hal.OUT)
+    led_alarm = hal.pin(2, hal.OUT)
+    alarm_pattern = PinPattern([buzzer, led_alarm], on_ms=500, off_ms=500)  # Advanced by a timer, never blocks
+    hal.periodic(0, 50, alarm_pattern.tick)
+    uplink = LoRaUplink(lora, len(stumps))  # Coalesced, binary outbound messages
+    receiver = LoRaReceiver(lora, lora_irq, dispatcher.ring, dispatcher, replies=send_replies)
 
 
 def check_stump_status():
-    """Receives messages and responds accordingly"""
-    msg = lora.receive()
-    if msg:
-        msg = msg.decode("utf-8").strip()
-        if "ALERT" in msg:
-            stump = msg.split()[-1]
-            if stumps.get(stump) == "active":
-                trigger_alarm(stump)
-        elif msg.startswith("STATUS"):
-            lora.send(f"STATUS_REPORT {stumps}")
+    """Handles anything the interrupt path has not dispatched yet and flushes due uplink messages"""
+    receiver.service()
+    uplink_bytes.inc(receiver.exclusive(uplink.poll))  # No packet is read from the radio mid-send
+    if metrics_file is not None:
+        metrics_file.poll()
 
 
 # Main loop to manage commands
@@ -79,6 +134,7 @@ def run_system():
     while True:
         check_stump_status()
         print(f"\nStump Status: {stumps}")
+        uplink_bytes.inc(receiver.exclusive(uplink.flush))  # Nothing queued may wait while the console blocks
 
         user_input = input(
             "Enter 'destroy x#', 'off x#', 'restore x#', 'alarm_off x#', or 'exit': ").strip().lower()
@@ -103,4 +159,6 @@ def run_system():
 
 
 # Run the system
-run_system()
+if __name__ == "__main__":
+    setup()
+    run_system()
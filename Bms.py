@@ -1,42 +1,73 @@
 import time
-import random
-from machine import Pin, ADC, PWM
+
+import hal
+from adc_pipeline import AdcPipeline
+from detection_rules import BMS_INTRUSION, BMS_RULES
+from duty_cycle import DutyCycleScheduler
+from rule_table import RuleTable
 
 # Power Management Configurations
 BATTERY_VOLTAGE = 12.6  # 3S Li-ion Battery
 MAX_CURRENT = 2.5  # A
 LOW_BATTERY_THRESHOLD = 20  # Percentage
+ADC_FULL_SCALE = 4095
 
 # Sensor & Module Configurations
-LASER_TRANSMITTERS = [Pin(i, Pin.OUT) for i in range(3)]  # 3 Laser Transmitters
-LASER_RECEIVERS = [Pin(i + 3, Pin.IN) for i in range(3)]  # 3 Laser Receivers
-SENSORS = [ADC(Pin(i + 6)) for i in range(4)]  # 4 Additional Sensors
+LASER_COUNT = 3  # Laser transmitters on pins 0-2, receivers on pins 3-5
+SENSOR_COUNT = 4  # Additional ADC sensors on pins 6-9
+BATTERY_PIN = 10  # BMS Communication: battery voltage monitoring
+ALARM_PIN = 12
+
+# Hardware, created by setup() through the hardware abstraction layer
+LASER_TRANSMITTERS = LASER_RECEIVERS = SENSORS = BATTERY_ADC = ALARM = ADCS = None
+
+# Intrusion thresholds, compiled once into straight-line compare code
+INTRUSION_TABLE = RuleTable(*BMS_RULES)
+SAMPLE = [0] * (LASER_COUNT + SENSOR_COUNT)  # Reused every scan: receivers, then sensors
 
-# BMS Communication
-BATTERY_ADC = ADC(Pin(10))  # Battery voltage monitoring
+# Oversampled, filtered ADC acquisition: channel 0 is the battery, then the sensors
+BATTERY_CHANNEL = 0
+SENSOR_NOISE_LIMIT = 200  # ADC counts; a noisier sensor is reported as faulty
+NOISY = bytearray(SENSOR_COUNT)  # Sensors currently reported as noisy
 
-# Alarm System
-ALARM = Pin(12, Pin.OUT)
+# Loop cadence: 1 s normally, 0.2 s after a detection, up to 5 s when quiet on a low battery
+DUTY = DutyCycleScheduler(["stump"], min_interval=0.2, nominal_interval=1.0, max_interval=5.0,
+                          backoff_after=60.0, battery_low=LOW_BATTERY_THRESHOLD)
+
+def setup():
+    """Creates the pins and the ADC pipeline; nothing touches hardware before this runs"""
+    global LASER_TRANSMITTERS, LASER_RECEIVERS, SENSORS, BATTERY_ADC, ALARM, ADCS
+    LASER_TRANSMITTERS = [hal.pin(i, hal.OUT) for i in range(LASER_COUNT)]
+    LASER_RECEIVERS = [hal.pin(i + LASER_COUNT, hal.IN) for i in range(LASER_COUNT)]
+    SENSORS = [hal.adc(i + 2 * LASER_COUNT) for i in range(SENSOR_COUNT)]
+    BATTERY_ADC = hal.adc(BATTERY_PIN)
+    ALARM = hal.pin(ALARM_PIN, hal.OUT)
+    ADCS = AdcPipeline([BATTERY_ADC] + SENSORS, burst=8, smoothing=2, method="median")
 
 def check_battery():
-    battery_level = (BATTERY_ADC.read() / 4095.0) * BATTERY_VOLTAGE
+    battery_level = (ADCS.value(BATTERY_CHANNEL) / ADC_FULL_SCALE) * BATTERY_VOLTAGE  # Filtered, not one raw read
     battery_percentage = (battery_level / BATTERY_VOLTAGE) * 100
     if battery_percentage < LOW_BATTERY_THRESHOLD:
-        send_alert("Battery Low: {:.2f}%".format(battery_percentage))
+        noise = ADCS.noise(BATTERY_CHANNEL) / ADC_FULL_SCALE * 100
+        send_alert("Battery Low: {:.2f}% (noise {:.2f}%)".format(battery_percentage, noise))
     return battery_percentage
 
 def send_alert(message):
     print("[ALERT]:", message)  # Replace with actual communication to base
 
 def detect_intrusion():
-    for receiver in LASER_RECEIVERS:
-        if receiver.value() == 0:  # Laser beam interrupted
-            trigger_alarm()
-            return True
-    for sensor in SENSORS:
-        if sensor.read() > 2000:  # Threshold detection for sensors
-            trigger_alarm()
-            return True
+    for i, receiver in enumerate(LASER_RECEIVERS):
+        SAMPLE[i] = receiver.value()  # 0 when the laser beam is interrupted
+    for i in range(SENSOR_COUNT):
+        SAMPLE[LASER_COUNT + i] = ADCS.counts(i + 1)  # Filtered burst value
+        noisy = ADCS.noise(i + 1) > SENSOR_NOISE_LIMIT
+        if noisy != NOISY[i]:
+            NOISY[i] = noisy
+            if noisy:
+                send_alert("Sensor {} noisy: {:.0f} counts".format(i + 1, ADCS.noise(i + 1)))
+    if INTRUSION_TABLE.code(SAMPLE) == BMS_INTRUSION:  # Thresholds live in detection_rules.py
+        trigger_alarm()
+        return True
     return False
 
 def trigger_alarm():
@@ -45,9 +76,18 @@ def trigger_alarm():
     time.sleep(5)
     ALARM.value(0)
 
-while True:
-    battery_status = check_battery()
-    print("Battery Level: {:.2f}%".format(battery_status))
-    if detect_intrusion():
-        print("Intrusion Detected")
-    time.sleep(1)  # Delay for stability
+def main():
+    setup()
+    while True:
+        ADCS.sample()  # One burst per channel feeds both checks
+        battery_status = check_battery()
+        print("Battery Level: {:.2f}%".format(battery_status))
+        DUTY.set_battery(battery_status)
+        if detect_intrusion():
+            print("Intrusion Detected")
+            DUTY.detected("stump")
+        DUTY.due()
+        time.sleep(DUTY.next_delay())  # Adaptive delay instead of a fixed 1 s
+
+if __name__ == "__main__":
+    main()
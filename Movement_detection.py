@@ -1,81 +1,115 @@
-import serial
-import time
 import threading
+import time
+
+import hal
+from alarm_scheduler import AlarmScheduler, PrintSink
+from classifier import LABELS, classify_intrusion
+from duty_cycle import DutyCycleScheduler
+from esp32_link import ESP32Link
+from event_journal import ALARM, CLASSIFICATION, NullJournal
+from gateway_pool import GatewayPool
+from intrusion_fusion import RAISED, CLEARED, FusionTracker
+from metrics import NULL_REGISTRY, perf_counter
+from sensor_history import SensorHistory
+from stump_state import StumpStateTable
 
 
 class StumpSensorNetwork:
-    def __init__(self, port, baud_rate=115200, stump_count=4):
-        self.ser = serial.Serial(port, baud_rate, timeout=1)  # ESP32 Serial Connection
-        self.stump_count = stump_count
-        self.stumps = {f"x{i + 1}": True for i in range(stump_count)}  # Stump connection status
-        self.sensor_data = {f"x{i + 1}": {"Laser": 1, "Photodiode": 1, "PIR": 1, "Radar": 1, "Seismic": 1} for i in
-                            range(stump_count)}
-        self.alarm_active = False
+    def __init__(self, port, baud_rate=115200, stump_count=4, link=None, journal=None, metrics=None,
+                 min_interval=0.5, nominal_interval=5.0, max_interval=30.0):
+        if link is not None:  # Already-open gateway or a journal replay (event_journal.ReplayLink)
+            self.link = link
+            stump_names = link.stumps
+        elif isinstance(port, dict):  # {port: [stumps]}: one ESP32 gateway per shard, polled concurrently
+            self.link = GatewayPool.open(port, baud_rate)
+            stump_names = self.link.stumps
+        else:
+            self.ser = hal.open_serial(port, baud_rate, timeout=1)  # ESP32 Serial Connection
+            self.link = ESP32Link(self.ser)
+            stump_names = [f"x{i + 1}" for i in range(stump_count)]
+        self.stump_count = len(stump_names)
+        self.stumps = StumpStateTable(stump_names)  # State and alarm flag per stump
+        self.sensor_data = SensorHistory(self.stumps)  # Latest reading plus fixed-size history per stump
+        self.alarms = AlarmScheduler(PrintSink()).start()  # One thread sounds every stump's alarm
+        self.fusion = FusionTracker(self.stumps)  # One alarm per confirmed intrusion, not per noisy sample
+        # Quiet stumps back off towards max_interval on a low battery, active ones burst at min_interval
+        self.duty = DutyCycleScheduler(self.stumps, min_interval=min_interval, nominal_interval=nominal_interval,
+                                       max_interval=max_interval)
+        self.journal = NullJournal() if journal is None else journal  # EventJournal to persist readings and events
+        self.metrics = NULL_REGISTRY if metrics is None else metrics  # metrics.Registry to enable instrumentation
+        self._register_metrics()
+        self.suspected = {}  # stump -> perf_counter() of the sweep that first saw evidence, for detection latency
+
+    def _register_metrics(self):
+        m = self.metrics
+        self.command_time = m.histogram("esp32_command_seconds", "Serial round trip of one ESP32 command")
+        self.read_time = m.histogram("sweep_read_seconds", "READALL round trip of one sweep")
+        self.sweep_time = m.histogram("sweep_seconds", "Duration of one check_stump_status sweep")
+        self.alarm_latency = m.histogram("detection_to_alarm_seconds", "First suspicious sample to alarm")
+        self.readings_total = m.counter("readings_total", "Stump readings received")
+        self.alarms_total = m.counter("alarms_total", "Alarms triggered")
+        m.gauge("alarms_sounding", "Alarms currently sounding", fn=lambda: len(self.alarms))
+        m.gauge("threads_alive", "Threads in the process (alarms share one scheduler thread)",
+                fn=threading.active_count)
 
     def send_command(self, command):
         """Sends a command to ESP32 and reads response"""
-        self.ser.write(command.encode())
-        time.sleep(0.5)
-        response = self.ser.readline().decode().strip()
+        start = perf_counter()
+        response = self.link.send_command(command)
+        self.command_time.observe_since(start)
         return response
 
     def classify_intrusion(self, sensor_data):
         """Classifies whether it's a human, animal, or vehicle intrusion"""
-        laser = sensor_data["Laser"]
-        photodiode = sensor_data["Photodiode"]
-        pir = sensor_data["PIR"]
-        radar = sensor_data["Radar"]
-        seismic = sensor_data["Seismic"]
-
-        if pir == 1 and 0.5 <= radar <= 1.5 and seismic > 3:
-            return "Human Detected"
-        elif pir == 1 and radar > 1.5 and seismic <= 3:
-            return "Animal Detected"
-        elif pir == 1 and radar > 3 and seismic > 5:
-            return "Vehicle Detected"
-        elif pir == 0 and radar == 0 and seismic < 2:
-            return "False Alarm (Wind/Insects)"
-        else:
-            return "Unknown Intrusion"
+        return classify_intrusion(sensor_data)  # Rules live in classifier.py, shared with classify_batch
 
     def check_stump_status(self):
         """Reads sensor data from ESP32 and classifies movement"""
-        for stump in self.stumps:
-            response = self.send_command(f"READ {stump}")
-            if response:
-                laser, photodiode, pir, radar, seismic = map(int, response.split(","))
-                self.sensor_data[stump] = {
-                    "Laser": laser,
-                    "Photodiode": photodiode,
-                    "PIR": pir,
-                    "Radar": radar,
-                    "Seismic": seismic
-                }
+        due = self.duty.due()
+        if not due:
+            return
+        start = perf_counter()
+        updated = self.link.read_stumps(due, self.sensor_data)  # One framed round trip for every due stump
+        self.read_time.observe_since(start)
+        self.readings_total.inc(len(updated))
+        self.journal.record_readings(updated, self.sensor_data)
+        for stump in updated:
+            event = self.fusion.update(stump, self.sensor_data[stump])
+            if not self.fusion.is_confirmed(stump) and self.stumps.is_active(stump):  # Alarmed or offline: no burst
+                if self.fusion.evidence(stump):
+                    self.duty.detected(stump)
+                    self.suspected.setdefault(stump, start)
+                elif stump in self.suspected:
+                    del self.suspected[stump]
+            if event == RAISED:
                 classification = self.classify_intrusion(self.sensor_data[stump])
+                if classification == "False Alarm (Wind/Insects)":
+                    classification = "Unknown Intrusion"  # Confirmed by the beam alone, no motion signature
                 print(f"{stump}: {classification}")
-
-                if classification != "False Alarm (Wind/Insects)":
-                    self.trigger_alarm(stump, classification)
+                self.journal.record(CLASSIFICATION, stump, LABELS.index(classification))
+                self.trigger_alarm(stump, classification)
+            elif event == CLEARED:
+                print(f"{stump}: Intrusion cleared")
+        self.sweep_time.observe_since(start)
 
     def trigger_alarm(self, stump, classification):
         """Triggers alarm for all intrusions except false alarms"""
+        self.alarms_total.inc()
+        detected = self.suspected.pop(stump, None)
+        if detected is not None:
+            self.alarm_latency.observe_since(detected)
         print(f"ALARM TRIGGERED! {classification} detected at {stump}!")
-        self.alarm_active = True
-        threading.Thread(target=self.sound_alarm).start()
-
-    def sound_alarm(self):
-        """Simulates alarm sound"""
-        for _ in range(10):
-            print("DANGER ALARM SOUNDING!")
-            time.sleep(1)
-        print("Alarm stopped.")
+        self.stumps.set_alarm(stump)
+        self.alarms.trigger(stump, duration=10)
+        self.journal.record(ALARM, stump, LABELS.index(classification))  # Already-sounding alarms are not stacked
 
     def run(self):
         """Continuously monitors the sensor network"""
         while True:
             self.check_stump_status()
-            time.sleep(5)
+            time.sleep(self.duty.next_delay())
 
 
-network = StumpSensorNetwork(port="COM3")
-network.run()
+if __name__ == "__main__":
+    network = StumpSensorNetwork(port="COM3")
+    network.run()
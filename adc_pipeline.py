@@ -0,0 +1,81 @@
+from array import array
+
+SCALE_BITS = 8  # Filter state is fixed point, 1/256 of an ADC count
+
+
+def insertion_sort(buf):
+    """Sorts a short array in place without allocating (bursts are a handful of samples)"""
+    for i in range(1, len(buf)):
+        v = buf[i]
+        j = i - 1
+        while j >= 0 and buf[j] > v:
+            buf[j + 1] = buf[j]
+            j -= 1
+        buf[j + 1] = v
+
+
+class AdcPipeline:
+    """Oversampled, filtered acquisition for a set of ADC channels.
+
+    Each sample() reads a burst of `burst` values per channel into a
+    preallocated array and reduces it to its mean (oversampling) or median
+    (rejects spikes).  That feeds a first-order IIR filter with weight
+    1/2**smoothing.  The burst's mean absolute deviation is smoothed the
+    same way as the channel's noise estimate.  Only integer fixed-point
+    arithmetic is used, so the pipeline runs unchanged on MicroPython.
+    """
+
+    def __init__(self, adcs, burst=8, smoothing=2, method="median"):
+        if method not in ("mean", "median"):
+            raise ValueError(f"Unknown ADC filter method {method!r}")
+        self.adcs = list(adcs)
+        self.burst = burst
+        self.smoothing = smoothing
+        self.median = method == "median"
+        self.buffers = [array("H", bytes(2 * burst)) for _ in self.adcs]
+        self.level = array("l", [0] * len(self.adcs))  # Filtered value per channel
+        self.spread = array("l", [0] * len(self.adcs))  # Filtered mean absolute deviation per channel
+        self.primed = False
+
+    def sample(self):
+        """Takes one burst on every channel and updates the filters"""
+        for ch in range(len(self.adcs)):
+            center, deviation = self._burst(ch)
+            if self.primed:
+                self.level[ch] += (center - self.level[ch]) >> self.smoothing
+                self.spread[ch] += (deviation - self.spread[ch]) >> self.smoothing
+            else:  # Start from the first burst instead of ramping up from 0
+                self.level[ch] = center
+                self.spread[ch] = deviation
+        self.primed = True
+
+    def _burst(self, ch):
+        """(center, mean absolute deviation) of one fresh burst, both fixed point"""
+        buf = self.buffers[ch]
+        read = self.adcs[ch].read
+        total = 0
+        for i in range(self.burst):
+            v = read()
+            buf[i] = v
+            total += v
+        if self.median:
+            insertion_sort(buf)
+            center = buf[self.burst >> 1] << SCALE_BITS
+        else:
+            center = (total << SCALE_BITS) // self.burst
+        deviation = 0
+        for v in buf:
+            deviation += abs((v << SCALE_BITS) - center)
+        return center, deviation // self.burst
+
+    def counts(self, ch):
+        """Filtered value of a channel in whole ADC counts"""
+        return self.level[ch] >> SCALE_BITS
+
+    def value(self, ch):
+        """Filtered value of a channel in ADC counts, with the fixed-point fraction"""
+        return self.level[ch] / (1 << SCALE_BITS)
+
+    def noise(self, ch):
+        """Per-sample noise estimate of a channel (mean absolute deviation) in ADC counts"""
+        return self.spread[ch] / (1 << SCALE_BITS)
@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+
+class PrintSink:
+    """Sound sink that prints the alarm (works everywhere)"""
+
+    def tick(self, key):
+        print("DANGER ALARM SOUNDING!")
+
+    def stopped(self, key):
+        print("Alarm stopped.")
+
+
+class NullSink:
+    """Silent sink for benchmarks and headless runs"""
+
+    def tick(self, key):
+        pass
+
+    def stopped(self, key):
+        pass
+
+
+class WinsoundSink:
+    """Beeps through winsound on a single worker thread so the scheduler never blocks.
+
+    Ticks that arrive while a beep is still playing are merged into it.
+    """
+
+    def __init__(self, frequency=1000, duration_ms=1000):
+        import winsound
+        self.winsound = winsound
+        self.frequency = frequency
+        self.duration_ms = duration_ms
+        self.pending = queue.Queue(maxsize=1)
+        threading.Thread(target=self._play, daemon=True).start()
+
+    def tick(self, key):
+        try:
+            self.pending.put_nowait(key)
+        except queue.Full:
+            pass
+
+    def stopped(self, key):
+        pass
+
+    def _play(self):
+        while True:
+            self.pending.get()
+            self.winsound.Beep(self.frequency, self.duration_ms)
+
+
+def default_sink(**kwargs):
+    """WinsoundSink on Windows, PrintSink anywhere winsound is unavailable"""
+    try:
+        return WinsoundSink(**kwargs)
+    except ImportError:
+        return PrintSink()
+
+
+class Alarm:
+    __slots__ = ("key", "period", "until", "generation")
+
+    def __init__(self, key, period, until, generation):
+        self.key = key
+        self.period = period
+        self.until = until  # Stop time, or None to sound until cancelled
+        self.generation = generation
+
+
+class AlarmScheduler:
+    """Single timer heap that drives every alarm, timed or indefinite.
+
+    Each active alarm owns one heap entry (its next tick), so thousands of
+    alarms cost one thread and O(log n) per tick.  Triggering an alarm that
+    is already sounding is de-duplicated; cancelling just drops the alarm
+    state and its stale heap entry is skipped when it comes due.
+
+    Drive it either with start() (one background thread) or by calling
+    run_pending() from an existing loop.
+    """
+
+    def __init__(self, sink=None, clock=time.monotonic):
+        self.sink = sink or PrintSink()
+        self.clock = clock
+        self.alarms = {}  # key -> Alarm
+        self.heap = []  # (due, tiebreak, generation, key)
+        self.tiebreak = itertools.count()
+        self.generations = itertools.count(1)
+        self.wakeup = threading.Condition()
+        self.running = False
+
+    def __len__(self):
+        return len(self.alarms)
+
+    def is_active(self, key):
+        return key in self.alarms
+
+    def trigger(self, key, duration=None, period=1.0):
+        """Starts an alarm for `duration` seconds (None = until cancelled); returns False if already sounding"""
+        with self.wakeup:
+            now = self.clock()
+            alarm = self.alarms.get(key)
+            if alarm is not None:
+                if duration is None:
+                    alarm.until = None  # An indefinite trigger upgrades a timed alarm
+                return False
+            alarm = Alarm(key, period, None if duration is None else now + duration, next(self.generations))
+            self.alarms[key] = alarm
+            heapq.heappush(self.heap, (now, next(self.tiebreak), alarm.generation, key))
+            self.wakeup.notify()
+        return True
+
+    def cancel(self, key):
+        """Stops one alarm; returns False if it was not sounding"""
+        with self.wakeup:
+            alarm = self.alarms.pop(key, None)
+        if alarm is None:
+            return False
+        self.sink.stopped(key)
+        return True
+
+    def cancel_all(self):
+        with self.wakeup:
+            keys = list(self.alarms)
+            self.alarms.clear()
+            self.heap.clear()
+        for key in keys:
+            self.sink.stopped(key)
+
+    def run_pending(self, now=None):
+        """Fires every tick that is due; returns the time of the next tick (None if idle)"""
+        now = self.clock() if now is None else now
+        due, expired = [], []
+        with self.wakeup:
+            while self.heap and self.heap[0][0] <= now:
+                at, _, generation, key = heapq.heappop(self.heap)
+                alarm = self.alarms.get(key)
+                if alarm is None or alarm.generation != generation:
+                    continue  # Cancelled or re-triggered since this entry was pushed
+                due.append(key)
+                next_at = at + alarm.period
+                if alarm.until is not None and next_at >= alarm.until:
+                    del self.alarms[key]
+                    expired.append(key)
+                else:
+                    heapq.heappush(self.heap, (max(next_at, now), next(self.tiebreak), generation, key))
+            next_due = self.heap[0][0] if self.heap else None
+
+        for key in due:
+            self.sink.tick(key)
+        for key in expired:
+            self.sink.stopped(key)
+        return next_due
+
+    def start(self):
+        """Runs the scheduler on one background thread"""
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        with self.wakeup:
+            self.running = False
+            self.wakeup.notify()
+
+    def _run(self):
+        while self.running:
+            self.run_pending()
+            with self.wakeup:
+                # Re-read the heap under the lock so a trigger() since run_pending() is never missed
+                timeout = max(self.heap[0][0] - self.clock(), 0) if self.heap else None
+                if self.running and timeout != 0:
+                    self.wakeup.wait(timeout)
@@ -0,0 +1,90 @@
+import time
+
+from adc_pipeline import AdcPipeline
+from detection_rules import BMS_INTRUSION, BMS_RULES
+from rule_table import RuleTable
+from sim_hardware import SimADC
+
+LOOPS = 5_000
+SENSOR_COUNT = 4
+QUIET_COUNTS = 1700  # True sensor level, below the 2000-count threshold
+INTRUDER_COUNTS = 2400
+BATTERY_COUNTS = 901  # 22% charge; the low-battery alert fires below 20%
+LOW_BATTERY_COUNTS = 0.20 * 4095
+
+
+def make_adcs(seed):
+    battery = SimADC(BATTERY_COUNTS, 60, seed=seed)
+    sensors = [SimADC(QUIET_COUNTS, 150, spike_rate=0.01, seed=seed + i + 1) for i in range(SENSOR_COUNT)]
+    return battery, sensors
+
+
+class LegacyLoop:
+    """The original Bms.py loop body: one raw read per ADC"""
+
+    def __init__(self, battery, sensors, table):
+        self.battery = battery
+        self.sensors = sensors
+        self.table = table
+        self.sample = [1, 1, 1] + [0] * len(sensors)
+
+    def step(self):
+        low = self.battery.read() < LOW_BATTERY_COUNTS
+        for i, sensor in enumerate(self.sensors):
+            self.sample[3 + i] = sensor.read()
+        return low, self.table.code(self.sample) == BMS_INTRUSION
+
+
+class PipelineLoop:
+    """The Bms.py loop body on top of AdcPipeline"""
+
+    def __init__(self, battery, sensors, table, **options):
+        self.adcs = AdcPipeline([battery] + sensors, **options)
+        self.table = table
+        self.sample = [1, 1, 1] + [0] * len(sensors)
+
+    def step(self):
+        self.adcs.sample()
+        low = self.adcs.value(0) < LOW_BATTERY_COUNTS
+        for i in range(len(self.sample) - 3):
+            self.sample[3 + i] = self.adcs.counts(i + 1)
+        return low, self.table.code(self.sample) == BMS_INTRUSION
+
+
+def run(make_loop):
+    """(us per loop, false low-battery rate, false intrusion rate, loops to detect an intruder)"""
+    battery, sensors = make_adcs(seed=1)
+    loop = make_loop(battery, sensors)
+    false_low = false_alarm = 0
+    start = time.perf_counter()
+    for _ in range(LOOPS):
+        low, alarm = loop.step()
+        false_low += low
+        false_alarm += alarm
+    elapsed = time.perf_counter() - start
+
+    sensors[0].level = INTRUDER_COUNTS
+    latency = 1
+    while not loop.step()[1]:
+        latency += 1
+    return elapsed / LOOPS * 1e6, false_low / LOOPS, false_alarm / LOOPS, latency
+
+
+def main():
+    table = RuleTable(*BMS_RULES)
+    variants = [
+        ("single read (legacy)", lambda b, s: LegacyLoop(b, s, table)),
+        ("burst 8, mean + IIR", lambda b, s: PipelineLoop(b, s, table, burst=8, method="mean")),
+        ("burst 8, median + IIR", lambda b, s: PipelineLoop(b, s, table, burst=8, method="median")),
+        ("burst 16, median + IIR", lambda b, s: PipelineLoop(b, s, table, burst=16, method="median")),
+    ]
+    print(f"{LOOPS} loops; sensors {QUIET_COUNTS} +/- 150 counts with 1% spikes (threshold 2000), "
+          f"battery 22% +/- 1.5% (alert < 20%)")
+    print(f"{'acquisition':<24}  {'us/loop':>8}  {'false low batt':>14}  {'false alarm':>11}  {'detect (loops)':>14}")
+    for name, make_loop in variants:
+        cost, false_low, false_alarm, latency = run(make_loop)
+        print(f"{name:<24}  {cost:>8.1f}  {false_low:>14.2%}  {false_alarm:>11.2%}  {latency:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from classifier import classify_batch, classify_code
+from sensor_frame import CHANNELS
+
+STUMP_COUNTS = (10, 1_000, 100_000)
+WINDOW = 8  # Samples per stump
+
+
+def random_samples(stumps, window, seed=0):
+    """Sensor values spanning every rule boundary (PIR 0/1, radar 0-4, seismic 0-7)"""
+    rng = np.random.default_rng(seed)
+    samples = np.empty((stumps, window, len(CHANNELS)), dtype=np.int16)
+    samples[..., 0:2] = rng.integers(0, 2, (stumps, window, 2))
+    samples[..., 2] = rng.integers(0, 2, (stumps, window))
+    samples[..., 3] = rng.integers(0, 5, (stumps, window))
+    samples[..., 4] = rng.integers(0, 8, (stumps, window))
+    return samples
+
+
+def scalar_path(samples):
+    """Per-sample dict + if/elif chain, as StumpSensorNetwork.classify_intrusion does"""
+    codes = np.empty(samples.shape[:2], dtype=np.int8)
+    for n, stump in enumerate(samples.tolist()):
+        for t, values in enumerate(stump):
+            codes[n, t] = classify_code(dict(zip(CHANNELS, values)))
+    return codes
+
+
+def main():
+    print(f"{'stumps':>8}  {'samples':>9}  {'scalar (ms)':>11}  {'batch (ms)':>10}  {'speedup':>8}")
+    for stumps in STUMP_COUNTS:
+        samples = random_samples(stumps, WINDOW)
+
+        start = time.perf_counter()
+        expected = scalar_path(samples)
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        codes = classify_batch(samples)
+        batch = time.perf_counter() - start
+
+        assert np.array_equal(codes, expected), "batch classifier diverged from scalar rules"
+        print(f"{stumps:>8}  {samples.shape[0] * samples.shape[1]:>9}  {scalar * 1000:>11.2f}  "
+              f"{batch * 1000:>10.2f}  {scalar / batch:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import random
+
+from duty_cycle import DutyCycleScheduler
+
+STUMPS = 20
+HIGH_RISK = 4  # The first stumps guard a gate and see most of the traffic
+DURATION = 24 * 3600.0  # Simulated seconds
+EVENTS_PER_DAY = (2, 10)  # Normal, high-risk stump
+EVENT_LENGTH = (20.0, 120.0)  # Seconds an intruder stays in range
+CONFIRM = 3  # Positive samples FusionTracker needs to raise an alarm
+FIXED_INTERVAL = 5.0  # Legacy sweep cadence
+LASER_INTERVAL = 1.0  # Legacy laser pairing cadence
+VARIANTS = ((100, 30.0), (35, 30.0), (15, 30.0), (100, 10.0), (15, 10.0))  # (battery %, latency bound s)
+
+
+def make_events(seed):
+    """Per-stump sorted (start, stop) intrusion intervals over the simulated day"""
+    rng = random.Random(seed)
+    events = {}
+    for i in range(STUMPS):
+        rate = EVENTS_PER_DAY[i < HIGH_RISK] / DURATION
+        t, intervals = 0.0, []
+        while True:
+            t += rng.expovariate(rate)
+            if t >= DURATION:
+                break
+            length = rng.uniform(*EVENT_LENGTH)
+            intervals.append((t, t + length))
+            t += length
+        events[f"x{i + 1}"] = intervals
+    return events
+
+
+class Tracker:
+    """Counts samples and records when each event was first seen and confirmed"""
+
+    def __init__(self, events):
+        self.events = events
+        self.cursor = dict.fromkeys(events, 0)
+        self.hits = {stump: [0] * len(intervals) for stump, intervals in events.items()}
+        self.seen = {stump: [None] * len(intervals) for stump, intervals in events.items()}
+        self.confirmed = {stump: [None] * len(intervals) for stump, intervals in events.items()}
+        self.samples = 0
+
+    def sample(self, stump, t):
+        """Takes one sample; True if an intruder is in range"""
+        self.samples += 1
+        intervals = self.events[stump]
+        k = self.cursor[stump]
+        while k < len(intervals) and intervals[k][1] <= t:
+            k += 1
+        self.cursor[stump] = k
+        if k == len(intervals) or t < intervals[k][0]:
+            return False
+        self.hits[stump][k] += 1
+        if self.seen[stump][k] is None:
+            self.seen[stump][k] = t - intervals[k][0]
+        if self.hits[stump][k] == CONFIRM:
+            self.confirmed[stump][k] = t - intervals[k][0]
+        return True
+
+    def latencies(self, which):
+        values = [v for stump in self.events for v in which[stump]]
+        found = [v for v in values if v is not None]
+        return found, len(values) - len(found)
+
+
+def simulate_fixed(events):
+    tracker = Tracker(events)
+    t = 0.0
+    while t < DURATION:
+        for stump in events:
+            tracker.sample(stump, t)
+        t += FIXED_INTERVAL
+    return tracker, DURATION / LASER_INTERVAL
+
+
+def simulate_adaptive(events, battery, max_interval):
+    clock = [0.0]
+    scheduler = DutyCycleScheduler(events, min_interval=0.5, nominal_interval=FIXED_INTERVAL,
+                                   max_interval=max_interval, clock=lambda: clock[0])
+    scheduler.set_battery(battery)
+    for i in range(HIGH_RISK):
+        scheduler.set_risk(f"x{i + 1}", 1.0)
+    tracker = Tracker(events)
+    laser_steps, next_laser = 0, 0.0
+    t = 0.0
+    while t < DURATION:
+        while next_laser <= t:
+            laser_steps += 1
+            next_laser += scheduler.laser_interval(LASER_INTERVAL, next_laser)
+        for stump in scheduler.due(t):
+            if tracker.sample(stump, t):
+                scheduler.detected(stump, t)
+        t += scheduler.next_delay(t)
+        clock[0] = t
+    return tracker, laser_steps
+
+
+def report(name, tracker, laser_steps):
+    seen, _ = tracker.latencies(tracker.seen)
+    confirmed, missed = tracker.latencies(tracker.confirmed)
+    per_hour = tracker.samples / STUMPS / (DURATION / 3600)
+    print(f"{name:<22}  {per_hour:>10.0f}  {laser_steps / (DURATION / 3600):>10.0f}  "
+          f"{sum(seen) / len(seen):>9.1f}  {max(seen):>8.1f}  "
+          f"{sum(confirmed) / len(confirmed):>12.1f}  {max(confirmed):>11.1f}  {missed:>6}")
+
+
+def main():
+    events = make_events(seed=0)
+    total = sum(len(intervals) for intervals in events.values())
+    print(f"{STUMPS} stumps ({HIGH_RISK} high-risk), {total} intrusions over {DURATION / 3600:.0f} h; "
+          f"energy proxy = samples and laser steps per hour")
+    print(f"{'policy':<22}  {'samples/h':>10}  {'laser/h':>10}  {'seen (s)':>9}  {'max (s)':>8}  "
+          f"{'confirm (s)':>12}  {'max (s)':>11}  {'missed':>6}")
+    report("fixed 5 s", *simulate_fixed(events))
+    for battery, bound in VARIANTS:
+        report(f"{battery:>3}% batt, <= {bound:.0f} s", *simulate_adaptive(events, battery, bound))
+
+
+if __name__ == "__main__":
+    main()
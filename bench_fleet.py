@@ -0,0 +1,159 @@
+import bisect
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import time
+
+import hal
+from alarm_scheduler import NullSink
+from event_journal import ALARM, NullJournal
+from metrics import Registry
+from sim_fleet import DESTRUCTION, INTRUSION, FleetLink, SimulatedFleet, run_fleet
+from sim_hardware import SimBackend
+
+FLEET_SIZES = (100, 1_000, 5_000, 10_000)
+SERIAL_SIZES = (1_000, 5_000)  # Also run through simulated ESP32 gateways on ptys
+GATEWAY_STUMPS = 250  # Stumps per gateway on the serial path
+DURATION = 600.0  # Simulated seconds per run
+INTRUSIONS_PER_HOUR = 2.0  # Per stump
+FAILURES_PER_HOUR = 0.5
+DESTROYED = 0.01  # Share of the fleet destroyed during the run
+REROUTES = 20  # Stumps destroyed one by one in the re-route benchmark
+
+
+def load(name, filename):
+    """Imports one of the hyphenated or script-style modules by file name"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(os.path.dirname(__file__) or ".", filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class AlarmLog(NullJournal):
+    """Journal that keeps the time of every alarm, per stump.
+
+    The time is the simulated time of the sweep plus the wall time the
+    sweep had taken when the alarm went off (gateway round trip and
+    processing), since simulated time stands still during a sweep.
+    """
+
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.alarms = {}
+        self.sweep_start = time.perf_counter()
+
+    def record(self, kind, stump=None, code=0, text="", ts=None):
+        if kind == ALARM:
+            self.alarms.setdefault(stump, []).append(self.fleet.now + time.perf_counter() - self.sweep_start)
+
+    def timed(self, sweep):
+        """Wraps a network's check_stump_status so alarms know when their sweep started"""
+        def timed_sweep():
+            self.sweep_start = time.perf_counter()
+            sweep()
+        return timed_sweep
+
+
+def percentile(values, q):
+    return values[int(q * (len(values) - 1))] if values else float("nan")
+
+
+def detection_latencies(fleet, log):
+    """Seconds from each intrusion or destruction to the stump's next alarm (None if missed).
+
+    The network marks a stump destroyed on its first alarm, so events on a
+    stump that has already alarmed are counted as offline, not as missed.
+    """
+    latencies, offline = [], 0
+    for event in fleet.events:
+        if event.kind not in (INTRUSION, DESTRUCTION):
+            continue
+        times = log.alarms.get(event.stump, [])
+        i = bisect.bisect_left(times, event.start)
+        if i:
+            offline += 1
+            continue
+        deadline = (DURATION if event.end is None else event.end) + 10.0  # A beam break is confirmed after 3 samples
+        latencies.append(times[i] - event.start if i < len(times) and times[i] <= deadline else None)
+    return latencies, offline
+
+
+def bench_sweeps(module, count, serial=False):
+    """One fleet run, in process (FleetLink) or through GatewayPool and ESP32Link over simulated ptys"""
+    fleet = SimulatedFleet(count, seed=count)
+    fleet.randomize(DURATION, INTRUSIONS_PER_HOUR, FAILURES_PER_HOUR, DESTROYED)
+    registry = Registry()
+    log = AlarmLog(fleet)
+    backend = hal.use(SimBackend(fleet, sink=NullSink()))
+    if serial:
+        shards = {f"sim{g}": fleet.names[start:start + GATEWAY_STUMPS]
+                  for g, start in enumerate(range(0, count, GATEWAY_STUMPS))}
+        network = module.StumpSensorNetwork(port=shards, journal=log, metrics=registry)
+    else:
+        network = module.StumpSensorNetwork(port=None, link=FleetLink(fleet), journal=log, metrics=registry)
+    network.check_stump_status = log.timed(network.check_stump_status)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        sweeps = run_fleet(network, fleet, DURATION)
+        elapsed = time.perf_counter() - start
+    network.wifi.close()
+    network.link.close()
+    for port in getattr(network.link, "ports", ()):
+        port.close()
+    backend.close()
+
+    latencies, offline = detection_latencies(fleet, log)
+    found = sorted(t for t in latencies if t is not None)
+    readings = registry.counter("readings_total").value
+    sweep = registry.histogram("sweep_seconds")
+    path = f"serial, {len(network.link.links)} gateways" if serial else "in process"
+    return (count, path, sweeps, readings / elapsed, sweep.sum / sweep.count * 1e3, len(found), len(latencies),
+            offline, percentile(found, 0.5), percentile(found, 0.95), fleet.reactivations)
+
+
+def bench_reroute(module, count):
+    rng = random.Random(count)
+    registry = Registry()
+    with contextlib.redirect_stdout(io.StringIO()):
+        network = module.StumpNetwork(count, metrics=registry)
+        network.check_connection()
+        start = time.perf_counter()
+        for stump in rng.sample(list(network.stumps), REROUTES):
+            network.destroy_stump(stump)  # Repair the loop, recompute and print the route, start the alarm
+        elapsed = time.perf_counter() - start
+    network.alarms.stop()
+    repair = registry.histogram("route_repair_seconds")
+    route = registry.histogram("route_seconds")
+    return repair.sum / repair.count * 1e3, route.sum / route.count * 1e3, elapsed / REROUTES * 1e3
+
+
+def main():
+    hal.use(SimBackend(sink=NullSink()))
+    sensor_working = load("sensor_working", "sensor-working.py")
+    reroute = load("re_route", "re-route.py")
+    print(f"{DURATION:.0f} simulated seconds per fleet; per stump and hour: {INTRUSIONS_PER_HOUR:g} intrusions "
+          f"(5-30 s), {FAILURES_PER_HOUR:g} sensor failures; {DESTROYED:.0%} of stumps destroyed")
+    print(f"{'stumps':>7}  {'path':<20}  {'sweeps':>6}  {'readings/s':>10}  {'ms/sweep':>8}  {'detected':>11}  "
+          f"{'offline':>7}  {'p50 (s)':>7}  {'p95 (s)':>7}  {'reactivated':>11}")
+    runs = [(count, False) for count in FLEET_SIZES] + [(count, True) for count in SERIAL_SIZES]
+    for count, serial in runs:
+        count, path, sweeps, rate, per_sweep, found, events, offline, p50, p95, reactivated = \
+            bench_sweeps(sensor_working, count, serial)
+        print(f"{count:>7}  {path:<20}  {sweeps:>6}  {rate:>10,.0f}  {per_sweep:>8.2f}  {found:>5}/{events:<5}  "
+              f"{offline:>7}  {p50:>7.2f}  {p95:>7.2f}  {reactivated:>11}")
+    print("detected: intrusions and destructions alarmed within 10 s of their end; offline: events on a stump "
+          "already marked destroyed by an earlier alarm;\np50/p95: seconds from the event to the alarm, simulated "
+          "sampling delay plus the wall time of the alarming sweep")
+
+    hal.use(SimBackend(sink=NullSink()))
+    print(f"\n{'stumps':>7}  {'repair (ms)':>11}  {'route (ms)':>10}  {'destroy (ms)':>12}   "
+          f"(re-route.py, {REROUTES} stumps destroyed)")
+    for count in FLEET_SIZES:
+        repair, route, destroy = bench_reroute(reroute, count)
+        print(f"{count:>7}  {repair:>11.3f}  {route:>10.3f}  {destroy:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
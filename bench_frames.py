@@ -0,0 +1,49 @@
+import time
+
+from sensor_frame import CHANNELS, SensorStore, pack_frame
+
+STUMPS = 200  # Records per READALL batch
+BATCHES = 500
+
+
+def csv_batch(stumps):
+    return [f"{','.join(str(v) for v in (1, 1, i % 2, i % 5, i % 8))}\n".encode() for i, _ in enumerate(stumps)]
+
+
+def binary_batch(stumps):
+    return b"".join(pack_frame(int(s[1:]), i, (1, 1, i % 2, i % 5, i % 8)) for i, s in enumerate(stumps))
+
+
+def parse_csv(lines, stumps, sensor_data):
+    """Original path: decode, strip, split, map(int) and a fresh dict per sample"""
+    for stump, raw in zip(stumps, lines):
+        response = raw.decode().strip()
+        laser, photodiode, pir, radar, seismic = map(int, response.split(","))
+        sensor_data[stump] = {"Laser": laser, "Photodiode": photodiode, "PIR": pir, "Radar": radar,
+                              "Seismic": seismic}
+
+
+def parse_binary(payload, store, updated):
+    updated.clear()
+    store.parse_frames(payload, updated)
+
+
+def rate(fn, *args):
+    start = time.perf_counter()
+    for _ in range(BATCHES):
+        fn(*args)
+    return STUMPS * BATCHES / (time.perf_counter() - start)
+
+
+def main():
+    stumps = [f"x{i + 1}" for i in range(STUMPS)]
+    store = SensorStore(stumps)
+    csv_rate = rate(parse_csv, csv_batch(stumps), stumps, {s: dict.fromkeys(CHANNELS, 1) for s in stumps})
+    binary_rate = rate(parse_binary, binary_batch(stumps), store, [])
+    assert store.bad_frames == 0
+    print(f"CSV:    {csv_rate:>12,.0f} frames/s")
+    print(f"binary: {binary_rate:>12,.0f} frames/s  ({binary_rate / csv_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
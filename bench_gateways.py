@@ -0,0 +1,47 @@
+import time
+
+import serial
+
+from esp32_sim import SimulatedESP32
+from gateway_pool import GatewayPool
+from sensor_history import SensorHistory
+
+TOTAL_STUMPS = 32
+GATEWAY_COUNTS = (1, 2, 4, 8)
+READ_LATENCY = 0.005  # Simulated on-device sampling time per stump
+SWEEPS = 5
+
+
+def shard(stumps, gateways):
+    """Contiguous runs of the perimeter per gateway"""
+    size = -(-len(stumps) // gateways)
+    return [stumps[i:i + size] for i in range(0, len(stumps), size)]
+
+
+def main():
+    stumps = [f"x{i + 1}" for i in range(TOTAL_STUMPS)]
+    print(f"{'gateways':>8}  {'largest shard':>13}  {'sweep (ms)':>10}  {'updated':>7}")
+    for gateways in GATEWAY_COUNTS:
+        shards = shard(stumps, gateways)
+        sims = [SimulatedESP32(stumps=names, read_latency=READ_LATENCY).start() for names in shards]
+        sims[-1].set_reading(shards[-1][-1], laser=0)
+        pool = GatewayPool({serial.Serial(sim.port, 115200, timeout=1): names for sim, names in zip(sims, shards)})
+        store = SensorHistory(stumps)
+
+        best, updated = float("inf"), []
+        for _ in range(SWEEPS):
+            start = time.perf_counter()
+            updated = pool.read_stumps(stumps, store)
+            best = min(best, time.perf_counter() - start)
+        assert sorted(updated) == sorted(stumps) and store[stumps[-1]]["Laser"] == 0
+
+        print(f"{gateways:>8}  {max(map(len, shards)):>13}  {best * 1000:>10.1f}  {len(updated):>7}")
+        pool.close()
+        for ser in pool.ports:
+            ser.close()
+        for sim in sims:
+            sim.stop()
+
+
+if __name__ == "__main__":
+    main()
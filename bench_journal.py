@@ -0,0 +1,160 @@
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+
+from event_journal import ALARM, RECORD, EventJournal, JournalReplay
+from sensor_frame import SensorStore
+
+STUMPS = 10_000
+SWEEPS = 500  # 5M reading records
+SWEEP_PERIOD = 5.0  # Journal seconds between sweeps
+QUERIES = 20
+REPLAY_STUMPS = 200
+REPLAY_SWEEPS = 720  # One hour of 5 s sweeps
+START = 1_700_000_000.0
+
+
+def load_network_module():
+    """Imports sensor-working.py (the hyphen rules out a plain import)"""
+    spec = importlib.util.spec_from_file_location("sensor_working", os.path.join(os.path.dirname(__file__) or ".",
+                                                                                 "sensor-working.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_journal(directory, rng):
+    names = [f"x{i + 1}" for i in range(STUMPS)]
+    store = SensorStore(names)
+    journal = EventJournal(directory)
+    start = time.perf_counter()
+    for sweep in range(SWEEPS):
+        for _ in range(50):  # A few stumps change between sweeps
+            store[rng.choice(names)]["Seismic"] = rng.randint(0, 9)
+        journal.record_readings(names, store, ts=START + sweep * SWEEP_PERIOD)
+        if sweep % 50 == 0:
+            journal.record(ALARM, rng.choice(names), 1, ts=START + sweep * SWEEP_PERIOD)
+    journal.flush()
+    elapsed = time.perf_counter() - start
+    count = len(journal)
+    journal.close()
+    return count, elapsed
+
+
+def full_scan(directory, stump, t0, t1):
+    """What a query costs without the index: unpack every record of every segment"""
+    number = int(stump[1:])
+    hits = 0
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            data = f.read()
+        count = struct.unpack_from("<Q", data, 16)[0]
+        for ts, n, kind, code, payload in RECORD.iter_unpack(data[64:64 + count * RECORD.size]):
+            if n == number and t0 <= ts <= t1:
+                hits += 1
+    return hits
+
+
+def bench_queries(directory, rng):
+    start = time.perf_counter()
+    journal = EventJournal(directory)
+    reopen = time.perf_counter() - start
+
+    span = SWEEPS * SWEEP_PERIOD
+    index_times, scan_times = [], []
+    for i in range(QUERIES):
+        stump = f"x{rng.randint(1, STUMPS)}"
+        t0 = START + rng.uniform(0, 0.9 * span)
+        t1 = t0 + 0.1 * span  # "all of x3 over a tenth of the journal"
+        start = time.perf_counter()
+        hits = sum(1 for _ in journal.query(stump, t0, t1))
+        index_times.append(time.perf_counter() - start)
+        if i < 3:  # The scan takes seconds; a few runs are enough
+            start = time.perf_counter()
+            assert full_scan(directory, stump, t0, t1) == hits, "index and scan disagree"
+            scan_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    window = sum(1 for _ in journal.query(None, START + span / 2, START + span / 2 + 10 * SWEEP_PERIOD))
+    window_time = time.perf_counter() - start
+    journal.close()
+    return reopen, index_times, scan_times, window, window_time
+
+
+def record_live(directory, rng):
+    """One hour of sweeps over a small fleet, with beam breaks long enough to confirm"""
+    names = [f"x{i + 1}" for i in range(REPLAY_STUMPS)]
+    store = SensorStore(names)
+    journal = EventJournal(directory)
+    broken = {}  # stump -> sweeps left
+    hit = set()  # A destroyed stump stays destroyed, so each stump is broken at most once
+    intrusions = 0
+    for sweep in range(REPLAY_SWEEPS):
+        if rng.random() < 0.1:
+            stump = rng.choice(names)
+            if stump not in hit:
+                hit.add(stump)
+                broken[stump] = rng.randint(3, 6)
+                intrusions += 1
+        for stump in names:
+            beam = 0 if stump in broken else 1
+            store.set(stump, (beam, beam, 1, 1, rng.randint(0, 3)))
+        for stump in list(broken):
+            broken[stump] -= 1
+            if not broken[stump]:
+                del broken[stump]
+        journal.record_readings(names, store, ts=START + sweep * SWEEP_PERIOD)
+    journal.close()
+    return intrusions
+
+
+def bench_replay(directory, rng):
+    module = load_network_module()
+    intrusions = record_live(directory, rng)
+    journal = EventJournal(directory)
+    replay = JournalReplay(journal)
+    network = module.StumpSensorNetwork(port=None, link=replay.link)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        sweeps = replay.run(network)
+        elapsed = time.perf_counter() - start
+    network.wifi.close()
+    journal.close()
+    return intrusions, network.stumps.count("destroyed"), sweeps, elapsed
+
+
+def main():
+    rng = random.Random(0)
+    root = tempfile.mkdtemp(prefix="journal-bench-")
+    try:
+        directory = os.path.join(root, "big")
+        count, elapsed = write_journal(directory, rng)
+        size = sum(os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory))
+        print(f"write: {count:,} records ({STUMPS:,} stumps x {SWEEPS} sweeps) in {elapsed:.2f} s = "
+              f"{count / elapsed / 1e6:.2f} M records/s, {count * RECORD.size / elapsed / 1e6:.0f} MB/s, "
+              f"{size / 1e6:.0f} MB on disk in {len(os.listdir(directory))} segments")
+
+        reopen, index_times, scan_times, window, window_time = bench_queries(directory, rng)
+        index_times.sort()
+        print(f"reopen + index rebuild: {reopen * 1e3:.1f} ms")
+        print(f"one stump over 10% of the time span: index median {index_times[len(index_times) // 2] * 1e3:.2f} ms, "
+              f"max {index_times[-1] * 1e3:.2f} ms; full scan {sum(scan_times) / len(scan_times):.2f} s")
+        print(f"all stumps over 10 sweeps: {window:,} records in {window_time * 1e3:.1f} ms")
+
+        intrusions, destroyed, sweeps, elapsed = bench_replay(os.path.join(root, "live"), rng)
+        span = REPLAY_SWEEPS * SWEEP_PERIOD
+        print(f"replay into sensor-working: {sweeps} sweeps x {REPLAY_STUMPS} stumps ({span / 3600:.0f} h journaled) "
+              f"in {elapsed:.2f} s = {span / elapsed:,.0f}x real time; "
+              f"{destroyed} stumps destroyed for {intrusions} injected beam breaks")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
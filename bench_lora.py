@@ -0,0 +1,78 @@
+import math
+
+from lora_uplink import LoRaUplink, Reassembler, decode_message
+from sim_hardware import SimLoRa
+from stump_state import StumpStateTable
+
+STUMP_COUNTS = (5, 100, 1000)
+FRAME_LIMIT = 255  # SX127x maximum payload
+SPREADING_FACTOR, BANDWIDTH, CODING_RATE, PREAMBLE = 9, 125_000, 1, 8  # SF9, 125 kHz, 4/5
+
+
+def airtime_ms(payload_bytes):
+    """Semtech SX127x time-on-air for one packet (explicit header, CRC on)"""
+    symbol = (2 ** SPREADING_FACTOR) / BANDWIDTH
+    low_rate = 1 if symbol > 0.016 else 0
+    bits = 8 * payload_bytes - 4 * SPREADING_FACTOR + 28 + 16
+    symbols = 8 + max(math.ceil(bits / (4 * (SPREADING_FACTOR - 2 * low_rate))) * (CODING_RATE + 4), 0)
+    return ((PREAMBLE + 4.25) + symbols) * symbol * 1000
+
+
+def on_air(packets):
+    """(bytes, frames, airtime) with oversized text packets split at the frame limit"""
+    sizes = []
+    for packet in packets:
+        sizes += [min(FRAME_LIMIT, len(packet) - i) for i in range(0, len(packet), FRAME_LIMIT)]
+    return sum(sizes), len(sizes), sum(airtime_ms(size) for size in sizes)
+
+
+def scenario(count):
+    stumps = {f"x{i + 1}": "active" for i in range(count)}
+    changed = [f"x{i + 1}" for i in range(0, count, 10)] or ["x1"]  # 10% of the perimeter
+
+    # Current text format: one send per command, repr of the dict for STATUS
+    text = SimLoRa()
+    text.send(f"STATUS_REPORT {stumps}")
+    for stump in changed:
+        stumps[stump] = "destroyed"
+        text.send(f"DESTROY {stump}")
+    text.send(f"STATUS_REPORT {stumps}")
+
+    # Binary: full bitmap, ACK, then one coalesced command batch plus a delta of the table's dirty stumps
+    stumps = StumpStateTable(f"x{i + 1}" for i in range(count))
+    lora = SimLoRa()
+    uplink = LoRaUplink(lora, count)
+    uplink.queue_status(stumps)
+    uplink.flush()
+    uplink.acknowledge(uplink.seq)
+    for stump in changed:
+        stumps[stump] = "destroyed"
+        uplink.queue_event("DESTROY", stump)
+    uplink.queue_status(stumps)
+    uplink.flush()
+
+    # The stumps' view after reassembly must match the base camp
+    seen, reassembler, events, applied = {}, Reassembler(), [], None
+    for packet in lora.sent:
+        body = reassembler.add(packet)
+        if body is not None:
+            seq, commands = decode_message(body, seen, applied)
+            applied = applied if seq is None else seq
+            events += commands
+    assert seen == dict(stumps.items()) and [stump for _, stump in events] == changed
+    uplink.acknowledge(applied)
+    assert not stumps.dirty, "acknowledged report left stumps dirty"
+
+    return on_air(text.sent), on_air(lora.sent)
+
+
+def main():
+    print(f"{'stumps':>6}  {'text bytes':>10}  {'frames':>6}  {'airtime':>10}  "
+          f"{'binary bytes':>12}  {'frames':>6}  {'airtime':>10}")
+    for count in STUMP_COUNTS:
+        (tb, tf, ta), (bb, bf, ba) = scenario(count)
+        print(f"{count:>6}  {tb:>10}  {tf:>6}  {ta / 1000:>9.2f}s  {bb:>12}  {bf:>6}  {ba / 1000:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import random
+import threading
+import time
+
+from lora_receiver import LoRaReceiver, PacketDispatcher, PacketRing
+from pin_pattern import PinPattern
+from sim_hardware import SimLoRa, SimPin
+
+SCALE = 0.02  # Simulated seconds run 50x faster
+ALERTS = 40
+MEAN_GAP = 2.0  # Seconds between incoming alerts
+TYPING = (1.0, 10.0)  # Seconds the operator spends at each input() prompt
+BLINK = 0.5  # Legacy trigger_alarm: 5 x (0.5 s on + 0.5 s off), blocking
+
+
+def schedule_alerts(seed):
+    rng = random.Random(seed)
+    t, times = 0.0, []
+    for _ in range(ALERTS):
+        t += rng.expovariate(1 / MEAN_GAP)
+        times.append(t)
+    return times
+
+
+def transmit(lora, times, sent):
+    """Radio thread: delivers `ALERT <n> x1` packets at the scheduled (scaled) times"""
+    start = time.perf_counter()
+    for n, t in enumerate(times):
+        time.sleep(max(start + t * SCALE - time.perf_counter(), 0))
+        sent[n] = time.perf_counter()
+        lora.deliver(b"ALERT %d x1" % n)
+
+
+def alert_number(packet):
+    return int(packet.split()[1])
+
+
+def run_legacy(times, seed):
+    """Original run_system: one receive() per loop, blocking alarm, then a blocking input()"""
+    rng = random.Random(seed)
+    lora = SimLoRa()
+    sent, handled = {}, {}
+    radio = threading.Thread(target=transmit, args=(lora, times, sent))
+    radio.start()
+    while radio.is_alive() or lora.buffer is not None:
+        packet = lora.receive()
+        if packet and b"ALERT" in packet:
+            handled[alert_number(packet)] = time.perf_counter()
+            time.sleep(10 * BLINK * SCALE)  # trigger_alarm's sleep(0.5) loop
+        time.sleep(rng.uniform(*TYPING) * SCALE)  # input()
+    radio.join()
+    return sent, handled, lora.overwritten
+
+
+def run_irq(times, seed):
+    """Interrupt path: the radio IRQ drains into the ring and dispatches while the console blocks"""
+    rng = random.Random(seed)
+    irq = SimPin()
+    lora = SimLoRa(irq)
+    buzzer, led = SimPin(), SimPin()
+    pattern = PinPattern([buzzer, led], on_ms=int(BLINK * SCALE * 1000), off_ms=int(BLINK * SCALE * 1000))
+    sent, handled = {}, {}
+
+    def handle_alert(packet):
+        handled[alert_number(packet)] = time.perf_counter()
+        pattern.start(repeats=5)
+
+    dispatcher = PacketDispatcher(PacketRing(capacity=16))
+    dispatcher.on(b"ALERT", handle_alert, prefix=False)
+    receiver = LoRaReceiver(lora, irq, dispatcher.ring, dispatcher)
+    radio = threading.Thread(target=transmit, args=(lora, times, sent))
+    radio.start()
+    while radio.is_alive():
+        receiver.service()
+        pattern.tick()
+        time.sleep(rng.uniform(*TYPING) * SCALE)  # input(); the interrupt path keeps running
+    radio.join()
+    receiver.service()
+    return sent, handled, lora.overwritten + dispatcher.ring.dropped
+
+
+def report(name, sent, handled, dropped):
+    latencies = sorted((handled[n] - sent[n]) / SCALE for n in handled)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{name:<20}  {len(handled):>7}/{len(sent):<3}  {dropped:>7}  {sum(latencies) / len(latencies):>9.3f}  "
+          f"{p95:>8.3f}  {latencies[-1]:>8.3f}")
+
+
+def main():
+    times = schedule_alerts(seed=0)
+    print(f"{ALERTS} alerts, mean gap {MEAN_GAP} s, operator typing {TYPING[0]}-{TYPING[1]} s per prompt "
+          f"(simulated time, latencies in simulated seconds)")
+    print(f"{'receive path':<20}  {'handled':>11}  {'dropped':>7}  {'mean (s)':>9}  {'p95 (s)':>8}  {'max (s)':>8}")
+    report("poll per loop", *run_legacy(times, seed=1))
+    report("IRQ + ring", *run_irq(times, seed=1))
+
+
+if __name__ == "__main__":
+    main()
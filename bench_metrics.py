@@ -0,0 +1,145 @@
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import urllib.request
+
+from event_journal import EventJournal, JournalReplay
+from metrics import NULL_REGISTRY, Registry, perf_counter, serve_prometheus
+from sensor_frame import SensorStore
+
+CALLS = 1_000_000
+STUMPS = 1_000
+SWEEPS = 300
+REPEATS = 5
+
+
+def load_network_module():
+    """Imports sensor-working.py (the hyphen rules out a plain import)"""
+    spec = importlib.util.spec_from_file_location("sensor_working", os.path.join(os.path.dirname(__file__) or ".",
+                                                                                 "sensor-working.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def per_call(fn):
+    """Best-of-REPEATS nanoseconds per call of fn(), minus the empty loop"""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / CALLS * 1e9
+
+
+def bench_calls():
+    registry = Registry()
+    counter, histogram = registry.counter("c"), registry.histogram("h")
+    null_counter, null_histogram = NULL_REGISTRY.counter("c"), NULL_REGISTRY.histogram("h")
+
+    def timed(h):
+        start = perf_counter()
+        h.observe_since(start)
+
+    baseline = per_call(lambda: None)
+    rows = [
+        ("counter.inc()", lambda: counter.inc(), lambda: null_counter.inc()),
+        ("histogram.observe(x)", lambda: histogram.observe(0.003), lambda: null_histogram.observe(0.003)),
+        ("perf_counter() + observe_since()", lambda: timed(histogram), lambda: timed(null_histogram)),
+    ]
+    print(f"{'instrumented call':<34}  {'enabled (ns)':>12}  {'disabled (ns)':>13}")
+    for name, enabled, disabled in rows:
+        print(f"{name:<34}  {per_call(enabled) - baseline:>12.0f}  {per_call(disabled) - baseline:>13.0f}")
+
+
+def write_journal(directory, rng):
+    """Quiet sweeps, with a beam broken for four sweeps on a few stumps so alarms are raised"""
+    names = [f"x{i + 1}" for i in range(STUMPS)]
+    store = SensorStore(names)
+    journal = EventJournal(directory)
+    broken = {}  # stump -> sweeps left
+    for sweep in range(SWEEPS):
+        if sweep % 10 == 0:
+            broken[rng.choice(names)] = 4
+        for stump in names:
+            beam = 0 if stump in broken else 1
+            store.set(stump, (beam, beam, 1, 1, 1))
+        for stump in list(broken):
+            broken[stump] -= 1
+            if not broken[stump]:
+                del broken[stump]
+        journal.record_readings(names, store, ts=sweep * 5.0)
+    journal.close()
+
+
+def replay_once(module, directory, metrics):
+    journal = EventJournal(directory)
+    replay = JournalReplay(journal)
+    network = module.StumpSensorNetwork(port=None, link=replay.link, metrics=metrics)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        replay.run(network)
+        elapsed = time.perf_counter() - start
+    network.wifi.close()
+    journal.close()
+    return elapsed
+
+
+def bench_sweeps():
+    module = load_network_module()
+    root = tempfile.mkdtemp(prefix="metrics-bench-")
+    disabled = enabled = float("inf")
+    try:
+        write_journal(root, random.Random(0))
+        for _ in range(REPEATS):  # Interleaved so drift in machine load hits both sides alike
+            disabled = min(disabled, replay_once(module, root, None))
+            registry = Registry()
+            enabled = min(enabled, replay_once(module, root, registry))
+    finally:
+        shutil.rmtree(root)
+    print(f"\nsensor-working sweeps ({STUMPS} stumps x {SWEEPS} sweeps, replayed, best of {REPEATS}):")
+    print(f"  metrics disabled  {disabled / SWEEPS * 1e3:.3f} ms/sweep")
+    print(f"  metrics enabled   {enabled / SWEEPS * 1e3:.3f} ms/sweep ({(enabled / disabled - 1) * 100:+.1f}%)")
+    sweep = registry.histogram("sweep_seconds")
+    latency = registry.histogram("detection_to_alarm_seconds")
+    print(f"  recorded: {sweep.count} sweeps, p50 <= {sweep.quantile(0.5)} s; "
+          f"{latency.count} alarms, detection-to-alarm p50 <= {latency.quantile(0.5)} s")
+    print("  (replay compresses journal time, so detection-to-alarm here is processing time only)")
+    return registry
+
+
+def bench_export(registry):
+    start = time.perf_counter()
+    text = registry.prometheus()
+    render = time.perf_counter() - start
+    start = time.perf_counter()
+    registry.to_json()
+    as_json = time.perf_counter() - start
+    server = serve_prometheus(registry, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        start = time.perf_counter()
+        with urllib.request.urlopen(url) as response:
+            scraped = response.read().decode()
+        scrape = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "alaids_sweep_seconds_count" in scraped
+    print(f"\nexport: Prometheus text {len(text)} B in {render * 1e6:.0f} us, JSON in {as_json * 1e6:.0f} us, "
+          f"HTTP scrape of /metrics in {scrape * 1e3:.2f} ms")
+
+
+def main():
+    bench_calls()
+    bench_export(bench_sweeps())
+
+
+if __name__ == "__main__":
+    main()
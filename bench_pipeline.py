@@ -0,0 +1,41 @@
+import time
+
+import serial
+
+from esp32_link import ESP32Link
+from esp32_sim import SimulatedESP32
+
+# One intrusion: three sensor reactivations plus the LoRa alert
+COMMANDS = ["REACTIVATE x1 PIR", "REACTIVATE x1 Radar", "REACTIVATE x1 Seismic", "LORA_SEND ALERT: x1 Intrusion detected!"]
+COMMAND_LATENCY = {"REACTIVATE": 0.2, "LORA_SEND": 0.4}  # Simulated time each command takes on the device
+
+
+def serialized(link):
+    """Original behaviour: each command waits for its answer before the next is sent"""
+    return [link.send_command(command) for command in COMMANDS]
+
+
+def pipelined(link):
+    """All commands in flight at once, answers matched by sequence ID"""
+    futures = [link.submit(command) for command in COMMANDS]
+    return [future.result() for future in futures]
+
+
+def main():
+    sim = SimulatedESP32(command_latency=COMMAND_LATENCY).start()
+    ser = serial.Serial(sim.port, 115200, timeout=0.1)
+    link = ESP32Link(ser)
+
+    for name, fn in (("serialized", serialized), ("pipelined", pipelined)):
+        start = time.perf_counter()
+        responses = fn(link)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {elapsed * 1000:7.1f} ms  {responses}")
+
+    link.close()
+    ser.close()
+    sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import math
+import random
+import time
+
+from perimeter_routing import PerimeterRoute
+
+STUMP_COUNTS = (100, 1_000, 10_000)
+UPDATES = 2_000
+RADIUS = 1000.0
+
+
+def perimeter(count, seed=0):
+    """Stumps around a circular perimeter, listed in random (deployment) order"""
+    rng = random.Random(seed)
+    names = [f"x{i + 1}" for i in range(count)]
+    coordinates = {}
+    for i, name in enumerate(names):
+        angle = 2 * math.pi * i / count
+        r = RADIUS + rng.uniform(-0.1, 0.1) * RADIUS * 2 * math.pi / count
+        coordinates[name] = (r * math.cos(angle), r * math.sin(angle))
+    rng.shuffle(names)
+    return {name: coordinates[name] for name in names}
+
+
+def legacy_route(stumps):
+    """Original check_connection: active stumps in dict order, loop closed"""
+    active = [stump for stump, status in stumps.items() if status]
+    return active + [active[0]]
+
+
+def loop_length(coordinates, route):
+    return sum(math.dist(coordinates[a], coordinates[b]) for a, b in zip(route, route[1:]))
+
+
+def main():
+    print(f"{'stumps':>7}  {'build (s)':>9}  {'update (us)':>11}  {'legacy (us)':>11}  "
+          f"{'length':>8}  {'legacy length':>13}")
+    for count in STUMP_COUNTS:
+        coordinates = perimeter(count)
+        start = time.perf_counter()
+        router = PerimeterRoute(coordinates, max_link=4 * RADIUS * 2 * math.pi / count)
+        build = time.perf_counter() - start
+
+        rng = random.Random(1)
+        victims = rng.sample(list(coordinates), min(UPDATES // 2, count // 2))
+        start = time.perf_counter()
+        for stump in victims:
+            router.drop(stump)
+        for stump in victims:
+            router.restore(stump)
+        update = (time.perf_counter() - start) / (2 * len(victims))
+
+        stumps = dict.fromkeys(coordinates, True)
+        start = time.perf_counter()
+        for stump in victims[:50]:
+            stumps[stump] = False
+            legacy_route(stumps)
+        legacy = (time.perf_counter() - start) / 50
+
+        print(f"{count:>7}  {build:>9.3f}  {update * 1e6:>11.2f}  {legacy * 1e6:>11.2f}  "
+              f"{router.length:>8.0f}  {loop_length(coordinates, legacy_route(dict.fromkeys(coordinates, True))):>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
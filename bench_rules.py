@@ -0,0 +1,136 @@
+import itertools
+import random
+import time
+
+from classifier import classify_code
+from detection_rules import BACKUP_RULES, BEAM_RULES, BMS_RULES, INTRUSION_RULES
+from rule_table import RuleTable, evaluate
+from sensor_frame import CHANNELS, SensorStore
+
+SAMPLES = 100_000
+ACTIVE = 0.05  # Share of samples with something happening; the rest are quiet perimeter
+
+
+def random_sample(rng):
+    """One five-channel sample; quiet samples fall through every legacy rule"""
+    if rng.random() < ACTIVE:
+        return rng.randint(0, 1), rng.randint(0, 1), rng.randint(0, 1), rng.randint(0, 4), rng.randint(0, 7)
+    return 1, 1, 0, 0, rng.randint(0, 1)
+
+
+def random_bms_sample(rng):
+    """Three receivers then four 12-bit ADC sensors"""
+    if rng.random() < ACTIVE:
+        return [rng.randint(0, 1) for _ in range(3)] + [rng.randint(0, 4095) for _ in range(4)]
+    return [1, 1, 1] + [rng.randint(0, 1900) for _ in range(4)]
+
+
+def legacy_classify(sensor_data):
+    """The original if/elif chain from Movement_detection.classify_intrusion (as class codes)"""
+    pir = sensor_data["PIR"]
+    radar = sensor_data["Radar"]
+    seismic = sensor_data["Seismic"]
+    if pir == 1 and 0.5 <= radar <= 1.5 and seismic > 3:
+        return 0
+    elif pir == 1 and radar > 1.5 and seismic <= 3:
+        return 1
+    elif pir == 1 and radar > 3 and seismic > 5:
+        return 2
+    elif pir == 0 and radar == 0 and seismic < 2:
+        return 3
+    else:
+        return 4
+
+
+def legacy_beam(sensor_data):
+    """The original sensor-working.py laser and backup-sensor checks"""
+    laser, photodiode, pir, radar, seismic = sensor_data.values()
+    return int(laser == 0 or photodiode == 0), int(pir == 0 or radar == 0 or seismic == 0)
+
+
+def legacy_bms(sample):
+    """The original Bms.detect_intrusion loops over receivers and ADC sensors"""
+    for value in sample[:3]:
+        if value == 0:
+            return 1
+    for value in sample[3:]:
+        if value > 2000:
+            return 1
+    return 0
+
+
+def verify(table, rules, values):
+    """Checks the compiled rules against the reference rule evaluation on every combination"""
+    channels, rule_list, default = rules
+    for combo in itertools.product(*values):
+        reading = dict(zip(channels, combo))
+        expected = evaluate(rule_list, default, reading)
+        assert table.lookup(reading) == table.code(combo) == expected, f"compiled rules diverged at {reading}"
+
+
+def per_sample(fn, data, repeat=5):
+    """Best-of-`repeat` nanoseconds per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in data:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(data) * 1e9
+
+
+def main():
+    rng = random.Random(0)
+    intrusion = RuleTable(*INTRUSION_RULES)
+    beam = RuleTable(*BEAM_RULES)
+    backup = RuleTable(*BACKUP_RULES)
+    bms = RuleTable(*BMS_RULES)
+
+    verify(intrusion, INTRUSION_RULES, [range(-1, 3)] * 3 + [range(-1, 6), range(-1, 8)])
+    verify(beam, BEAM_RULES, [range(-1, 3)] * 5)
+    verify(bms, BMS_RULES, [range(-1, 2)] * 3 + [(0, 1999, 2000, 2001, 4095)] * 4)
+    for combo in itertools.product(*[range(-1, 3)] * 3 + [range(-1, 6), range(-1, 8)]):
+        reading = dict(zip(INTRUSION_RULES[0], combo))
+        assert classify_code(reading) == evaluate(*INTRUSION_RULES[1:], reading), f"classifier diverged at {reading}"
+    print("Compiled rules and the classifier's dict chain verified against the reference evaluation")
+
+    store = SensorStore([f"x{i + 1}" for i in range(SAMPLES)])
+    dicts = []
+    for i in range(SAMPLES):
+        values = random_sample(rng)
+        store.readings[i * len(CHANNELS):(i + 1) * len(CHANNELS)] = store.readings.__class__("h", values)
+        dicts.append(dict(zip(CHANNELS, values)))
+    views = store.views
+    bases = [view.base for view in views]
+    assert all(legacy_classify(d) == intrusion.lookup(v) for d, v in zip(dicts, views))
+
+    bms_samples = [random_bms_sample(rng) for _ in range(SAMPLES)]
+    assert all(legacy_bms(s) == bms.code(s) for s in bms_samples)
+
+    readings = store.readings
+    _, rules, default = INTRUSION_RULES
+    bms_channels, bms_rules, bms_default = BMS_RULES
+    rows = [
+        ("classify: if/elif on dict", per_sample(legacy_classify, dicts)),
+        ("classify: if/elif on ReadingView", per_sample(legacy_classify, views)),
+        ("classify: interpreted rules on dict", per_sample(lambda d: evaluate(rules, default, d), dicts)),
+        ("classify: compiled on dict", per_sample(intrusion.lookup, dicts)),
+        ("classify: compiled on ReadingView", per_sample(intrusion.lookup, views)),
+        ("classify: compiled on store row", per_sample(lambda base: intrusion.code(readings, base), bases)),
+        ("classify_code on dict (chain)", per_sample(classify_code, dicts)),
+        ("classify_code on ReadingView", per_sample(classify_code, views)),
+        ("beam+backup: if/or on ReadingView", per_sample(legacy_beam, views)),
+        ("beam+backup: compiled on ReadingView", per_sample(lambda v: (beam.lookup(v), backup.lookup(v)), views)),
+        ("bms: receiver/ADC loops", per_sample(legacy_bms, bms_samples)),
+        ("bms: interpreted rules", per_sample(
+            lambda sample: evaluate(bms_rules, bms_default, dict(zip(bms_channels, sample))), bms_samples)),
+        ("bms: compiled", per_sample(bms.code, bms_samples)),
+    ]
+    print(f"\n{SAMPLES} samples, {ACTIVE:.0%} active")
+    print(f"{'path':<36}  {'ns/sample':>9}")
+    for name, cost in rows:
+        print(f"{name:<36}  {cost:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+import time
+
+from stump_state import StumpStateTable
+
+STUMP_COUNTS = (10_000, 100_000)
+FLIPS = 1_000  # destroy/restore operations per run
+CHANGED = 0.01  # Share of stumps changed between two syncs
+
+
+def legacy_step(stumps, stump, status):
+    """Old pattern: flip a dict of booleans, then rebuild the active list (reroute) and count it"""
+    stumps[stump] = status
+    active = [s for s, ok in stumps.items() if ok]
+    return len(active)
+
+
+def table_step(table, stump, state):
+    table.set_state(stump, state)
+    return table.count("active")
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'stumps':>8}  {'dict flip+count (us)':>20}  {'table flip+count (us)':>21}  {'iter off (ms)':>16}  "
+          f"{'old Wi-Fi B':>11}  {'snapshot B':>10}  {'delta B':>8}  {'snapshot (ms)':>13}  {'delta (ms)':>10}")
+    for count in STUMP_COUNTS:
+        rng = random.Random(0)
+        names = [f"x{i + 1}" for i in range(count)]
+        victims = rng.sample(names, FLIPS)
+
+        stumps = dict.fromkeys(names, True)
+        start = time.perf_counter()
+        for stump in victims[:FLIPS // 10]:  # The O(n) path is too slow to run all flips at 100k
+            legacy_step(stumps, stump, False)
+        legacy = (time.perf_counter() - start) / (FLIPS // 10)
+
+        table = StumpStateTable(names)
+        start = time.perf_counter()
+        for stump in victims:
+            table_step(table, stump, "destroyed")
+        for stump in victims:
+            table_step(table, stump, "active")
+        flip = (time.perf_counter() - start) / (2 * FLIPS)
+
+        for stump in rng.sample(names, count // 10):
+            table.set_state(stump, rng.choice(("off", "destroyed")))
+        _, iterate = timed(table.stumps_in, "off")
+
+        # Base camp and the stumps start in sync, then 1% of the stumps change
+        peer = StumpStateTable(names)
+        snapshot, snapshot_time = timed(table.snapshot)
+        peer.apply_snapshot(snapshot)
+        table.acknowledge(table.delta())
+        for stump in rng.sample(names, int(count * CHANGED)):
+            table.set_state(stump, rng.choice(("active", "off", "destroyed")))
+            table.set_alarm(stump, rng.random() < 0.5)
+        delta, delta_time = timed(table.delta)
+        peer.apply_delta(delta)
+        assert peer.snapshot() == table.snapshot(), "peer diverged after snapshot + delta"
+
+        print(f"{count:>8}  {legacy * 1e6:>20.1f}  {flip * 1e6:>21.2f}  {iterate * 1e3:>16.3f}  "
+              f"{len(str({s: table.is_active(s) for s in names}).encode()):>11}  {len(snapshot):>10}  {len(delta):>8}  "
+              f"{snapshot_time * 1e3:>13.2f}  {delta_time * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
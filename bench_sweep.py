@@ -0,0 +1,51 @@
+import time
+
+import serial
+
+from esp32_link import ESP32Link
+from esp32_sim import SimulatedESP32
+from sensor_frame import SensorStore
+
+STUMP_COUNTS = (1, 2, 4, 8, 16)
+LEGACY_SLEEP = 0.5  # Fixed delay used by the original per-stump send_command
+READ_LATENCY = 0.002  # Simulated on-device sampling time per stump
+
+
+def legacy_sweep(ser, stumps):
+    """Original loop: one READ per stump with a fixed sleep before readline"""
+    for stump in stumps:
+        ser.write(f"READ {stump}\n".encode())
+        time.sleep(LEGACY_SLEEP)
+        ser.readline()
+
+
+def bulk_sweep(link, stumps, store):
+    link.read_stumps(stumps, store)
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'stumps':>6}  {'legacy (s)':>10}  {'bulk (ms)':>9}  {'speedup':>8}")
+    for count in STUMP_COUNTS:
+        sim = SimulatedESP32(stump_count=count, read_latency=READ_LATENCY).start()
+        ser = serial.Serial(sim.port, 115200, timeout=1)
+        stumps = list(sim.readings)
+        legacy = timed(legacy_sweep, ser, stumps, repeat=1)
+        link = ESP32Link(ser)  # Takes over reading the port
+        bulk = timed(bulk_sweep, link, stumps, SensorStore(stumps))
+        print(f"{count:>6}  {legacy:>10.3f}  {bulk * 1000:>9.2f}  {legacy / bulk:>7.0f}x")
+        link.close()
+        ser.close()
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import struct
+import time
+
+from wifi_server_sim import SimulatedBaseServer
+from wifi_uplink import WifiUplink
+
+PAYLOAD = struct.Struct("<Id")  # sequence number, send time
+PADDING = b"{'x1': True, 'x2': True, 'x3': False, 'x4': True}"  # Typical status update
+
+
+def message(seq):
+    return PAYLOAD.pack(seq, time.perf_counter()) + PADDING
+
+
+def latencies(server):
+    return sorted(arrival - PAYLOAD.unpack_from(payload)[1] for arrival, payload in server.received)
+
+
+def percentile(values, p):
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000 if values else float("nan")
+
+
+def settle(server, quiet=0.3):
+    """Waits until the server has read everything already written to it"""
+    count = -1
+    while count != len(server.received):
+        count = len(server.received)
+        time.sleep(quiet)
+
+
+def report(name, uplink, server, sent, start):
+    settle(server)
+    elapsed = server.received[-1][0] - start if server.received else float("nan")
+    lat = latencies(server)
+    print(f"{name:<22} sent {sent:>6}  delivered {len(server.received):>6}  dropped {uplink.dropped:>6}  "
+          f"connects {uplink.connects}  {len(server.received) / elapsed:>9,.0f} msg/s  "
+          f"p50 {percentile(lat, 0.5):7.2f} ms  p99 {percentile(lat, 0.99):8.2f} ms")
+    assert len(server.received) + uplink.dropped == sent, "messages lost without being counted as dropped"
+
+
+def throughput(count=50_000):
+    server = SimulatedBaseServer().start()
+    uplink = WifiUplink(server.host, server.port, max_queue=4096, drop_policy="block")
+    start = time.perf_counter()
+    for seq in range(count):
+        uplink.send(message(seq))
+    uplink.close(flush_timeout=10)
+    report("steady throughput", uplink, server, count, start)
+    server.stop()
+
+
+def disconnect(rate=2_000, duration=3.0, outage=(1.0, 1.5)):
+    """Server drops out for part of the run; the uplink must reconnect and catch up"""
+    server = SimulatedBaseServer().start()
+    uplink = WifiUplink(server.host, server.port, max_queue=4096, backoff_initial=0.05, backoff_max=0.2)
+    start = time.perf_counter()
+    seq, down = 0, False
+    while (now := time.perf_counter() - start) < duration:
+        if not down and outage[0] <= now < outage[1]:
+            server.stop()
+            down = True
+        elif down and now >= outage[1]:
+            server.start()
+            down = False
+        uplink.send(message(seq))
+        seq += 1
+        time.sleep(max(0.0, start + seq / rate - time.perf_counter()))
+    uplink.close(flush_timeout=5)
+    report("disconnect/reconnect", uplink, server, seq, start)
+    server.stop()
+
+
+def slow_server(policy, count=5_000):
+    server = SimulatedBaseServer(frame_delay=0.0002).start()
+    uplink = WifiUplink(server.host, server.port, max_queue=256, drop_policy=policy, put_timeout=0.01)
+    start = time.perf_counter()
+    for seq in range(count):
+        uplink.send(message(seq))
+    uplink.close(flush_timeout=10)
+    report(f"slow server ({policy})", uplink, server, count, start)
+    server.stop()
+
+
+def main():
+    throughput()
+    disconnect()
+    for policy in ("drop_oldest", "block"):
+        slow_server(policy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+try:
+    import numpy as np
+except ImportError:  # Scalar classification still works without NumPy
+    np = None
+
+from detection_rules import ANIMAL, FALSE_ALARM, HUMAN, INTRUSION_RULES, UNKNOWN, VEHICLE
+from rule_table import OPS, RuleTable
+
+# Labels of the integer class codes declared in detection_rules
+LABELS = ("Human Detected", "Animal Detected", "Vehicle Detected", "False Alarm (Wind/Insects)", "Unknown Intrusion")
+
+# Channel order of the last axis of a batch array (matches sensor_frame.CHANNELS)
+LASER, PHOTODIODE, PIR, RADAR, SEISMIC = range(5)
+
+INTRUSION_TABLE = RuleTable(*INTRUSION_RULES)
+
+
+def classify_code(sensor_data):
+    """Classifies one reading (dict or ReadingView) into an integer class code.
+
+    Dicts go through the hand-written if/elif chain, which beats the
+    generated lookup on them (bench_rules.py); ReadingViews are read in
+    place by INTRUSION_TABLE.  bench_rules.py checks the chain against
+    INTRUSION_RULES on every combination.
+    """
+    if type(sensor_data) is not dict:
+        return INTRUSION_TABLE.lookup(sensor_data)
+    pir = sensor_data["PIR"]
+    radar = sensor_data["Radar"]
+    seismic = sensor_data["Seismic"]
+
+    if pir == 1 and 0.5 <= radar <= 1.5 and seismic > 3:
+        return HUMAN
+    elif pir == 1 and radar > 1.5 and seismic <= 3:
+        return ANIMAL
+    elif pir == 1 and radar > 3 and seismic > 5:
+        return VEHICLE
+    elif pir == 0 and radar == 0 and seismic < 2:
+        return FALSE_ALARM
+    else:
+        return UNKNOWN
+
+
+def classify_intrusion(sensor_data):
+    """Classifies whether it's a human, animal, or vehicle intrusion"""
+    return LABELS[classify_code(sensor_data)]
+
+
+def classify_batch(samples):
+    """Classifies an (N stumps x T samples x 5 channels) array into an (N x T) int8 array of class codes.
+
+    Built from the same INTRUSION_RULES as classify_code, in the same
+    priority order, so every element gets the code the scalar path returns.
+    """
+    if np is None:
+        raise ImportError("classify_batch requires NumPy")
+    samples = np.asarray(samples)
+    channels, rules, default = INTRUSION_RULES
+    conditions = []
+    for _, rule in rules:
+        condition = np.ones(samples.shape[:-1], dtype=bool)
+        for channel, op, threshold in rule:
+            condition &= OPS[op](samples[..., channels.index(channel)], threshold)
+        conditions.append(condition)
+    return np.select(conditions, [code for code, _ in rules], default).astype(np.int8)
@@ -0,0 +1,44 @@
+# Detection thresholds, declared once and compiled into compare code by rule_table.RuleTable.
+# Each rule set is (channels, [(code, ((channel, op, threshold), ...)), ...], default code):
+# the conditions of one rule are ANDed, rules are tried in order and the first match wins.
+# Keep this module free of imports so it runs unchanged on MicroPython.
+
+CHANNELS = ("Laser", "Photodiode", "PIR", "Radar", "Seismic")  # Matches sensor_frame.CHANNELS
+
+# Intrusion classes (classifier.py)
+HUMAN, ANIMAL, VEHICLE, FALSE_ALARM, UNKNOWN = range(5)
+
+INTRUSION_RULES = (CHANNELS, [
+    (HUMAN, (("PIR", "==", 1), ("Radar", ">=", 0.5), ("Radar", "<=", 1.5), ("Seismic", ">", 3))),
+    (ANIMAL, (("PIR", "==", 1), ("Radar", ">", 1.5), ("Seismic", "<=", 3))),
+    (VEHICLE, (("PIR", "==", 1), ("Radar", ">", 3), ("Seismic", ">", 5))),
+    (FALSE_ALARM, (("PIR", "==", 0), ("Radar", "==", 0), ("Seismic", "<", 2))),
+], UNKNOWN)
+
+# Laser beam of a stump (sensor-working.py, intrusion_fusion.beam_score)
+BEAM_INTACT, BEAM_BROKEN = range(2)
+
+BEAM_RULES = (CHANNELS, [
+    (BEAM_BROKEN, (("Laser", "==", 0),)),
+    (BEAM_BROKEN, (("Photodiode", "==", 0),)),
+], BEAM_INTACT)
+
+# Backup sensors of a stump (sensor-working.py reactivation)
+BACKUP_OK, BACKUP_OFFLINE = range(2)
+
+BACKUP_RULES = (CHANNELS, [
+    (BACKUP_OFFLINE, (("PIR", "==", 0),)),
+    (BACKUP_OFFLINE, (("Radar", "==", 0),)),
+    (BACKUP_OFFLINE, (("Seismic", "==", 0),)),
+], BACKUP_OK)
+
+# On-stump pins (Bms.py): 3 laser receivers (digital) and 4 ADC sensors (12-bit counts)
+BMS_CHANNELS = ("Receiver1", "Receiver2", "Receiver3", "Sensor1", "Sensor2", "Sensor3", "Sensor4")
+BMS_CLEAR, BMS_INTRUSION = range(2)
+SENSOR_THRESHOLD = 2000  # ADC counts
+
+BMS_RULES = (BMS_CHANNELS, [
+    (BMS_INTRUSION, ((receiver, "==", 0),)) for receiver in BMS_CHANNELS[:3]
+] + [
+    (BMS_INTRUSION, ((sensor, ">", SENSOR_THRESHOLD),)) for sensor in BMS_CHANNELS[3:]
+], BMS_CLEAR)
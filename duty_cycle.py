@@ -0,0 +1,107 @@
+try:
+    from time import monotonic
+except ImportError:  # MicroPython
+    from time import ticks_ms
+
+    def monotonic():
+        return ticks_ms() / 1000
+
+
+class DutyCycleScheduler:
+    """Power-aware sampling intervals per stump.
+
+    A stump with a detection in the last `burst_hold` seconds is sampled
+    every `min_interval`.  Quiet stumps are sampled every
+    `nominal_interval`; only once the battery is below `battery_full`
+    percent do they back off, doubling for every `backoff_after` seconds
+    without a detection, and the interval grows up to 4x as the battery
+    falls to `battery_low` percent.  It shrinks up to 4x with the stump's
+    risk (0..1).  Whatever the battery or quiet time, no stump is ever
+    left longer than `max_interval`, which bounds detection latency.
+    """
+
+    def __init__(self, stumps, min_interval=0.5, nominal_interval=5.0, max_interval=30.0, burst_hold=60.0,
+                 backoff_after=300.0, battery_full=50, battery_low=20, clock=monotonic):
+        if not 0 < min_interval <= nominal_interval <= max_interval:
+            raise ValueError("Intervals need 0 < min_interval <= nominal_interval <= max_interval")
+        self.min_interval = min_interval
+        self.nominal_interval = nominal_interval
+        self.max_interval = max_interval
+        self.burst_hold = burst_hold
+        self.backoff_after = backoff_after
+        self.battery_full = battery_full
+        self.battery_low = battery_low
+        self.clock = clock
+        self.battery = 100.0
+        now = clock()
+        self.risk = {stump: 0.0 for stump in stumps}
+        self.last_detection = {stump: None for stump in stumps}
+        self.quiet_since = {stump: now for stump in stumps}
+        self.next_due = {stump: now for stump in stumps}  # Everything is sampled once at start
+
+    def set_clock(self, clock):
+        """Switches to another time source (simulation, replay), shifting every pending time onto it"""
+        shift = clock() - self.clock()
+        for times in (self.quiet_since, self.next_due):
+            for stump in times:
+                times[stump] += shift
+        for stump, last in self.last_detection.items():
+            if last is not None:
+                self.last_detection[stump] = last + shift
+        self.clock = clock
+
+    def set_battery(self, percent):
+        self.battery = percent
+
+    def set_risk(self, stump, risk):
+        """Sets a stump's risk in 0..1 (1 samples it 4x as often as a quiet, zero-risk stump)"""
+        self.risk[stump] = min(max(risk, 0.0), 1.0)
+
+    def battery_factor(self):
+        """1 on a healthy battery, rising linearly to 4 at `battery_low` percent and below"""
+        span = self.battery_full - self.battery_low
+        drained = min(max((self.battery_full - self.battery) / span, 0.0), 1.0)
+        return 1 + 3 * drained
+
+    def detected(self, stump, now=None):
+        """Records activity on a stump; it bursts to `min_interval` from now on"""
+        now = self.clock() if now is None else now
+        self.last_detection[stump] = now
+        self.quiet_since[stump] = now
+        self.next_due[stump] = min(self.next_due[stump], now + self.min_interval)
+
+    def is_bursting(self, stump, now):
+        last = self.last_detection[stump]
+        return last is not None and now - last < self.burst_hold
+
+    def interval(self, stump, now=None):
+        """Seconds until a stump should be sampled again"""
+        now = self.clock() if now is None else now
+        if self.is_bursting(stump, now):
+            return self.min_interval
+        backoff = 1
+        if self.battery < self.battery_full:  # On a healthy battery quiet stumps keep the nominal cadence
+            backoff = 2 ** min(int((now - self.quiet_since[stump]) // self.backoff_after), 16)
+        interval = self.nominal_interval * backoff * self.battery_factor() / (1 + 3 * self.risk[stump])
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def due(self, now=None):
+        """Stumps whose sample is due; each is rescheduled from now"""
+        now = self.clock() if now is None else now
+        stumps = [stump for stump, due in self.next_due.items() if due <= now]
+        for stump in stumps:
+            self.next_due[stump] = now + self.interval(stump, now)
+        return stumps
+
+    def next_delay(self, now=None):
+        """Seconds until the earliest stump is due (0 if one is overdue)"""
+        now = self.clock() if now is None else now
+        return max(min(self.next_due.values()) - now, 0.0)
+
+    def laser_interval(self, base, now=None):
+        """Laser pairing cadence: `base` while any stump bursts, else stretched by the battery factor"""
+        now = self.clock() if now is None else now
+        for stump in self.last_detection:
+            if self.is_bursting(stump, now):
+                return base
+        return min(base * self.battery_factor(), self.max_interval)
@@ -0,0 +1,188 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from sensor_frame import FRAME_SIZE
+
+
+class CommandChannel:
+    """Pipelined, sequence-tagged command channel over a serial port.
+
+    Every request goes out as `#<seq> <command>` and every response line
+    comes back as `#<seq> <text>`, so any number of requests can be in
+    flight and the ESP32 may answer them in any order.  A single reader
+    thread matches responses to their Future by sequence ID.  Multi-line
+    responses (READALL) collect tagged lines until `#<seq> END`, or, in
+    binary mode, resolve to the raw bytes announced by `#<seq> BIN <n>`.
+    If the port fails (e.g. the USB cable is unplugged) every pending and
+    later request fails at once with ConnectionError.
+    """
+
+    def __init__(self, ser, timeout=2.0):
+        self.ser = ser  # Any pyserial-compatible port (Serial, serial_for_url, pty)
+        self.timeout = timeout  # Seconds before an unanswered request fails
+        self.pending = {}  # seq -> (future, deadline, lines or None)
+        self.lock = threading.Lock()
+        self.seq = itertools.count(1)
+        self.running = True
+        self.error = None  # Set when the reader thread has stopped; later requests fail fast
+        self.skip = 0  # Bytes still owed by a truncated binary payload, discarded before the next line
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+
+    def submit(self, command, multiline=False):
+        """Queues a command and returns a Future for its response"""
+        future = Future()
+        with self.lock:
+            if self.error is None:
+                seq = next(self.seq) % 100000
+                self.pending[seq] = (future, time.monotonic() + self.timeout, [] if multiline else None)
+                try:
+                    self.ser.write(f"#{seq} {command}\n".encode())
+                except Exception as e:
+                    del self.pending[seq]
+                    future.set_exception(ConnectionError(f"ESP32 write failed: {e}"))
+                return future
+        future.set_exception(self.error)
+        return future
+
+    def close(self):
+        """Stops the reader thread; the serial port itself is left open"""
+        self.running = False
+        self.reader.join()
+
+    def _read_loop(self):
+        try:
+            while self.running:
+                if self.skip:
+                    self.skip -= len(self.ser.read(self.skip))
+                    self._expire(time.monotonic())
+                    continue
+                line = self.ser.readline().decode(errors="replace").strip()
+                if line.startswith("#"):
+                    self._dispatch(line)
+                self._expire(time.monotonic())
+            error = ConnectionError("ESP32 channel closed")
+        except Exception as e:
+            print(f"ESP32 link lost: {e}")
+            error = ConnectionError(f"ESP32 link lost: {e}")
+        with self.lock:
+            self.error = error
+            futures = [future for future, _, _ in self.pending.values()]
+            self.pending.clear()
+        for future in futures:
+            future.set_exception(error)
+
+    def _dispatch(self, line):
+        tag, _, text = line[1:].partition(" ")
+        if not tag.isdigit():
+            return
+        seq = int(tag)
+        with self.lock:
+            entry = self.pending.get(seq)
+            if entry is None:
+                return  # Late answer for a request that already timed out
+            future, deadline, lines = entry
+            binary = lines is not None and text.startswith("BIN ")
+            if lines is not None and text != "END" and not binary:
+                lines.append(text)
+                return
+            del self.pending[seq]
+        if binary:
+            self._read_frames(future, int(text.split()[1]) * FRAME_SIZE, deadline)
+        else:
+            future.set_result(text if lines is None else lines)
+
+    def _read_frames(self, future, size, deadline):
+        """Reads a binary payload, however many port reads it takes, until `deadline`"""
+        chunks, remaining = [], size
+        try:
+            while remaining and time.monotonic() < deadline:
+                chunk = self.ser.read(remaining)
+                chunks.append(chunk)
+                remaining -= len(chunk)
+        except Exception as e:
+            future.set_exception(ConnectionError(f"ESP32 link lost: {e}"))
+            raise
+        if remaining:
+            future.set_exception(TimeoutError(f"Binary READALL truncated: {size - remaining} of {size} bytes"))
+            self.skip = remaining  # The tail may still arrive; the stream resynchronises after it
+        else:
+            future.set_result(b"".join(chunks))
+
+    def _expire(self, now):
+        with self.lock:
+            overdue = [seq for seq, (_, deadline, _) in self.pending.items() if deadline <= now]
+            futures = [self.pending.pop(seq)[0] for seq in overdue]
+        for future in futures:
+            future.set_exception(TimeoutError("ESP32 did not answer in time"))
+
+
+class ESP32Link:
+    """Command link to the ESP32 gateway.
+
+    Bulk reads use a framed response so completion is detected from the
+    frame itself rather than from a fixed sleep.  After FORMAT BIN is
+    accepted the records are fixed-width binary frames (see sensor_frame);
+    otherwise the CSV format is used:
+
+        READALL [x1 x2 ...]   ->   BEGIN <n>
+                                   x1,<laser>,<photodiode>,<pir>,<radar>,<seismic>
+                                   ... (n records)
+                                   END
+                              or   BIN <n> followed by n * FRAME_SIZE bytes
+    """
+
+    def __init__(self, ser, timeout=2.0, binary=True):
+        self.channel = CommandChannel(ser, timeout)
+        self.binary = binary and self.send_command("FORMAT BIN") == "FORMAT_OK BIN"
+
+    def close(self):
+        self.channel.close()
+
+    def submit(self, command, stump=None):
+        """Sends a command without waiting; returns a Future for the response.
+
+        `stump` names the stump the command is about; a single link serves
+        them all, so it is only used by GatewayPool for routing.
+        """
+        return self.channel.submit(command)
+
+    def send_command(self, command, stump=None):
+        """Sends a single command and waits for its one-line response"""
+        try:
+            return self.submit(command).result(self.channel.timeout + 1)
+        except (TimeoutError, ConnectionError):
+            return ""
+
+    def read_stumps(self, stumps, store):
+        """Reads every stump (or the given subset) into `store` in one READALL round trip.
+
+        Returns the names of the stumps that were updated.
+        """
+        wanted = list(stumps)
+        try:
+            future = self.channel.submit(" ".join(["READALL"] + wanted), multiline=True)
+            response = future.result(self.channel.timeout + 1)
+        except TimeoutError:
+            print("READALL failed: frame timed out")
+            return []
+        except ConnectionError as e:
+            print(f"READALL failed: {e}")
+            return []
+
+        if isinstance(response, bytes):
+            return store.parse_frames(response, [])
+
+        if not response or not response[0].startswith("BEGIN ") or int(response[0].split()[1]) != len(response) - 1:
+            print(f"READALL failed: malformed frame {response[:1]!r}")
+            return []
+
+        updated = []
+        for record in response[1:]:
+            stump, _, values = record.partition(",")
+            if stump in store:
+                store.set(stump, map(int, values.split(",")))
+                updated.append(stump)
+        return updated
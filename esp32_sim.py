@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+import tty
+
+from sensor_frame import pack_frame
+
+
+class SimulatedESP32:
+    """Local ESP32 stand-in that speaks the gateway protocol over a pseudo-terminal.
+
+    Open `sim.port` with serial.Serial() exactly as you would a real COM port.
+    `read_latency` models the per-stump sampling time on the device and
+    `command_latency` the time a REACTIVATE or LORA_SEND takes to complete.
+    Tagged (`#<seq> ...`) commands are served concurrently, like the
+    firmware's task queue, so their answers may come back out of order.
+    Set `supports_binary=False` to emulate older firmware that only speaks CSV.
+    `reactivate(stump, sensor)`, if set, decides whether REACTIVATE succeeds.
+    """
+
+    def __init__(self, stump_count=4, read_latency=0.0, command_latency=None, supports_binary=True, stumps=None):
+        stumps = stumps or [f"x{i + 1}" for i in range(stump_count)]  # Explicit names for one gateway's shard
+        self.readings = {stump: [1, 1, 1, 1, 1] for stump in stumps}
+        self.supports_binary = supports_binary
+        self.binary = False
+        self.frame_seq = 0
+        self.read_latency = read_latency
+        self.command_latency = command_latency or {}
+        self.reactivate = None
+        self.write_lock = threading.Lock()
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.running = False
+
+    def start(self):
+        """Starts answering commands in a background thread"""
+        self.running = True
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        os.close(self.slave)
+        os.close(self.master)
+
+    def set_reading(self, stump, laser=1, photodiode=1, pir=1, radar=1, seismic=1):
+        """Scripts the values the device will report for a stump"""
+        self.readings[stump] = [laser, photodiode, pir, radar, seismic]
+
+    def _serve(self):
+        pending = b""
+        while self.running:
+            try:
+                chunk = os.read(self.master, 4096)
+            except OSError:
+                break
+            pending += chunk
+            while b"\n" in pending:
+                line, pending = pending.split(b"\n", 1)
+                line = line.decode().strip()
+                if line.startswith("#"):
+                    threading.Thread(target=self._serve_tagged, args=(line,), daemon=True).start()
+                else:
+                    self._write(self.handle(line))
+
+    def _serve_tagged(self, line):
+        tag, _, command = line.partition(" ")
+        response = self.handle(command)
+        if isinstance(response, bytes):
+            self._write(f"{tag} ".encode() + response)  # "BIN <n>\n" header followed by raw frames
+        else:
+            self._write("".join(f"{tag} {part}\n" for part in response.splitlines()))
+
+    def _write(self, response):
+        data = response.encode() if isinstance(response, str) else response
+        with self.write_lock:
+            while data:
+                data = data[os.write(self.master, data):]
+
+    def _record(self, stump):
+        time.sleep(self.read_latency)
+        return ",".join(map(str, self.readings[stump]))
+
+    def _frame(self, stump):
+        time.sleep(self.read_latency)
+        self.frame_seq += 1
+        return pack_frame(int(stump[1:]), self.frame_seq, self.readings[stump])
+
+    def handle(self, command):
+        """Returns the raw response text for one command line"""
+        parts = command.split()
+        if not parts:
+            return ""
+        if parts[0] == "READ" and len(parts) == 2:
+            return self._record(parts[1]) + "\n" if parts[1] in self.readings else "\n"
+        if parts[0] == "READALL":
+            stumps = [s for s in (parts[1:] or self.readings) if s in self.readings]
+            if self.binary:
+                return f"BIN {len(stumps)}\n".encode() + b"".join(self._frame(s) for s in stumps)
+            lines = [f"BEGIN {len(stumps)}"] + [f"{s},{self._record(s)}" for s in stumps] + ["END"]
+            return "\n".join(lines) + "\n"
+        if parts[0] == "FORMAT" and len(parts) == 2:
+            if parts[1] == "BIN" and not self.supports_binary:
+                return "ERR\n"
+            self.binary = parts[1] == "BIN"
+            return f"FORMAT_OK {parts[1]}\n"
+        time.sleep(self.command_latency.get(parts[0], 0.0))
+        if parts[0] == "REACTIVATE":
+            if self.reactivate is not None and len(parts) == 3 and not self.reactivate(parts[1], parts[2]):
+                return "ERR\n"
+            return "OK\n"
+        if parts[0] == "LORA_SEND":
+            return "LORA_OK\n"
+        return "ERR\n"
@@ -0,0 +1,344 @@
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+
+from sensor_frame import CHANNELS, NATIVE_LITTLE_ENDIAN
+
+# Record kinds
+READING, CLASSIFICATION, ALARM, ALARM_OFF, STATE, REROUTE, COMMAND = range(1, 8)
+
+# Fixed 32-byte record: timestamp | stump number (0 = whole network) | kind | code | 16-byte payload
+RECORD = struct.Struct("<dIBB2x16s")
+READING_RECORD = struct.Struct("<dIBB2x5h6x")  # Same layout with the payload as five int16 channel values
+READING_RAW = struct.Struct("<dIBB2x10s6x")  # Channel values copied as little-endian bytes
+PAYLOAD_VALUES = struct.Struct("<5h")
+RECORD_SIZE = RECORD.size
+KIND_OFFSET = 12  # A zero kind byte marks preallocated space never written
+SEGMENT_HEADER = struct.Struct("<8sIIQ")  # magic, record size, segment capacity, records written
+HEADER_SIZE = 64
+MAGIC = b"ALJRNL01"
+
+
+def stump_number(stump):
+    return 0 if stump is None else int(stump[1:])  # "x3" -> 3
+
+
+class NullJournal:
+    """Journal that records nothing (the default when no journal directory is configured)"""
+
+    def record_readings(self, stumps, store, ts=None):
+        pass
+
+    def record(self, kind, stump=None, code=0, text="", ts=None):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Segment:
+    """One preallocated, memory-mapped journal file"""
+
+    def __init__(self, path, capacity, create):
+        self.path = path
+        if create:
+            with open(path, "wb") as f:
+                f.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, record_size, self.capacity, self.count = SEGMENT_HEADER.unpack_from(self.map, 0)
+        if create:
+            self.capacity, self.count = capacity, 0
+            self.write_header()
+        elif magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a journal segment")
+        else:
+            while self.count < self.capacity and self.map[self.offset(self.count) + KIND_OFFSET]:
+                self.count += 1  # Written after the last header update (crash before flush)
+
+    def write_header(self):
+        SEGMENT_HEADER.pack_into(self.map, 0, MAGIC, RECORD_SIZE, self.capacity, self.count)
+
+    def offset(self, i):
+        return HEADER_SIZE + i * RECORD_SIZE
+
+    def close(self):
+        self.write_header()
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+class EventJournal:
+    """Append-only binary journal of readings and events, memory-mapped and rotated by segment.
+
+    Records are fixed 32-byte structs appended in timestamp order to
+    preallocated segment files of `segment_records` records each.  A
+    sparse index keeps the first timestamp of every block of
+    `block_records` records and, per stump, the blocks it appears in, so a
+    range query bisects to the candidate blocks and reads only those.
+    Existing segments in `directory` are reopened and their index rebuilt.
+    Appends are serialized by a lock, so sweep and console threads can
+    record concurrently.
+    """
+
+    def __init__(self, directory, segment_records=1 << 20, block_records=1024, clock=time.time):
+        if segment_records % block_records:
+            raise ValueError("segment_records must be a multiple of block_records")
+        self.directory = directory
+        self.segment_records = segment_records
+        self.block_records = block_records
+        self.clock = clock
+        self.segments = []
+        self.block_ts = array("d")  # First timestamp of every block
+        self.stump_blocks = {}  # stump number -> array of block numbers it appears in
+        self.count = 0
+        self.last_ts = float("-inf")
+        self.lock = threading.Lock()  # Guards the append offset, segment counts and index together
+        os.makedirs(directory, exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".seg"):
+                self._open_segment(os.path.join(directory, name))
+
+    def __len__(self):
+        return self.count
+
+    def _segment_path(self, n):
+        return os.path.join(self.directory, f"journal-{n:06d}.seg")
+
+    def _open_segment(self, path):
+        segment = Segment(path, self.segment_records, create=False)
+        if segment.capacity != self.segment_records:
+            raise ValueError(f"{path} holds {segment.capacity} records per segment, not {self.segment_records}")
+        self.segments.append(segment)
+        base = self.count
+        with memoryview(segment.map)[HEADER_SIZE:segment.offset(segment.count)] as records:
+            with records.cast("d") as times, records.cast("I") as words:
+                stride = RECORD_SIZE // 8
+                self.block_ts.extend(times[::stride * self.block_records])
+                ids = words[2::RECORD_SIZE // 4].tolist()
+                if segment.count:
+                    self.last_ts = times[stride * (segment.count - 1)]
+        for start in range(0, segment.count, self.block_records):
+            block = (base + start) // self.block_records
+            for number in set(ids[start:start + self.block_records]):
+                self.stump_blocks.setdefault(number, array("I")).append(block)
+        self.count += segment.count
+
+    def _active(self):
+        """Segment with room for the next record, rotating to a new file when the last one is full"""
+        if not self.segments or self.segments[-1].count == self.segment_records:
+            if self.segments:
+                self.segments[-1].write_header()
+            self.segments.append(Segment(self._segment_path(len(self.segments)), self.segment_records, create=True))
+        return self.segments[-1]
+
+    def _index_block(self, numbers, ts):
+        """Indexes records for `numbers` appended at `ts`, all within the current block"""
+        block, first = divmod(self.count, self.block_records)
+        if first == 0:
+            self.block_ts.append(ts)
+        stump_blocks = self.stump_blocks
+        for number in numbers:
+            blocks = stump_blocks.get(number)
+            if blocks is None:
+                blocks = stump_blocks[number] = array("I")
+            if not blocks or blocks[-1] != block:
+                blocks.append(block)
+        self.count += len(numbers)
+
+    def _timestamp(self, ts):
+        ts = self.clock() if ts is None else ts
+        if ts < self.last_ts:
+            ts = self.last_ts  # Keep the file in time order so the block index can be bisected
+        self.last_ts = ts
+        return ts
+
+    def record(self, kind, stump=None, code=0, text="", ts=None):
+        """Appends one event; `text` (up to 16 bytes) carries operator commands and similar"""
+        with self.lock:
+            ts = self._timestamp(ts)
+            segment = self._active()
+            number = stump_number(stump)
+            RECORD.pack_into(segment.map, segment.offset(segment.count), ts, number, kind, code,
+                             text.encode() if isinstance(text, str) else text)
+            segment.count += 1
+            self._index_block((number,), ts)
+
+    def record_readings(self, stumps, store, ts=None):
+        """Appends the latest reading of each stump in a SensorStore, all with one timestamp.
+
+        Records are packed a block at a time and copied into the map with
+        one slice assignment, so a sweep costs one pack call per stump.
+        """
+        stumps = list(stumps)
+        with self.lock:
+            ts = self._timestamp(ts)
+            readings = getattr(store, "readings", None) if NATIVE_LITTLE_ENDIAN else None
+            raw = None if readings is None else readings.tobytes()  # One copy, then bytes slices per stump
+            index = getattr(store, "index", None)
+            width = 2 * len(CHANNELS)
+            done = 0
+            while done < len(stumps):
+                segment = self._active()
+                # Fill up to the end of the current block (blocks never span two segments)
+                chunk = stumps[done:done + self.block_records - self.count % self.block_records]
+                numbers = [int(stump[1:]) for stump in chunk]
+                if raw is not None:  # SensorStore: copy each stump's int16 channels straight from its buffer
+                    slots = [index[stump] for stump in chunk]
+                    data = b"".join([READING_RAW.pack(ts, number, READING, 0, raw[slot * width:slot * width + width])
+                                     for slot, number in zip(slots, numbers)])
+                else:
+                    data = b"".join([READING_RECORD.pack(ts, number, READING, 0, *store[stump].values())
+                                     for stump, number in zip(chunk, numbers)])
+                start = segment.offset(segment.count)
+                segment.map[start:start + len(data)] = data
+                segment.count += len(chunk)
+                self._index_block(numbers, ts)
+                done += len(chunk)
+
+    def flush(self):
+        """Writes segment headers and pushes mapped pages to disk"""
+        with self.lock:
+            for segment in self.segments[-1:]:
+                segment.write_header()
+                segment.map.flush()
+
+    def close(self):
+        with self.lock:
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+
+    def _block(self, block):
+        """Raw records of one block (blocks never span two segments)"""
+        first = block * self.block_records
+        segment = self.segments[first // self.segment_records]
+        start = first % self.segment_records
+        stop = min(start + self.block_records, segment.count)
+        return segment.map[segment.offset(start):segment.offset(stop)]
+
+    def query(self, stump=None, t0=float("-inf"), t1=float("inf"), kinds=None):
+        """Yields (ts, stump, kind, code, payload) for records with t0 <= ts <= t1, oldest first.
+
+        Only the blocks whose time span overlaps [t0, t1] and, for a single
+        stump, that hold at least one of its records are read. payload is
+        the channel values of a READING and the text of any other record.
+        """
+        if not self.count:
+            return
+        first = max(bisect.bisect_left(self.block_ts, t0) - 1, 0)
+        last = bisect.bisect_right(self.block_ts, t1) - 1
+        wanted = None if stump is None else stump_number(stump)
+        if wanted is None:
+            blocks = range(first, last + 1)
+        else:
+            candidates = self.stump_blocks.get(wanted, array("I"))
+            blocks = candidates[bisect.bisect_left(candidates, first):bisect.bisect_right(candidates, last)]
+        for block in blocks:
+            for ts, number, kind, code, payload in RECORD.iter_unpack(self._block(block)):
+                if ts > t1:
+                    return
+                if ts < t0 or (wanted is not None and number != wanted) or (kinds is not None and kind not in kinds):
+                    continue
+                name = f"x{number}" if number else None
+                if kind == READING:
+                    yield ts, name, kind, code, PAYLOAD_VALUES.unpack_from(payload)
+                else:
+                    yield ts, name, kind, code, payload.rstrip(b"\0").decode()
+
+    def stump_names(self):
+        """Names of every stump with at least one record"""
+        return [f"x{number}" for number in sorted(self.stump_blocks) if number]
+
+
+class ReplayLink:
+    """Gateway stand-in that serves journaled readings to a network instead of an ESP32.
+
+    read_stumps() returns the batch JournalReplay loaded for the current
+    sweep; commands and LoRa sends succeed at once.
+    """
+
+    binary = True
+
+    def __init__(self, stumps):
+        self.stumps = list(stumps)
+        self.batch = []  # (stump, values) of the sweep being replayed
+        self.commands = 0
+
+    def read_stumps(self, stumps, store):
+        wanted = set(stumps)
+        updated = []
+        for stump, values in self.batch:
+            if stump in wanted and stump in store:
+                store.set(stump, values)
+                updated.append(stump)
+        return updated
+
+    def submit(self, command, stump=None):
+        self.commands += 1
+        future = Future()
+        future.set_result("LORA_OK" if command.startswith("LORA_SEND") else "OK")
+        return future
+
+    def send_command(self, command, stump=None):
+        return self.submit(command, stump).result()
+
+    def close(self):
+        pass
+
+
+class JournalReplay:
+    """Feeds the readings of a journal back through a network's check_stump_status().
+
+    Every group of consecutive READING records sharing a timestamp is one
+    journaled sweep.  Before each sweep the network's duty-cycle clock is
+    set to the journal time and the sweep's stumps are made due, so the
+    detection logic sees the same samples in the same order as the live
+    run did.  With speed=None sweeps run back to back; speed=10 replays
+    ten times faster than real time.
+    """
+
+    def __init__(self, journal, t0=float("-inf"), t1=float("inf")):
+        self.journal = journal
+        self.t0 = t0
+        self.t1 = t1
+        self.now = t0
+        self.link = ReplayLink(journal.stump_names())
+
+    def sweeps(self):
+        """Yields (ts, [(stump, values), ...]) per journaled sweep"""
+        ts, batch = None, []
+        for record_ts, stump, _, _, values in self.journal.query(None, self.t0, self.t1, kinds=(READING,)):
+            if record_ts != ts and batch:
+                yield ts, batch
+                batch = []
+            ts = record_ts
+            batch.append((stump, values))
+        if batch:
+            yield ts, batch
+
+    def run(self, network, speed=None):
+        """Replays every sweep into `network` (built with link=replay.link); returns the sweep count"""
+        sweeps, started, first = 0, time.perf_counter(), None
+        for ts, batch in self.sweeps():
+            if speed is not None:
+                first = ts if first is None else first
+                time.sleep(max((ts - first) / speed - (time.perf_counter() - started), 0))
+            self.now = ts
+            if not sweeps:  # The clock switches at the first journal time, so pending times shift onto it
+                network.duty.set_clock(lambda: self.now)
+            self.link.batch = batch
+            for stump, _ in batch:
+                network.duty.next_due[stump] = ts
+            network.check_stump_status()
+            sweeps += 1
+        return sweeps
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import hal
+from esp32_link import ESP32Link
+
+
+class GatewayPool:
+    """Several ESP32 gateways serving one stump network.
+
+    `shards` maps each gateway's serial port object to the stumps it
+    serves.  Sweeps fan out to one worker per gateway and are merged into
+    the caller's shared store, so a sweep takes as long as the largest
+    shard rather than the whole perimeter.  The pool exposes the same
+    interface as ESP32Link, so StumpSensorNetwork works with either.
+    """
+
+    def __init__(self, shards, timeout=2.0, binary=True):
+        self.ports = list(shards)
+        self.links = [ESP32Link(ser, timeout, binary) for ser in self.ports]
+        self.shards = [list(stumps) for stumps in shards.values()]
+        self.owner = {stump: link for link, stumps in zip(self.links, self.shards) for stump in stumps}
+        self.stumps = [stump for stumps in self.shards for stump in stumps]
+        self.workers = ThreadPoolExecutor(max_workers=len(self.links), thread_name_prefix="gateway")
+
+    @classmethod
+    def open(cls, ports, baud_rate=115200, **kwargs):
+        """Opens {port name: [stumps]} as serial ports and builds the pool"""
+        return cls({hal.open_serial(port, baud_rate, timeout=1): stumps for port, stumps in ports.items()}, **kwargs)
+
+    @property
+    def binary(self):
+        return all(link.binary for link in self.links)
+
+    def close(self):
+        for link in self.links:
+            link.close()
+        self.workers.shutdown()
+
+    def submit(self, command, stump=None):
+        """Sends a command to the gateway serving `stump` (the first gateway if None)"""
+        return self.owner.get(stump, self.links[0]).submit(command)
+
+    def send_command(self, command, stump=None):
+        return self.owner.get(stump, self.links[0]).send_command(command)
+
+    def read_stumps(self, stumps, store):
+        """Reads every requested stump, all gateways in parallel; returns the updated stump names"""
+        wanted = set(stumps)
+        jobs = [self.workers.submit(link.read_stumps, [s for s in shard if s in wanted], store)
+                for link, shard in zip(self.links, self.shards) if any(s in wanted for s in shard)]
+        updated = []
+        for job in jobs:  # Wait for every shard so the sweep sees one consistent snapshot
+            updated += job.result()
+        return updated
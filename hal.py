@@ -0,0 +1,104 @@
+# Hardware abstraction layer: every serial port, pin, ADC, radio, timer and
+# sound device is created through the functions below.  Nothing is imported
+# or opened until the first call, so any module can be imported (and
+# benchmarked) on a machine without the hardware.  The backend is chosen
+# with use("hardware") / use("sim") before the first access, or with the
+# ALAIDS_BACKEND environment variable.
+
+IN, OUT = "in", "out"
+
+try:
+    from os import environ
+    BACKEND = environ.get("ALAIDS_BACKEND", "hardware")
+except ImportError:  # MicroPython has no environment
+    BACKEND = "hardware"
+
+_backend = None
+
+
+class HardwareBackend:
+    """Real devices; each driver module is imported on first use"""
+
+    def open_serial(self, port, baud_rate=115200, timeout=1):
+        import serial
+        return serial.Serial(port, baud_rate, timeout=timeout)
+
+    def pin(self, number, mode=IN):
+        from machine import Pin
+        return Pin(number, Pin.OUT if mode == OUT else Pin.IN)
+
+    def adc(self, number):
+        from machine import ADC, Pin
+        return ADC(Pin(number))
+
+    def spi(self, bus):
+        from machine import SPI
+        return SPI(bus)
+
+    def periodic(self, number, period_ms, callback):
+        from machine import Timer
+        timer = Timer(number)
+        timer.init(period=period_ms, mode=Timer.PERIODIC, callback=callback)
+        return timer
+
+    def lora(self, spi, cs, reset, irq):
+        from lora import LoRa
+        return LoRa(spi=spi, cs=cs, reset=reset, irq=irq)
+
+    def sound_sink(self, **kwargs):
+        from alarm_scheduler import default_sink
+        return default_sink(**kwargs)
+
+
+def use(backend):
+    """Selects "hardware", "sim" or a backend object; affects every device created afterwards"""
+    global BACKEND, _backend
+    if isinstance(backend, str):
+        if backend not in ("hardware", "sim"):
+            raise ValueError(f"Unknown hardware backend {backend!r}")
+        BACKEND, _backend = backend, None
+    else:
+        _backend = backend
+    return backend
+
+
+def backend():
+    """The active backend, created on first use"""
+    global _backend
+    if _backend is None:
+        if BACKEND == "sim":
+            from sim_hardware import SimBackend
+            _backend = SimBackend()
+        else:
+            _backend = HardwareBackend()
+    return _backend
+
+
+def open_serial(port, baud_rate=115200, timeout=1):
+    return backend().open_serial(port, baud_rate, timeout)
+
+
+def pin(number, mode=IN):
+    return backend().pin(number, mode)
+
+
+def adc(number):
+    return backend().adc(number)
+
+
+def spi(bus):
+    return backend().spi(bus)
+
+
+def periodic(number, period_ms, callback):
+    """Calls callback(timer) every period_ms from hardware timer `number`"""
+    return backend().periodic(number, period_ms, callback)
+
+
+def lora(spi, cs, reset, irq):
+    return backend().lora(spi, cs, reset, irq)
+
+
+def sound_sink(**kwargs):
+    """Alarm sound sink for alarm_scheduler.AlarmScheduler"""
+    return backend().sound_sink(**kwargs)
@@ -0,0 +1,77 @@
+from classifier import FALSE_ALARM, classify_code
+from detection_rules import BEAM_RULES
+from rule_table import RuleTable
+
+# Events returned by FusionTracker.update
+RAISED, CLEARED = "raised", "cleared"
+
+BEAM_TABLE = RuleTable(*BEAM_RULES)
+
+
+def beam_score(reading):
+    """1 when the laser beam is interrupted (laser or photodiode reads 0)"""
+    return BEAM_TABLE.lookup(reading)  # BEAM_BROKEN == 1
+
+
+def intrusion_score(reading):
+    """Fused evidence of one sample: 1 if PIR/radar/seismic rule out a false alarm, plus 1 for a broken beam"""
+    score = 1 if classify_code(reading) != FALSE_ALARM else 0
+    return score + beam_score(reading)
+
+
+class StumpFusion:
+    """Sliding-window evidence total and confirmed flag of one stump"""
+
+    __slots__ = ("scores", "pos", "total", "confirmed")
+
+    def __init__(self, window):
+        self.scores = bytearray(window)  # Ring of the last `window` sample scores
+        self.pos = 0
+        self.total = 0
+        self.confirmed = False
+
+
+class FusionTracker:
+    """Per-stump temporal fusion of sensor samples with hysteresis.
+
+    Each sample is scored by `score` and added to a sliding window of the
+    last `window` samples; the running total is updated in O(1).  A stump
+    is confirmed (RAISED) once the total reaches `confirm` and only clears
+    (CLEARED) when it falls to `clear` or below, so a noisy sample inside
+    an event or between events never emits a second alarm.
+    """
+
+    def __init__(self, stumps, score=intrusion_score, window=5, confirm=3, clear=1):
+        if not 0 <= clear < confirm:
+            raise ValueError("Fusion thresholds need 0 <= clear < confirm")
+        self.score = score
+        self.window = window
+        self.confirm = confirm
+        self.clear = clear
+        self.states = {stump: StumpFusion(window) for stump in stumps}
+
+    def update(self, stump, reading):
+        """Feeds one sample; returns RAISED or CLEARED on a state change, else None"""
+        state = self.states[stump]
+        score = min(self.score(reading), 255)
+        state.total += score - state.scores[state.pos]
+        state.scores[state.pos] = score
+        state.pos = (state.pos + 1) % self.window
+        if not state.confirmed and state.total >= self.confirm:
+            state.confirmed = True
+            return RAISED
+        if state.confirmed and state.total <= self.clear:
+            state.confirmed = False
+            return CLEARED
+        return None
+
+    def reset(self, stump):
+        """Forgets a stump's window, e.g. after the operator restores it"""
+        self.states[stump] = StumpFusion(self.window)
+
+    def is_confirmed(self, stump):
+        return self.states[stump].confirmed
+
+    def evidence(self, stump):
+        """Evidence total over a stump's current window (nonzero means something is being seen)"""
+        return self.states[stump].total
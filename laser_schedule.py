@@ -0,0 +1,56 @@
+def count_pairings(transmitters, receivers):
+    """Number of ways to give every transmitter its own receiver: r! / (r - t)!"""
+    total = 1
+    for i in range(transmitters):
+        total *= receivers - i
+    return total
+
+
+def unrank_pairing(k, transmitters, receivers):
+    """Receiver index for each transmitter in the k-th pairing (lexicographic order).
+
+    Decodes k in the mixed-radix system (r, r-1, ..., r-t+1); O(t) memory
+    and no enumeration of the pairings before it.
+    """
+    radices = [receivers - i for i in range(transmitters)]
+    digits = [0] * transmitters
+    for i in range(transmitters - 1, -1, -1):
+        k, digits[i] = divmod(k, radices[i])
+    free = list(range(receivers))
+    return [free.pop(digit) for digit in digits]
+
+
+class LaserScheduler:
+    """Index-addressable schedule of transmitter -> receiver pairings.
+
+    order="lexicographic" walks every pairing, the k-th computed on demand.
+    order="coverage" uses cyclic shifts (tx i -> rx (i + k) mod r), so every
+    tx -> rx link is exercised once in every r consecutive steps.
+    """
+
+    def __init__(self, transmitters, receivers, order="lexicographic"):
+        if len(transmitters) > len(receivers):
+            raise ValueError("Each transmitter needs its own receiver")
+        if order not in ("lexicographic", "coverage"):
+            raise ValueError(f"Unknown laser schedule order {order!r}")
+        self.transmitters = list(transmitters)
+        self.receivers = list(receivers)
+        self.order = order
+
+    def __len__(self):
+        if self.order == "coverage":
+            return len(self.receivers)
+        return count_pairings(len(self.transmitters), len(self.receivers))
+
+    def __getitem__(self, k):
+        if not 0 <= k < len(self):
+            raise IndexError("laser schedule index out of range")
+        if self.order == "coverage":
+            count = len(self.receivers)
+            targets = [(i + k) % count for i in range(len(self.transmitters))]
+        else:
+            targets = unrank_pairing(k, len(self.transmitters), len(self.receivers))
+        return tuple((tx, self.receivers[rx]) for tx, rx in zip(self.transmitters, targets))
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self)))
@@ -0,0 +1,167 @@
+from array import array
+
+try:
+    from micropython import schedule
+except ImportError:  # CPython: fake radios call the handler from an ordinary thread
+    def schedule(callback, arg):
+        callback(arg)
+
+try:
+    from _thread import allocate_lock
+except ImportError:  # Port without threads: scheduled callbacks and the main loop share one thread
+    class allocate_lock:
+        """Non-blocking stand-in for a lock; enough when nothing runs truly in parallel"""
+
+        def __init__(self):
+            self.held = False
+
+        def acquire(self, blocking=True):
+            if self.held:
+                return False
+            self.held = True
+            return True
+
+        def release(self):
+            self.held = False
+
+
+class PacketRing:
+    """Bounded FIFO of received packets in preallocated slots.
+
+    Single producer (the radio service) and single consumer (the
+    dispatcher) each move only their own index, so no lock is needed.
+    One slot is kept free to tell a full ring from an empty one.
+    Packets that do not fit, or arrive while the ring is full, are counted
+    in `dropped`.
+    """
+
+    def __init__(self, capacity=16, packet_size=256):
+        self.slots = [bytearray(packet_size) for _ in range(capacity + 1)]
+        self.lengths = array("H", [0] * (capacity + 1))
+        self.head = 0  # Next slot to read
+        self.tail = 0  # Next slot to write
+        self.dropped = 0
+
+    def __len__(self):
+        return (self.tail - self.head) % len(self.slots)
+
+    def put(self, packet):
+        """Copies one packet in; returns False if it was dropped"""
+        nxt = (self.tail + 1) % len(self.slots)
+        if nxt == self.head or len(packet) > len(self.slots[self.tail]):
+            self.dropped += 1
+            return False
+        n = len(packet)
+        memoryview(self.slots[self.tail])[:n] = packet
+        self.lengths[self.tail] = n
+        self.tail = nxt
+        return True
+
+    def get(self):
+        """Oldest packet as bytes, or None when empty"""
+        if self.head == self.tail:
+            return None
+        packet = bytes(memoryview(self.slots[self.head])[:self.lengths[self.head]])
+        self.head = (self.head + 1) % len(self.slots)
+        return packet
+
+
+class PacketDispatcher:
+    """Routes queued packets to handlers by keyword, in registration order"""
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.handlers = []  # (keyword, handler, prefix only)
+        self.unhandled = 0
+
+    def on(self, keyword, handler, prefix=True):
+        """Calls handler(packet) for packets starting with (or, with prefix=False, containing) keyword"""
+        self.handlers.append((keyword, handler, prefix))
+
+    def dispatch(self):
+        """Handles every queued packet; returns how many were taken off the ring"""
+        count = 0
+        while True:
+            packet = self.ring.get()
+            if packet is None:
+                return count
+            count += 1
+            for keyword, handler, prefix in self.handlers:
+                if packet.startswith(keyword) if prefix else keyword in packet:
+                    handler(packet)
+                    break
+            else:
+                self.unhandled += 1
+
+
+class LoRaReceiver:
+    """Interrupt-driven LoRa reception.
+
+    The radio's DIO0 pin raises an interrupt when a packet is ready.  The
+    handler only schedules `service` (micropython.schedule runs it soon
+    after, even while the main loop is blocked in input()).  `service`
+    drains the radio into the ring and runs the dispatcher.  Calling
+    `service` from the main loop as well covers a full schedule queue.
+
+    Only one `service` runs at a time, so the ring keeps a single producer
+    and a single consumer and each packet is dispatched once.  A call that
+    finds it busy (a scheduled call landing inside the main loop's, or a
+    simulated radio's delivering thread) leaves the work to the running
+    one, which loops until nothing is left.  Other radio use, such as
+    sending, goes through `exclusive` so SPI transfers never interleave.
+    `replies`, if given, runs after each dispatch with the radio still
+    held, so answers to the packets just handled go out without waiting
+    for the main loop.
+    """
+
+    def __init__(self, lora, irq_pin, ring, dispatcher=None, replies=None):
+        self.lora = lora
+        self.ring = ring
+        self.dispatcher = dispatcher
+        self.replies = replies
+        self.interrupts = 0
+        self.lock = allocate_lock()
+        self.again = False  # Set by a service call that found the lock taken
+        self._service = self.service  # Bound once: the interrupt handler must not allocate
+        irq_pin.irq(handler=self._on_irq, trigger=irq_pin.IRQ_RISING)
+
+    def _on_irq(self, pin):
+        self.interrupts += 1
+        try:
+            schedule(self._service, None)
+        except RuntimeError:  # Schedule queue full; the main loop's service() call picks it up
+            pass
+
+    def service(self, _=None):
+        """Moves every packet waiting in the radio into the ring, then dispatches them"""
+        while True:
+            if not self.lock.acquire(False):
+                self.again = True  # The running call picks our packets up
+                return
+            try:
+                self.again = False
+                self._drain()
+            finally:
+                self.lock.release()
+            if not self.again:
+                return
+
+    def exclusive(self, action, *args):
+        """Runs action(*args) with the radio to itself (e.g. an uplink send); returns its result"""
+        self.lock.acquire()
+        try:
+            result = action(*args)
+        finally:
+            self.lock.release()
+        if self.again:
+            self.service()  # A packet arrived meanwhile
+        return result
+
+    def _drain(self):
+        while True:
+            packet = self.lora.receive()
+            if not packet:
+                break
+            self.ring.put(packet)
+        if self.dispatcher is not None and self.dispatcher.dispatch() and self.replies is not None:
+            self.replies()
@@ -0,0 +1,221 @@
+import struct
+
+try:
+    from time import ticks_add, ticks_diff, ticks_ms
+except ImportError:  # CPython
+    import time
+
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_add(a, b):
+        return a + b
+
+    def ticks_diff(a, b):
+        return a - b
+
+# Stump states, 2 bits each in a status bitmap
+STATES = ("active", "off", "destroyed")
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# Coalesced stump commands
+OPS = ("DESTROY", "OFF", "RESTORE", "ALARM_OFF")
+OP_CODES = {op: code + 1 for code, op in enumerate(OPS)}
+
+# Message types carried inside a (possibly fragmented) packet
+MSG_FULL, MSG_DELTA, MSG_EVENTS = 1, 2, 3
+
+MARKER = 0xB5  # First byte of every binary packet; text packets never start with it
+HEADER = "<BBBB"  # marker, message id, fragment index, fragment count (MicroPython's struct has no Struct class)
+HEADER_SIZE = 4
+MAX_PAYLOAD = 240  # Conservative SX127x frame budget
+UNACKED_REPORTS = 8  # Reports remembered while waiting for an ACK
+
+
+def stump_number(stump):
+    return int(stump[1:])  # "x7" -> 7
+
+
+def pack_bitmap(states, count):
+    """Packs {stump: state} into 2 bits per stump, stump N at position N-1"""
+    bitmap = bytearray((count + 3) // 4)
+    for stump, state in states.items():
+        i = stump_number(stump) - 1
+        bitmap[i >> 2] |= STATE_CODES[state] << ((i & 3) << 1)
+    return bitmap
+
+
+def unpack_bitmap(bitmap, count):
+    return {f"x{i + 1}": STATES[(bitmap[i >> 2] >> ((i & 3) << 1)) & 3] for i in range(count)}
+
+
+def fragment(message_id, body, max_payload=MAX_PAYLOAD):
+    """Splits a message body into LoRa-sized packets"""
+    chunk = max_payload - HEADER_SIZE
+    count = max(1, (len(body) + chunk - 1) // chunk)
+    if count > 255:
+        raise ValueError("Message too large to fragment")
+    return [struct.pack(HEADER, MARKER, message_id, i, count) + body[i * chunk:(i + 1) * chunk] for i in range(count)]
+
+
+class Reassembler:
+    """Collects fragments back into complete message bodies"""
+
+    def __init__(self):
+        self.partial = {}  # message id -> [fragments]
+
+    def add(self, packet):
+        """Returns the full message body once its last fragment arrives, else None"""
+        _, message_id, index, count = struct.unpack_from(HEADER, packet, 0)
+        if count == 1:
+            return bytes(packet[HEADER_SIZE:])
+        parts = self.partial.get(message_id)
+        if parts is None or len(parts) != count:
+            parts = self.partial[message_id] = [None] * count
+        parts[index] = bytes(packet[HEADER_SIZE:])
+        if None in parts:
+            return None
+        del self.partial[message_id]
+        return b"".join(parts)
+
+
+def decode_message(body, states, applied_seq=None):
+    """Applies the status records in a message body to `states`.
+
+    `applied_seq` is the seq of the report `states` currently reflects.  A
+    delta is only applied on top of its own base report; one against any
+    other base is skipped, since a lost packet would otherwise corrupt the
+    state silently.  Returns (seq to acknowledge or None if the body had no
+    status record, [(op, stump), ...] commands).  After a skipped delta the
+    seq to acknowledge is `applied_seq`, which tells the sender to compute
+    deltas against it, or to send a full report if it no longer has it.
+    """
+    status_seq, events, offset = None, [], 0
+    while offset < len(body):
+        kind, seq = struct.unpack_from("<BH", body, offset)
+        if kind == MSG_FULL:
+            count = struct.unpack_from("<H", body, offset + 3)[0]
+            size = 5 + (count + 3) // 4
+            states.update(unpack_bitmap(body[offset + 5:offset + size], count))
+            status_seq = applied_seq = seq
+        elif kind == MSG_DELTA:
+            base_seq, n = struct.unpack_from("<HH", body, offset + 3)
+            if base_seq == applied_seq:
+                for i in range(n):
+                    number, code = struct.unpack_from("<HB", body, offset + 7 + 3 * i)
+                    states[f"x{number}"] = STATES[code]
+                applied_seq = seq
+            size = 7 + 3 * n
+            status_seq = applied_seq
+        elif kind == MSG_EVENTS:
+            n = body[offset + 3]
+            for i in range(n):
+                code, number = struct.unpack_from("<BH", body, offset + 4 + 3 * i)
+                events.append((OPS[code - 1], f"x{number}"))
+            size = 4 + 3 * n
+        else:
+            break  # Unknown record type; nothing after it can be trusted
+        offset += size
+    return status_seq, events
+
+
+class LoRaUplink:
+    """Outbound LoRa layer for the base camp.
+
+    Commands and status requests are coalesced over `window_ms` into one
+    message.  Status reports go out as a 2-bit-per-stump bitmap or, once the
+    stumps have acknowledged a report, as a delta against that report
+    (whichever is smaller).  The delta is the stump_state.StumpStateTable's
+    dirty set, so building a report costs O(changed stumps); an ACK hands
+    the report's records back to the table, which clears the stumps that
+    have not changed again since.  Messages larger than one frame are
+    fragmented.
+    """
+
+    def __init__(self, lora, stump_count, window_ms=200, max_payload=MAX_PAYLOAD):
+        self.lora = lora
+        self.stump_count = stump_count
+        self.window_ms = window_ms
+        self.max_payload = max_payload
+        self.events = []
+        self.status = None  # StumpStateTable waiting to be reported, encoded when the packet goes out
+        self.deadline = None
+        self.seq = 0
+        self.message_id = 0
+        self.sent = {}  # seq -> (table, delta records it covered), until acknowledged
+        self.acked = None  # seq of the last acknowledged report
+
+    def _arm(self):
+        if self.deadline is None:
+            self.deadline = ticks_add(ticks_ms(), self.window_ms)
+
+    def queue_event(self, op, stump):
+        """Queues a stump command to go out with the next coalesced packet"""
+        self.events.append((OP_CODES[op], stump_number(stump)))
+        self._arm()
+
+    def queue_status(self, states):
+        """Queues a status report of a StumpStateTable; repeated requests inside one window share a packet"""
+        self.status = states
+        self._arm()
+
+    def acknowledge(self, seq):
+        """Stumps confirmed report `seq`; later deltas are computed against it"""
+        report = self.sent.pop(seq, None)
+        if report is not None:
+            table, records = report
+            table.acknowledge(records)
+            self.acked = seq
+        elif self.acked is not None and self.acked != seq:
+            self.acked = None  # The stumps hold a report no longer tracked here; the next one goes out in full
+
+    def poll(self):
+        """Flushes the pending packet once its coalescing window has elapsed; returns the bytes sent"""
+        if self.deadline is not None and ticks_diff(ticks_ms(), self.deadline) >= 0:
+            return self.flush()
+        return 0
+
+    def flush(self):
+        """Sends everything pending now as one message; returns the number of bytes put on air"""
+        body = b""
+        for start in range(0, len(self.events), 255):  # An EVENTS record holds at most 255 commands
+            batch = self.events[start:start + 255]
+            body += struct.pack("<BHB", MSG_EVENTS, self._next_seq(), len(batch))
+            body += b"".join(struct.pack("<BH", op, number) for op, number in batch)
+        if self.status is not None:
+            body += self.encode_status(self.status)
+        self.events = []
+        self.status = None
+        self.deadline = None
+        return self._send(body) if body else 0
+
+    def encode_status(self, table):
+        """One status record: a delta of the table's dirty stumps against the acknowledged report, or a full bitmap.
+
+        The dirty set holds every stump changed since the stumps last
+        acknowledged a report (alarm-only changes repeat the unchanged
+        state), so a delta is always complete against `acked`.
+        """
+        seq = self._next_seq()
+        records = table.delta()
+        self.sent[seq] = (table, records)
+        if len(self.sent) > UNACKED_REPORTS:
+            # Never acknowledged; stop tracking the oldest (by age, so 16-bit wraparound is harmless)
+            del self.sent[max(self.sent, key=lambda s: (seq - s) & 0xFFFF)]
+        if self.acked is not None:
+            changed = [(stump_number(table.names[slot]), value & 3) for slot, value in table.records(records)]
+            if 7 + 3 * len(changed) < 5 + (self.stump_count + 3) // 4:
+                delta = struct.pack("<BHHH", MSG_DELTA, seq, self.acked, len(changed))
+                return delta + b"".join(struct.pack("<HB", number, code) for number, code in changed)
+        return struct.pack("<BHH", MSG_FULL, seq, self.stump_count) + pack_bitmap(table, self.stump_count)
+
+    def _next_seq(self):
+        self.seq = (self.seq + 1) & 0xFFFF
+        return self.seq
+
+    def _send(self, body):
+        self.message_id = (self.message_id + 1) & 0xFF
+        packets = fragment(self.message_id, body, self.max_payload)
+        for packet in packets:
+            self.lora.send(packet)
+        return sum(len(p) for p in packets)
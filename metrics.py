@@ -0,0 +1,298 @@
+import json
+import os
+
+try:
+    from time import monotonic, perf_counter
+except ImportError:  # MicroPython
+    from time import ticks_ms, ticks_us
+
+    def perf_counter():
+        return ticks_us() / 1000000  # Wraps every ~18 minutes; a span across the wrap is dropped
+
+    def monotonic():
+        return ticks_ms() / 1000
+
+try:
+    from bisect import bisect_left
+except ImportError:  # MicroPython
+    def bisect_left(bounds, value):
+        lo, hi = 0, len(bounds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bounds[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+# Upper bounds in seconds, from a sub-millisecond serial round trip to a 10 s detection delay
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def read(self):
+        return self.value
+
+
+class Gauge:
+    """Value that goes up and down; with `fn` it is read from the callback at export time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help="", fn=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, n=1):
+        self.value += n
+
+    def dec(self, n=1):
+        self.value -= n
+
+    def read(self):
+        return self.value if self.fn is None else self.fn()
+
+
+class Histogram:
+    """Fixed-bucket distribution (Prometheus `le` semantics): one bisect and two adds per observation"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help="", buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        if value < 0:
+            return
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def observe_since(self, start):
+        """Observes the seconds elapsed since a perf_counter() reading"""
+        self.observe(perf_counter() - start)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None if empty or beyond the last bucket)"""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return None
+
+    def read(self):
+        return {"buckets": dict(zip(self.buckets, self.counts)), "inf": self.counts[-1],
+                "sum": self.sum, "count": self.count}
+
+
+class NullMetric:
+    """Stand-in for every metric type when metrics are disabled; each call is an empty method"""
+
+    def inc(self, n=1):
+        pass
+
+    def dec(self, n=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def observe_since(self, start):
+        pass
+
+
+NULL_METRIC = NullMetric()
+
+
+class Registry:
+    """Named counters, gauges and histograms with Prometheus-text and JSON export.
+
+    Metrics are plain attribute updates with no locking, so a hot path pays
+    one method call per update.  Asking twice for the same name returns
+    the same metric.
+    """
+
+    enabled = True
+
+    def __init__(self, prefix="alaids_"):
+        self.prefix = prefix
+        self.metrics = {}
+
+    def _get(self, cls, name, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help="", fn=None):
+        return self._get(Gauge, name, help, fn)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help, buckets)
+
+    def snapshot(self):
+        """Every metric's current value as a JSON-ready dict"""
+        return {name: metric.read() for name, metric in self.metrics.items()}
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for name, metric in self.metrics.items():
+            full = self.prefix + name
+            if metric.help:
+                lines.append(f"# HELP {full} {metric.help}")
+            lines.append(f"# TYPE {full} {metric.kind}")
+            if metric.kind != "histogram":
+                lines.append(f"{full} {metric.read()}")
+                continue
+            seen = 0
+            for bound, count in zip(metric.buckets, metric.counts):
+                seen += count
+                lines.append(f'{full}_bucket{{le="{bound}"}} {seen}')
+            lines.append(f'{full}_bucket{{le="+Inf"}} {metric.count}')
+            lines.append(f"{full}_sum {metric.sum}")
+            lines.append(f"{full}_count {metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+class NullRegistry:
+    """Disabled metrics: every metric is NULL_METRIC and exports are empty"""
+
+    enabled = False
+
+    def counter(self, name, help=""):
+        return NULL_METRIC
+
+    def gauge(self, name, help="", fn=None):
+        return NULL_METRIC
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        return NULL_METRIC
+
+    def snapshot(self):
+        return {}
+
+    def to_json(self):
+        return "{}"
+
+    def prometheus(self):
+        return ""
+
+
+NULL_REGISTRY = NullRegistry()
+
+
+def serve_prometheus(registry, port=9108, host="127.0.0.1"):
+    """Serves /metrics (Prometheus text) and /metrics.json from a daemon thread; returns the server.
+
+    Binds to localhost by default. Call server.shutdown() to stop it.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path in ("/", "/metrics"):
+                body, content_type = registry.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = registry.to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the console
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class JsonSnapshots:
+    """Writes the registry as JSON to `path` every `interval` seconds.
+
+    Call poll() from an existing loop (works on MicroPython) or start() for
+    a background thread. Each write goes to a temporary file that is then
+    renamed over `path`, so readers never see a partial snapshot.
+    """
+
+    def __init__(self, registry, path, interval=60.0, clock=monotonic):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self.next_write = clock()
+        self.stopped = None
+
+    def write(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.registry.to_json())
+        getattr(os, "replace", os.rename)(tmp, self.path)
+
+    def poll(self, now=None):
+        """Writes a snapshot if one is due; returns True if it did"""
+        now = self.clock() if now is None else now
+        if now < self.next_write:
+            return False
+        self.next_write = now + self.interval
+        self.write()
+        return True
+
+    def start(self):
+        import threading
+        self.stopped = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.stopped is not None:
+            self.stopped.set()
+        self.write()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.write()
+            self.stopped.wait(self.interval)
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+
+class MonitorRuntime:
+    """Asyncio runtime that keeps stump sweeps, alarms and the operator console independent.
+
+    The network object supplies the work:
+      check_stump_status()  - one sensor sweep (blocking serial I/O, run in a worker thread)
+      display_status()      - status print after each sweep
+      sound_alarm()         - one alarm tick, called every `alarm_interval` seconds
+      next_combination()    - advances the laser transmitter/receiver pairing
+      handle_command(text)  - applies an operator command, returns False on 'exit'
+      next_sweep_delay()    - optional; seconds until the next sweep (duty-cycled networks)
+      next_laser_delay()    - optional; seconds until the next laser pairing change
+
+    Without next_sweep_delay, sweeps start on a fixed `sweep_interval`
+    cadence regardless of what the operator is doing, so detection latency
+    is bounded by sweep_interval + one sweep duration.  An exception in
+    any task is logged and that iteration skipped; monitoring carries on.
+    """
+
+    def __init__(self, network, sweep_interval=5.0, alarm_interval=1.0, laser_interval=1.0,
+                 prompt="Enter 'stop_alarm', 'restore x#', or 'exit': "):
+        self.network = network
+        self.sweep_interval = sweep_interval
+        self.alarm_interval = alarm_interval
+        self.laser_interval = laser_interval
+        self.prompt = prompt
+        self.commands = None  # asyncio.Queue of operator commands, created inside the loop
+        self.stopped = None
+
+    def submit_command(self, text):
+        """Queues an operator command from any thread without blocking"""
+        self.loop.call_soon_threadsafe(self.commands.put_nowait, text.strip().lower())
+
+    async def sweep_loop(self):
+        next_sweep = self.loop.time()
+        adaptive = getattr(self.network, "next_sweep_delay", None)
+        while True:
+            try:
+                await self.loop.run_in_executor(None, self.network.check_stump_status)
+                self.network.display_status()
+            except Exception as e:
+                print(f"ERROR! Sweep failed: {e!r}")
+            if adaptive is not None:  # The network's duty-cycle scheduler picks the cadence
+                await asyncio.sleep(adaptive())
+                continue
+            next_sweep += self.sweep_interval
+            delay = next_sweep - self.loop.time()
+            if delay < 0:
+                print(f"WARNING! Sweep overran its {self.sweep_interval}s cadence by {-delay:.2f}s")
+                next_sweep = self.loop.time()
+            await asyncio.sleep(max(delay, 0))
+
+    async def periodic(self, action, interval):
+        while True:
+            try:
+                action()
+            except Exception as e:
+                print(f"ERROR! {action.__name__} failed: {e!r}")
+            await asyncio.sleep(interval() if callable(interval) else interval)
+
+    async def command_loop(self):
+        while True:
+            command = await self.commands.get()
+            try:
+                running = self.network.handle_command(command)
+            except Exception as e:
+                print(f"ERROR! Command {command!r} failed: {e!r}")
+                continue
+            if not running:
+                self.stopped.set()
+                return
+
+    def _read_console(self):
+        """Blocking console reader; lives in its own daemon thread so input() never stalls the loop"""
+        while not self.stopped.is_set():
+            try:
+                line = input(self.prompt)
+            except EOFError:
+                line = "exit"
+            self.submit_command(line)
+            if line.strip().lower() == "exit":
+                return
+
+    async def run(self, console=True):
+        self.loop = asyncio.get_running_loop()
+        self.commands = asyncio.Queue()
+        self.stopped = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self.sweep_loop()),
+            asyncio.create_task(self.periodic(self.network.sound_alarm, self.alarm_interval)),
+            asyncio.create_task(self.periodic(self.network.next_combination,
+                                              getattr(self.network, "next_laser_delay", self.laser_interval))),
+            asyncio.create_task(self.command_loop()),
+        ]
+        if console:
+            threading.Thread(target=self._read_console, daemon=True).start()
+
+        await self.stopped.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,195 @@
+import math
+
+
+class SpatialGrid:
+    """Uniform grid spatial index over stump coordinates"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> set of stumps
+        self.points = {}
+
+    def _cell(self, point):
+        return int(point[0] // self.cell_size), int(point[1] // self.cell_size)
+
+    def __len__(self):
+        return len(self.points)
+
+    def insert(self, stump, point):
+        self.points[stump] = point
+        self.cells.setdefault(self._cell(point), set()).add(stump)
+
+    def remove(self, stump):
+        point = self.points.pop(stump)
+        cell = self._cell(point)
+        self.cells[cell].discard(stump)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def within(self, point, radius):
+        """Stumps within `radius` of `point`"""
+        cx, cy = self._cell(point)
+        reach = int(radius // self.cell_size) + 1
+        found = []
+        for x in range(cx - reach, cx + reach + 1):
+            for y in range(cy - reach, cy + reach + 1):
+                for stump in self.cells.get((x, y), ()):
+                    if math.dist(point, self.points[stump]) <= radius:
+                        found.append(stump)
+        return found
+
+    def nearest(self, point):
+        """Closest stump to `point` (searches outward ring by ring), or None if empty"""
+        if not self.points:
+            return None
+        cx, cy = self._cell(point)
+        best, best_dist, ring = None, math.inf, 0
+        while best is None or (ring - 1) * self.cell_size < best_dist:
+            for x in range(cx - ring, cx + ring + 1):
+                for y in range(cy - ring, cy + ring + 1):
+                    if max(abs(x - cx), abs(y - cy)) != ring:
+                        continue  # Only the cells on this ring's border are new
+                    for stump in self.cells.get((x, y), ()):
+                        dist = math.dist(point, self.points[stump])
+                        if dist < best_dist:
+                            best, best_dist = stump, dist
+            ring += 1
+        return best
+
+
+class PerimeterRoute:
+    """Closed perimeter loop over stump coordinates with incremental repair.
+
+    The base tour over every stump is built once (nearest-neighbour, then
+    2-opt over each stump's nearest neighbours).  The live route is a
+    doubly-linked ring of the active stumps: dropping a stump splices its
+    neighbours together and restoring it re-inserts it at its base-tour
+    position, both in O(1) plus the run of adjacent offline stumps.  Links
+    longer than `max_link` are tracked in `gaps`.
+    """
+
+    def __init__(self, coordinates, max_link=math.inf, cell_size=None, neighbours=8, two_opt_passes=2):
+        self.coordinates = dict(coordinates)
+        self.max_link = max_link
+        if cell_size is None:
+            cell_size = self._default_cell_size()
+        self.index = SpatialGrid(cell_size)
+        for stump, point in self.coordinates.items():
+            self.index.insert(stump, point)
+
+        order = self._nearest_neighbour_tour()
+        self._two_opt(order, neighbours, two_opt_passes)
+        self.base_next = {a: b for a, b in zip(order, order[1:] + order[:1])}
+        self.base_prev = {b: a for a, b in self.base_next.items()}
+
+        self.next = dict(self.base_next)
+        self.prev = dict(self.base_prev)
+        self.head = order[0] if order else None
+        self.length = sum(self.distance(a, b) for a, b in self.next.items())
+        self.gaps = {(a, b) for a, b in self.next.items() if self.distance(a, b) > self.max_link}
+
+    def _default_cell_size(self):
+        xs = [p[0] for p in self.coordinates.values()] or [0]
+        ys = [p[1] for p in self.coordinates.values()] or [0]
+        area = max(max(xs) - min(xs), 1) * max(max(ys) - min(ys), 1)
+        return max(math.sqrt(area / max(len(self.coordinates), 1)), 1e-9) * 2
+
+    def distance(self, a, b):
+        return math.dist(self.coordinates[a], self.coordinates[b])
+
+    def _nearest_neighbour_tour(self):
+        unvisited = SpatialGrid(self.index.cell_size)
+        for stump, point in self.coordinates.items():
+            unvisited.insert(stump, point)
+        current = next(iter(self.coordinates), None)
+        order = []
+        while current is not None:
+            order.append(current)
+            unvisited.remove(current)
+            current = unvisited.nearest(self.coordinates[current])
+        return order
+
+    def _two_opt(self, order, neighbours, passes):
+        """2-opt restricted to each stump's nearest neighbours"""
+        if len(order) < 4:
+            return
+        radius = self.index.cell_size
+        candidates = {}
+        for stump, point in self.coordinates.items():
+            near = sorted(self.index.within(point, radius), key=lambda s: math.dist(point, self.coordinates[s]))
+            candidates[stump] = near[1:neighbours + 1]
+        position = {stump: i for i, stump in enumerate(order)}
+        n = len(order)
+        for _ in range(passes):
+            improved = False
+            for i in range(n):
+                a, b = order[i], order[(i + 1) % n]
+                for c in candidates[a]:
+                    j = position[c]
+                    d = order[(j + 1) % n]
+                    if c == b or d == a:
+                        continue
+                    delta = self.distance(a, c) + self.distance(b, d) - self.distance(a, b) - self.distance(c, d)
+                    if delta < -1e-9:
+                        lo, hi = (i + 1, j) if i < j else (j + 1, i)
+                        order[lo:hi + 1] = reversed(order[lo:hi + 1])
+                        for k in range(lo, hi + 1):
+                            position[order[k]] = k
+                        a, b = order[i], order[(i + 1) % n]
+                        improved = True
+            if not improved:
+                break
+
+    def __len__(self):
+        return len(self.next)
+
+    def _link(self, a, b):
+        self.next[a] = b
+        self.prev[b] = a
+        self.length += self.distance(a, b)
+        if self.distance(a, b) > self.max_link:
+            self.gaps.add((a, b))
+
+    def _unlink(self, a, b):
+        self.length -= self.distance(a, b)
+        self.gaps.discard((a, b))
+
+    def drop(self, stump):
+        """Removes a stump from the live route and splices its neighbours"""
+        if stump not in self.next:
+            return
+        before, after = self.prev.pop(stump), self.next.pop(stump)
+        self._unlink(before, stump)
+        self._unlink(stump, after)
+        if before == stump:  # It was the only stump left
+            self.head = None
+            return
+        if self.head == stump:
+            self.head = after
+        self._link(before, after)
+
+    def restore(self, stump):
+        """Re-inserts a stump at its base-tour position"""
+        if stump in self.next or stump not in self.base_next:
+            return
+        if not self.next:
+            self.next[stump] = self.prev[stump] = stump
+            self.head = stump
+            return
+        before = self.base_prev[stump]
+        while before not in self.next:
+            before = self.base_prev[before]
+        after = self.next[before]
+        self._unlink(before, after)
+        self._link(before, stump)
+        self._link(stump, after)
+
+    def route(self):
+        """Active stumps in loop order, closing back on the first one"""
+        if self.head is None:
+            return []
+        stumps, stump = [self.head], self.next[self.head]
+        while stump != self.head:
+            stumps.append(stump)
+            stump = self.next[stump]
+        return stumps + [self.head]
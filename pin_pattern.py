@@ -0,0 +1,47 @@
+from lora_uplink import ticks_add, ticks_diff, ticks_ms
+
+
+class PinPattern:
+    """Non-blocking on/off blink pattern for a set of output pins (buzzer, LED).
+
+    start() switches the pins on and returns at once; tick() advances the
+    pattern when a phase has elapsed and is meant to be called from a
+    periodic machine.Timer or the main loop.
+    """
+
+    def __init__(self, pins, on_ms=500, off_ms=500):
+        self.pins = list(pins)
+        self.on_ms = on_ms
+        self.off_ms = off_ms
+        self.phases = 0  # Phases left, counting the current one
+        self.lit = False
+        self.deadline = 0
+
+    @property
+    def active(self):
+        return self.phases > 0
+
+    def _set(self, lit):
+        self.lit = lit
+        for pin in self.pins:
+            pin.value(1 if lit else 0)
+
+    def start(self, repeats=5):
+        """Starts `repeats` on/off cycles; restarting an active pattern extends it"""
+        self.phases = 2 * repeats
+        self._set(True)
+        self.deadline = ticks_add(ticks_ms(), self.on_ms)
+
+    def stop(self):
+        self.phases = 0
+        self._set(False)
+
+    def tick(self, _=None):
+        """Advances the pattern if the current phase is over (accepts a Timer argument)"""
+        if self.phases and ticks_diff(ticks_ms(), self.deadline) >= 0:
+            self.phases -= 1
+            if self.phases:
+                self._set(not self.lit)
+                self.deadline = ticks_add(self.deadline, self.on_ms if self.lit else self.off_ms)
+            else:
+                self._set(False)
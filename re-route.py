@@ -1,70 +1,104 @@
-import time
+import math
 import threading
-import winsound
+
+import hal
+from alarm_scheduler import AlarmScheduler
+from event_journal import ALARM, ALARM_OFF, COMMAND, REROUTE, STATE, NullJournal
+from lora_uplink import STATE_CODES
+from metrics import NULL_REGISTRY, perf_counter
+from perimeter_routing import PerimeterRoute
+from stump_state import StumpStateTable
 
 
 class StumpNetwork:
-    def __init__(self, stump_count):
-        self.stumps = {f"x{i + 1}": True for i in range(stump_count)}
+    def __init__(self, stump_count, max_link=math.inf, journal=None, metrics=None):
+        self.stumps = StumpStateTable(f"x{i + 1}" for i in range(stump_count))  # State and alarm flag per stump
         self.route = []  # Dynamic route
         self.stump_coordinates = {f"x{i + 1}": (i * 10, i * 5) for i in range(stump_count)}  # Example coordinates
-        self.alarm_active = {}  # Track active alarms for destroyed stumps
-        self.alarm_events = {}  # Control stopping of alarms
+        self.router = PerimeterRoute(self.stump_coordinates, max_link=max_link)  # Geometry-aware loop, repaired incrementally
+        self.alarms = AlarmScheduler(hal.sound_sink(frequency=1000, duration_ms=1000)).start()  # One thread for all alarms
+        self.journal = NullJournal() if journal is None else journal  # EventJournal to persist every event
+        self.metrics = NULL_REGISTRY if metrics is None else metrics  # metrics.Registry to enable instrumentation
+        self._register_metrics()
+
+    def _register_metrics(self):
+        m = self.metrics
+        self.route_time = m.histogram("route_seconds", "Computing the signal route in check_connection")
+        self.repair_time = m.histogram("route_repair_seconds", "Dropping or restoring one stump in the route")
+        self.alarms_total = m.counter("alarms_total", "Alarms triggered")
+        self.state_changes = m.counter("state_changes_total", "Stumps destroyed, turned off or restored")
+        m.gauge("alarms_sounding", "Alarms currently sounding", fn=lambda: len(self.alarms))
+        m.gauge("threads_alive", "Threads in the process (alarms share one scheduler thread)",
+                fn=threading.active_count)
+        m.gauge("route_length", "Stumps in the current route", fn=lambda: len(self.route))
 
     def check_connection(self):
         """Dynamically updates the signal route based on available stumps"""
-        active_stumps = [stump for stump, status in self.stumps.items() if status]
-
-        if len(active_stumps) < 2:
+        if len(self.router) < 2:
             print("ALERT! Insufficient stumps to maintain connection!")
             return
 
-        self.route = active_stumps + [active_stumps[0]]  # Ensuring enclosed loop
+        start = perf_counter()
+        self.route = self.router.route()  # Enclosed loop kept up to date by drop()/restore()
+        self.route_time.observe_since(start)
+        self.journal.record(REROUTE, code=min(len(self.route), 255))
         print("New route established:", " → ".join(self.route))
+        for a, b in self.router.gaps:
+            print(f"WARNING! Link {a} → {b} ({self.router.distance(a, b):.1f}) is beyond stump range!")
 
     def trigger_alarm(self, stump, continuous=False):
         """Triggers an alarm sound"""
+        self.alarms_total.inc()
         print(f"ALARM! Stump {stump} at {self.stump_coordinates[stump]} is offline!")
-        self.alarm_events[stump] = threading.Event()
-
         if continuous:
-            self.alarm_active[stump] = True
-            while not self.alarm_events[stump].is_set():
-                winsound.Beep(1000, 5000)
+            self.stumps.set_alarm(stump)
+            self.alarms.trigger(stump, period=1.0)  # Back-to-back 1 s beeps until turned off
+            self.journal.record(ALARM, stump, 1)
         else:
-            for _ in range(25):
-                if self.alarm_events[stump].is_set():
-                    break
-                winsound.Beep(1000, 1000)
-                time.sleep(0.2)
+            self.alarms.trigger(stump, duration=30, period=1.2)  # 25 beeps of 1 s with 0.2 s gaps
+            self.journal.record(ALARM, stump, 0)
 
     def destroy_stump(self, stump):
         """Simulates a stump being destroyed"""
-        if stump in self.stumps and self.stumps[stump]:
-            self.stumps[stump] = False
+        if stump in self.stumps and self.stumps.is_active(stump):
+            self.stumps.set_state(stump, "destroyed")
+            start = perf_counter()
+            self.router.drop(stump)
+            self.repair_time.observe_since(start)
+            self.state_changes.inc()
+            self.journal.record(STATE, stump, STATE_CODES["destroyed"])
             print(f"ALERT! Stump {stump} at {self.stump_coordinates[stump]} is DESTROYED! Reconfiguring network...")
-            self.alarm_active[stump] = True
-            threading.Thread(target=self.trigger_alarm, args=(stump, True), daemon=True).start()
+            self.trigger_alarm(stump, continuous=True)
             self.check_connection()
         else:
             print(f"Stump {stump} is already offline!")
 
     def manually_turn_off_stump(self, stump):
         """Simulates a manual shutdown and triggers alarm immediately for 25 seconds"""
-        if stump in self.stumps and self.stumps[stump]:
-            self.stumps[stump] = False
+        if stump in self.stumps and self.stumps.is_active(stump):
+            self.stumps.set_state(stump, "off")
+            start = perf_counter()
+            self.router.drop(stump)
+            self.repair_time.observe_since(start)
+            self.state_changes.inc()
+            self.journal.record(STATE, stump, STATE_CODES["off"])
             print(f"Stump {stump} is manually turned OFF! Adjusting signal route...")
             self.check_connection()
-            threading.Thread(target=self.trigger_alarm, args=(stump, False), daemon=True).start()
+            self.trigger_alarm(stump, continuous=False)
         else:
             print(f"Stump {stump} is already offline or destroyed!")
 
     def restore_stump(self, stump):
         """Manually restores a destroyed stump and stops its alarm"""
-        if stump in self.stumps and not self.stumps[stump]:
-            self.stumps[stump] = True
-            if stump in self.alarm_events:
-                self.alarm_events[stump].set()  # Stop the alarm immediately
+        if stump in self.stumps and not self.stumps.is_active(stump):
+            self.stumps.set_state(stump, "active")
+            start = perf_counter()
+            self.router.restore(stump)
+            self.repair_time.observe_since(start)
+            self.state_changes.inc()
+            self.journal.record(STATE, stump, STATE_CODES["active"])
+            self.alarms.cancel(stump)  # Stop the alarm immediately
+            self.stumps.set_alarm(stump, False)
             print(f"Stump {stump} has been manually restored! Reconfiguring network...")
             self.check_connection()
         else:
@@ -72,17 +106,17 @@ class StumpNetwork:
 
     def alarm_off(self, stump):
         """Manually stops the alarm for a destroyed stump but does not restore it"""
-        if stump in self.alarm_active and self.alarm_active[stump]:
-            self.alarm_events[stump].set()  # Stop the alarm
-            self.alarm_active[stump] = False
+        if self.alarms.cancel(stump):
+            self.stumps.set_alarm(stump, False)
+            self.journal.record(ALARM_OFF, stump)
             print(f"Alarm for stump {stump} has been turned off!")
         else:
             print(f"No active alarm for stump {stump}!")
 
     def display_status(self):
         """Displays current active and inactive stumps"""
-        active_stumps = [stump for stump, status in self.stumps.items() if status]
-        inactive_stumps = [stump for stump, status in self.stumps.items() if not status]
+        active_stumps = self.stumps.stumps_in("active", ordered=True)
+        inactive_stumps = self.stumps.stumps_in("off", ordered=True) + self.stumps.stumps_in("destroyed", ordered=True)
 
         print("\nActive Stumps:", ", ".join(active_stumps) if active_stumps else "None")
         print("Offline Stumps:", ", ".join(inactive_stumps) if inactive_stumps else "None")
@@ -97,6 +131,7 @@ class StumpNetwork:
 
             user_input = input(
                 "Enter 'destroy x#', 'off x#', 'restore x#', 'alarm_off x#', or 'exit': ").strip().lower()
+            self.journal.record(COMMAND, text=user_input)
             if user_input.startswith("destroy"):
                 _, stump = user_input.split()
                 self.destroy_stump(stump)
@@ -111,13 +146,15 @@ class StumpNetwork:
                 self.alarm_off(stump)
             elif user_input == "exit":
                 print("System shutting down...")
+                self.journal.close()
                 break
             else:
                 print(
                     "Invalid command! Use 'destroy x#', 'off x#', 'restore x#', or 'alarm_off x#' (e.g., 'destroy x3').")
 
 
-# Get user input for the number of stumps
-stump_count = int(input("Enter the number of stumps: "))
-network = StumpNetwork(stump_count)
-network.run_system()
\ No newline at end of file
+if __name__ == "__main__":
+    # Get user input for the number of stumps
+    stump_count = int(input("Enter the number of stumps: "))
+    network = StumpNetwork(stump_count)
+    network.run_system()
\ No newline at end of file
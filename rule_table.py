@@ -0,0 +1,79 @@
+# Comparison operators allowed in rule conditions (no `operator` module on MicroPython)
+OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def matches(conditions, reading):
+    """True if `reading` (channel -> value) satisfies every (channel, op, threshold) condition"""
+    for channel, op, threshold in conditions:
+        if not OPS[op](reading[channel], threshold):
+            return False
+    return True
+
+
+def evaluate(rules, default, reading):
+    """Reference evaluation of a rule list: code of the first matching rule, else `default`"""
+    for code, conditions in rules:
+        if matches(conditions, reading):
+            return code
+    return default
+
+
+class RuleTable:
+    """Threshold rules compiled into straight-line compare code.
+
+    The rules are unrolled into generated `code` and `lookup` functions:
+    every channel a rule mentions is read into a local once, then one
+    `if` per run of rules sharing a code tests the thresholds, inlined as
+    constants, in rule order.  A sample costs the same handful of integer
+    compares as a hand-written if/elif chain, on CPython and MicroPython
+    alike, while the thresholds stay declared once in detection_rules.
+    Readings are integer counts, as stored by SensorStore and returned by
+    ADC reads.
+    """
+
+    def __init__(self, channels, rules, default):
+        self.channel_names = tuple(channels)
+        self.rules = list(rules)
+        self.default = default
+        used = [c for c in self.channel_names if any(c == cond[0] for _, conds in self.rules for cond in conds)]
+        self.channels = [self.channel_names.index(c) for c in used]  # Offset in the sample of each local v0, v1, ...
+        # code(values, base=0): code of the sample at values[base:base + len(channels)], e.g. a SensorStore row
+        # lookup(reading): code of a ReadingView (read in place) or a channel -> value mapping
+        self.code, self.lookup = self._generate()
+
+    def _chain(self):
+        """Source lines of the if-chain over the locals v0, v1, ..."""
+        local = {self.channel_names[offset]: f"v{i}" for i, offset in enumerate(self.channels)}
+        lines, runs = [], []
+        for code, conditions in self.rules:  # Consecutive rules with the same code share one `if ... or ...`
+            test = " and ".join(f"{local[name]} {op} {threshold!r}" for name, op, threshold in conditions) or "True"
+            if runs and runs[-1][0] == code:
+                runs[-1][1].append(test)
+            else:
+                runs.append((code, [test]))
+        for code, tests in runs:
+            lines += [f"    if {' or '.join(tests)}:", f"        return {code}"]
+        return lines + [f"    return {self.default}"]
+
+    def _generate(self):
+        """Generates one function per entry point around the shared if-chain"""
+        row = [f"    v{i} = values[base + {offset}]" for i, offset in enumerate(self.channels)]
+        mapping = [f"        v{i} = reading[{self.channel_names[offset]!r}]" for i, offset in enumerate(self.channels)]
+        chain = self._chain()
+        source = "\n".join(
+            ["def code(values, base=0):"] + row + chain +
+            ["def lookup(reading):",
+             "    values = getattr(reading, 'readings', None)",
+             "    if values is None:"] + (mapping or ["        pass"]) + [
+             "    else:",
+             "        base = reading.base"] + ["    " + line for line in row or ["    pass"]] + chain)
+        namespace = {}
+        exec(source, namespace)
+        return namespace["code"], namespace["lookup"]
@@ -1,172 +1,269 @@
-import serial
-import time
-import socket
 import threading
-import itertools
+import asyncio
+
+import hal
+from alarm_scheduler import AlarmScheduler, PrintSink
+from detection_rules import BACKUP_OFFLINE, BACKUP_RULES
+from duty_cycle import DutyCycleScheduler
+from esp32_link import ESP32Link
+from event_journal import ALARM, ALARM_OFF, COMMAND, REROUTE, STATE, NullJournal
+from gateway_pool import GatewayPool
+from intrusion_fusion import RAISED, FusionTracker, beam_score
+from laser_schedule import LaserScheduler
+from monitor_runtime import MonitorRuntime
+from rule_table import RuleTable
+from sensor_history import SensorHistory
+from lora_uplink import STATE_CODES
+from metrics import NULL_REGISTRY, perf_counter
+from stump_state import StumpStateTable
+from wifi_uplink import WifiUplink
+
+LORA_WAIT = 5.0  # Seconds to wait for the gateway to confirm a LoRa send
 
 class StumpSensorNetwork:
-    def __init__(self, port, baud_rate=115200, stump_count=4, server_ip="192.168.1.100", server_port=5000):
-        self.ser = serial.Serial(port, baud_rate, timeout=1)  # ESP32 Serial Connection
-        self.stump_count = stump_count
-        self.stumps = {f"x{i+1}": True for i in range(stump_count)}  # Stump connection status
-        self.sensor_data = {f"x{i+1}": {"Laser": 1, "Photodiode": 1, "PIR": 1, "Radar": 1, "Seismic": 1} for i in range(stump_count)}
-        self.alarm_active = False  # Alarm status
-        self.stop_alarm = False  # Flag to manually stop the alarm
+    def __init__(self, port, baud_rate=115200, stump_count=4, server_ip="192.168.1.100", server_port=5000,
+                 link=None, journal=None, metrics=None, min_interval=0.5, nominal_interval=5.0, max_interval=30.0):
+        if link is not None:  # Already-open gateway or a journal replay (event_journal.ReplayLink)
+            self.link = link
+            stump_names = link.stumps
+        elif isinstance(port, dict):  # {port: [stumps]}: one ESP32 gateway per shard, polled concurrently
+            self.link = GatewayPool.open(port, baud_rate)
+            stump_names = self.link.stumps
+        else:
+            self.ser = hal.open_serial(port, baud_rate, timeout=1)  # ESP32 Serial Connection
+            self.link = ESP32Link(self.ser)
+            stump_names = [f"x{i+1}" for i in range(stump_count)]
+        self.stump_count = len(stump_names)
+        self.stumps = StumpStateTable(stump_names)  # State and alarm flag per stump, counts kept incrementally
+        self.sensor_data = SensorHistory(self.stumps)  # Latest reading plus fixed-size history per stump
+        self.backup_rules = RuleTable(*BACKUP_RULES)  # PIR/radar/seismic offline check, compiled once
+        self.fusion = FusionTracker(self.stumps, score=beam_score, window=5, confirm=3, clear=0)  # Beam must stay broken
+        self.alarms = AlarmScheduler(PrintSink())  # Ticked by the runtime's alarm task
+        # Quiet stumps back off towards max_interval on a low battery, active ones burst at min_interval
+        self.duty = DutyCycleScheduler(self.stumps, min_interval=min_interval, nominal_interval=nominal_interval,
+                                       max_interval=max_interval)
+        self.journal = NullJournal() if journal is None else journal  # EventJournal to persist readings and events
+        self.metrics = NULL_REGISTRY if metrics is None else metrics  # metrics.Registry to enable instrumentation
+        self._register_metrics()
+        self.suspected = {}  # stump -> perf_counter() of the sweep that first saw evidence, for detection latency
 
         # Wi-Fi Setup (STANDBY Mode)
         self.server_ip = server_ip
         self.server_port = server_port
-        self.sock = None  # Wi-Fi socket will be initialized only if needed
+        self.wifi = WifiUplink(server_ip, server_port)  # Connects in the background on first update only
 
         # Laser Security System - Dynamic Combinations
         self.x1_transmitters = ["x1t1", "x1t2", "x1t3"]
         self.x2_receivers = ["x2r1", "x2r2", "x2r3"]
-        self.all_combinations = list(itertools.permutations(zip(self.x1_transmitters, self.x2_receivers)))
+        # Pairings are computed on demand; every tx -> rx link is exercised within len(receivers) steps
+        self.all_combinations = LaserScheduler(self.x1_transmitters, self.x2_receivers, order="coverage")
         self.combination_index = 0
 
+    def _register_metrics(self):
+        m = self.metrics
+        self.command_time = m.histogram("esp32_command_seconds", "Serial round trip of one ESP32 command")
+        self.read_time = m.histogram("sweep_read_seconds", "READALL round trip of one sweep")
+        self.sweep_time = m.histogram("sweep_seconds", "Duration of one check_stump_status sweep")
+        self.alarm_latency = m.histogram("detection_to_alarm_seconds", "First suspicious sample to alarm")
+        self.readings_total = m.counter("readings_total", "Stump readings received")
+        self.alarms_total = m.counter("alarms_total", "Alarms triggered")
+        self.lora_sent = m.counter("lora_sent_total", "LoRa alerts confirmed by the gateway")
+        self.lora_failed = m.counter("lora_failed_total", "LoRa alerts that failed or timed out")
+        self.wifi_fallbacks = m.counter("wifi_fallbacks_total", "Status updates sent over Wi-Fi after a LoRa failure")
+        self.wifi_dropped = m.counter("wifi_dropped_total", "Wi-Fi updates dropped by the uplink queue")
+        m.gauge("alarms_sounding", "Alarms currently sounding", fn=lambda: len(self.alarms))
+        m.gauge("threads_alive", "Threads in the process (alarms share one scheduler thread)",
+                fn=threading.active_count)
+        m.gauge("stumps_active", "Stumps in the active state", fn=lambda: self.stumps.count("active"))
+
     def send_command(self, command):
         """Sends a command to ESP32 and reads response"""
-        self.ser.write(command.encode())
-        time.sleep(1)
-        response = self.ser.readline().decode().strip()
+        start = perf_counter()
+        response = self.link.send_command(command)
+        self.command_time.observe_since(start)
         return response
 
     def check_stump_status(self):
         """Reads sensor data from ESP32 and checks if any stump connection is broken"""
-        for stump in self.stumps:
-            response = self.send_command(f"READ {stump}")
-            if response:
-                laser, photodiode, pir, radar, seismic = map(int, response.split(","))
-                self.sensor_data[stump] = {
-                    "Laser": laser,
-                    "Photodiode": photodiode,
-                    "PIR": pir,
-                    "Radar": radar,
-                    "Seismic": seismic
-                }
-
-                # If laser or photodiode is interrupted, check backup sensors
-                if laser == 0 or photodiode == 0:
-                    print(f"ALERT! Stump {stump} lost laser connection!")
-                    if pir == 0 or radar == 0 or seismic == 0:
-                        print(f"WARNING! A sensor in stump {stump} is offline! Attempting reactivation...")
-                        self.reactivate_sensors(stump)
-
-                    self.trigger_alarm(stump, destroyed=True)
-                    self.stumps[stump] = False  # Mark stump as disconnected
-
-                    # Send alert via LoRa
-                    if not self.send_lora_message(f"ALERT: {stump} Intrusion detected!"):
-                        print("LoRa failed! Switching to Wi-Fi...")
-                        self.send_wifi_update()
-
-                    self.reroute_network()
+        due = self.duty.due()
+        if not due:
+            return
+        start = perf_counter()
+        updated = self.link.read_stumps(due, self.sensor_data)  # One framed round trip for every due stump
+        self.read_time.observe_since(start)
+        self.readings_total.inc(len(updated))
+        self.journal.record_readings(updated, self.sensor_data)
+        alerts = []
+        for stump in updated:
+            # Once the laser or photodiode interruption is confirmed over several samples, check backup sensors
+            event = self.fusion.update(stump, self.sensor_data[stump])
+            if not self.fusion.is_confirmed(stump) and self.stumps.is_active(stump):  # Alarmed or offline: no burst
+                if self.fusion.evidence(stump):
+                    self.duty.detected(stump)  # Sample a suspicious stump fast so it confirms or clears quickly
+                    self.suspected.setdefault(stump, start)
+                elif stump in self.suspected:
+                    del self.suspected[stump]
+            if event == RAISED:
+                print(f"ALERT! Stump {stump} lost laser connection!")
+                if self.backup_rules.lookup(self.sensor_data[stump]) == BACKUP_OFFLINE:
+                    print(f"WARNING! A sensor in stump {stump} is offline! Attempting reactivation...")
+                    self.reactivate_sensors(stump)
+
+                self.trigger_alarm(stump, destroyed=True)
+                self.stumps.set_state(stump, "destroyed")  # Mark stump as disconnected
+                self.journal.record(STATE, stump, STATE_CODES["destroyed"])
+
+                # Send alert via LoRa; it stays in flight while we reroute
+                alerts.append(self.send_lora_message(f"ALERT: {stump} Intrusion detected!"))
+
+                self.reroute_network()
+
+        confirmed = [self.lora_confirmed(alert) for alert in alerts]
+        self.lora_sent.inc(confirmed.count(True))
+        if not all(confirmed):
+            self.lora_failed.inc(confirmed.count(False))
+            print("LoRa failed! Switching to Wi-Fi...")
+            self.wifi_fallbacks.inc()
+            self.send_wifi_update()
+        self.sweep_time.observe_since(start)
 
     def reactivate_sensors(self, stump):
-        """Attempts to reactivate offline sensors"""
+        """Attempts to reactivate offline sensors; requests run concurrently on the gateway"""
         for sensor in self.sensor_data[stump]:
             if self.sensor_data[stump][sensor] == 0:
                 print(f"Reactivating {sensor} on {stump}...")
-                response = self.send_command(f"REACTIVATE {stump} {sensor}")
-                if response == "OK":
-                    self.sensor_data[stump][sensor] = 1
-                    print(f"{sensor} on {stump} is now active.")
+                future = self.link.submit(f"REACTIVATE {stump} {sensor}", stump=stump)
+                future.add_done_callback(lambda f, sensor=sensor: self._reactivated(stump, sensor, f))
+
+    def _reactivated(self, stump, sensor, future):
+        if future.exception() is None and future.result() == "OK":
+            self.sensor_data[stump][sensor] = 1
+            print(f"{sensor} on {stump} is now active.")
 
     def send_lora_message(self, message):
-        """Sends an alert message using LoRa"""
-        response = self.send_command(f"LORA_SEND {message}")
-        if response == "LORA_OK":
+        """Queues an alert message over LoRa and returns the pending Future"""
+        future = self.link.submit(f"LORA_SEND {message}")
+        future.add_done_callback(lambda f: self._lora_sent(message, f))
+        return future
+
+    def _lora_sent(self, message, future):
+        if self.lora_confirmed(future):
             print(f"LoRa Message Sent: {message}")
-            return True
-        return False
 
-    def connect_wifi(self):
-        """Activates Wi-Fi only if LoRa fails"""
+    def lora_confirmed(self, future):
+        """Waits for a queued LoRa send and reports whether the gateway confirmed it"""
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect((self.server_ip, self.server_port))
-            print(f"Connected to server at {self.server_ip}:{self.server_port} (Wi-Fi Standby Mode Activated)")
-        except Exception as e:
-            print(f"Wi-Fi Connection Failed: {e}")
+            return future.result(LORA_WAIT) == "LORA_OK"
+        except (TimeoutError, ConnectionError):
+            return False
 
     def send_wifi_update(self):
-        """Sends network status over Wi-Fi if LoRa fails"""
-        if not self.sock:
-            self.connect_wifi()  # Connect Wi-Fi only when needed
-
-        try:
-            status = str(self.stumps).encode()
-            self.sock.send(status)
-            print("Wi-Fi Status Sent to Server")
-        except Exception as e:
-            print(f"Wi-Fi Send Failed: {e}")
+        """Queues network status for the Wi-Fi uplink if LoRa fails; never blocks the polling loop"""
+        if self.wifi.send(self.stumps.snapshot()):  # 2 bits per stump plus an alarm bitset
+            print("Wi-Fi Status queued for Server")
+        else:
+            self.wifi_dropped.inc()
+            print("Wi-Fi Send Failed: uplink queue is full")
 
     def trigger_alarm(self, stump, destroyed):
         """Triggers alarm for stump failures"""
+        self.alarms_total.inc()
+        detected = self.suspected.pop(stump, None)
+        if detected is not None:
+            self.alarm_latency.observe_since(detected)
         if destroyed:
             print(f"ALARM TRIGGERED! Stump {stump} is destroyed! Alarm will sound until manually turned off.")
-            self.alarm_active = True
-            self.stop_alarm = False
-            threading.Thread(target=self.sound_alarm, args=(True,)).start()
+            self.stumps.set_alarm(stump)
+            self.alarms.trigger(stump)
+            self.journal.record(ALARM, stump, 1)
         else:
             print(f"ALARM TRIGGERED! Stump {stump} is disabled! Alarm will stop after 25 seconds.")
-            threading.Thread(target=self.sound_alarm, args=(False,)).start()
-
-    def sound_alarm(self, indefinite):
-        """Simulates alarm sound"""
-        start_time = time.time()
-        while not self.stop_alarm:
-            print("DANGER ALARM SOUNDING!")
-            time.sleep(1)
-            if not indefinite and time.time() - start_time >= 25:
-                break
-        print("Alarm stopped.")
+            self.alarms.trigger(stump, duration=25)
+            self.journal.record(ALARM, stump, 0)
+
+    def sound_alarm(self):
+        """Sounds every alarm tick that is due; driven by the runtime's alarm task"""
+        self.alarms.run_pending()
 
     def stop_destroyed_alarm(self):
         """Manually stops the destroyed stump alarm"""
-        if self.alarm_active:
-            self.stop_alarm = True
-            self.alarm_active = False
+        if self.stumps.alarm_count():
+            self.alarms.cancel_all()
+            for stump in self.stumps.alarming_stumps():
+                self.stumps.set_alarm(stump, False)
+                self.journal.record(ALARM_OFF, stump)
             print("Destroyed stump alarm has been manually turned off.")
 
+    def restore_stump(self, stump):
+        """Manually restores a disconnected stump and reroutes through it"""
+        if stump in self.stumps and not self.stumps.is_active(stump):
+            self.stumps.set_state(stump, "active")
+            self.stumps.set_alarm(stump, False)
+            self.alarms.cancel(stump)
+            self.fusion.reset(stump)  # A beam that is still broken is confirmed again as a new event
+            self.journal.record(STATE, stump, STATE_CODES["active"])
+            print(f"Stump {stump} has been manually restored! Reconfiguring network...")
+            self.reroute_network()
+        else:
+            print(f"Stump {stump} is already active or invalid!")
+
+    def display_status(self):
+        """Displays current active and inactive stumps"""
+        active_stumps = self.stumps.stumps_in("active", ordered=True)
+        inactive_stumps = self.stumps.stumps_in("off", ordered=True) + self.stumps.stumps_in("destroyed", ordered=True)
+        print("\nActive Stumps:", ", ".join(active_stumps) if active_stumps else "None")
+        print("Offline Stumps:", ", ".join(inactive_stumps) if inactive_stumps else "None")
+
     def reroute_network(self):
         """Re-establishes connectivity if a stump is disabled"""
-        active_stumps = [s for s, status in self.stumps.items() if status]
-        if len(active_stumps) < 2:
+        active = self.stumps.count("active")
+        self.journal.record(REROUTE, code=min(active, 255))  # Active stump count; the route follows from the states
+        if active < 2:
             print("CRITICAL: Network failure! Insufficient active stumps.")
         else:
-            print("Rerouting network:", " → ".join(active_stumps))
-
-    def cycle_combinations(self):
-        """Cycles through all laser transmitter-receiver combinations every second."""
-        while True:
-            self.combination_index = (self.combination_index + 1) % len(self.all_combinations)
-            combination = self.all_combinations[self.combination_index]
-            print("\nActive Laser Connections:")
-            for tx, rx in combination:
-                print(f"  {tx} → {rx}")
-            time.sleep(1)
+            print("Rerouting network:", " → ".join(self.stumps.stumps_in("active", ordered=True)))
 
-    def run(self):
-        """Continuously monitors the sensor network"""
-        threading.Thread(target=self.cycle_combinations, daemon=True).start()  # Start cycling laser combinations
-
-        while True:
-            self.check_stump_status()
-            self.display_status()
-            time.sleep(5)  # Delay before next reading
-
-            user_input = input("Enter 'stop_alarm', 'restore x#', or 'exit': ").strip().lower()
-            if user_input == "stop_alarm":
-                self.stop_destroyed_alarm()
-            elif user_input.startswith("restore"):
-                _, stump = user_input.split()
-                self.restore_stump(stump)
-            elif user_input == "exit":
-                print("System shutting down...")
-                break
+    def next_sweep_delay(self):
+        """Seconds until the next stump is due; drives the runtime's sweep cadence"""
+        return self.duty.next_delay()
+
+    def next_laser_delay(self):
+        """Laser pairings change every second while any stump is active, slower on a low battery"""
+        return self.duty.laser_interval(1.0)
+
+    def next_combination(self):
+        """Advances to the next laser transmitter-receiver combination"""
+        self.combination_index = (self.combination_index + 1) % len(self.all_combinations)
+        combination = self.all_combinations[self.combination_index]
+        print("\nActive Laser Connections:")
+        for tx, rx in combination:
+            print(f"  {tx} → {rx}")
+
+    def handle_command(self, user_input):
+        """Applies one operator command; returns False when the operator exits"""
+        self.journal.record(COMMAND, text=user_input)
+        parts = user_input.split()
+        if user_input == "stop_alarm":
+            self.stop_destroyed_alarm()
+        elif user_input.startswith("restore"):
+            if len(parts) == 2:
+                self.restore_stump(parts[1])
             else:
-                print("Invalid command! Use 'stop_alarm', 'restore x#', or 'exit'.")
+                print("Usage: restore x#")
+        elif user_input == "exit":
+            print("System shutting down...")
+            return False
+        else:
+            print("Invalid command! Use 'stop_alarm', 'restore x#', or 'exit'.")
+        return True
+
+    def run(self):
+        """Continuously monitors the sensor network; the duty cycle paces the sweeps, never the operator console"""
+        asyncio.run(MonitorRuntime(self).run())
+        self.link.close()
+        self.wifi.close()
+        self.journal.close()
 
-network = StumpSensorNetwork(port="COM3")
-network.run()
+if __name__ == "__main__":
+    network = StumpSensorNetwork(port="COM3")
+    network.run()
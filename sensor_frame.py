@@ -0,0 +1,132 @@
+import struct
+import sys
+from array import array
+from binascii import crc_hqx
+
+CHANNELS = ("Laser", "Photodiode", "PIR", "Radar", "Seismic")
+CHANNEL_INDEX = {channel: i for i, channel in enumerate(CHANNELS)}
+
+# Fixed-width little-endian frame, every field after the sync byte 16-bit aligned:
+#   sync (0xA5) | reserved | stump id (uint16) | sequence | laser, photodiode, pir, radar, seismic (int16) | CRC-16/XMODEM
+SYNC = 0xA5
+FRAME = struct.Struct("<BxHH5hH")
+FRAME_SIZE = FRAME.size  # 18 bytes
+VALUES_OFFSET = 6
+CHECKSUM_OFFSET = FRAME_SIZE - 2
+NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def frame_checksum(data):
+    """CRC-16/XMODEM of the frame body (crc_hqx runs in C, one call per frame)"""
+    return crc_hqx(data, 0)
+
+
+def pack_frame(stump_id, seq, values):
+    """Builds one binary frame (used by the ESP32 stand-in and benchmarks)"""
+    body = FRAME.pack(SYNC, stump_id, seq & 0xFFFF, *values, 0)[:CHECKSUM_OFFSET]
+    return body + struct.pack("<H", frame_checksum(body))
+
+
+class ReadingView:
+    """Dict-like view of one stump's latest reading inside a SensorStore"""
+
+    __slots__ = ("readings", "base")
+
+    def __init__(self, readings, base):
+        self.readings = readings
+        self.base = base
+
+    def __getitem__(self, channel):
+        return self.readings[self.base + CHANNEL_INDEX[channel]]
+
+    def __setitem__(self, channel, value):
+        self.readings[self.base + CHANNEL_INDEX[channel]] = value
+
+    def __iter__(self):
+        return iter(CHANNELS)
+
+    def keys(self):
+        return CHANNELS
+
+    def values(self):
+        return self.readings[self.base:self.base + len(CHANNELS)]
+
+    def items(self):
+        return zip(CHANNELS, self.values())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class SensorStore:
+    """Preallocated latest-reading storage for every stump.
+
+    Binary frames are copied straight from the receive buffer into one
+    flat int16 array through memoryviews; `store[stump]` returns a reusable
+    dict-like ReadingView, so no per-sample strings or dicts are built.
+    """
+
+    def __init__(self, stumps):
+        self.names = list(stumps)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.slot_by_id = {int(name[1:]): i for i, name in enumerate(self.names)}  # "x3" -> frame id 3
+        self.readings = array("h", [1] * len(CHANNELS) * len(self.names))
+        self.seq = array("H", [0] * len(self.names))
+        self.raw = memoryview(self.readings).cast("B")
+        self.views = [ReadingView(self.readings, i * len(CHANNELS)) for i in range(len(self.names))]
+        self.bad_frames = 0
+
+    def __getitem__(self, stump):
+        return self.views[self.index[stump]]
+
+    def __contains__(self, stump):
+        return stump in self.index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def set(self, stump, values):
+        """Stores a reading from the CSV fallback path"""
+        base = self.index[stump] * len(CHANNELS)
+        self.readings[base:base + len(CHANNELS)] = array("h", values)
+
+    def parse_frames(self, buf, updated):
+        """Copies every valid frame in `buf` into storage and appends its stump name to `updated`"""
+        view = memoryview(buf)
+        count = len(view) // FRAME_SIZE
+        if not NATIVE_LITTLE_ENDIAN:
+            return self._parse_frames_portable(view, count, updated)
+
+        words = view[:count * FRAME_SIZE].cast("H")  # Header and CRC fields read as native uint16
+        width = len(CHANNELS) * 2
+        for off in range(0, count * FRAME_SIZE, FRAME_SIZE):
+            word = off >> 1
+            if view[off] != SYNC or crc_hqx(view[off:off + CHECKSUM_OFFSET], 0) != words[word + 8]:
+                self.bad_frames += 1
+                continue
+            slot = self.slot_by_id.get(words[word + 1])
+            if slot is None:
+                continue
+            self.seq[slot] = words[word + 2]
+            self.raw[slot * width:slot * width + width] = view[off + VALUES_OFFSET:off + CHECKSUM_OFFSET]
+            updated.append(self.names[slot])
+        return updated
+
+    def _parse_frames_portable(self, view, count, updated):
+        """struct-based path for big-endian hosts"""
+        for off in range(0, count * FRAME_SIZE, FRAME_SIZE):
+            sync, stump_id, seq, *values, checksum = FRAME.unpack_from(view, off)
+            if sync != SYNC or crc_hqx(view[off:off + CHECKSUM_OFFSET], 0) != checksum:
+                self.bad_frames += 1
+                continue
+            slot = self.slot_by_id.get(stump_id)
+            if slot is None:
+                continue
+            self.seq[slot] = seq
+            base = slot * len(CHANNELS)
+            self.readings[base:base + len(CHANNELS)] = array("h", values)
+            updated.append(self.names[slot])
+        return updated
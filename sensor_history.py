@@ -0,0 +1,83 @@
+import time
+from array import array
+
+from sensor_frame import CHANNEL_INDEX, CHANNELS, SensorStore
+
+
+class SensorHistory(SensorStore):
+    """SensorStore that also keeps a fixed-size circular history per stump.
+
+    Every reading is appended in O(1) to one flat int16 ring (stump-major,
+    then sample, then channel) with a matching float64 timestamp ring, so
+    memory stays constant however long the system runs.  Windows over the
+    last N samples are returned as at most two memoryview segments and are
+    never copied.  `history[stump]["Laser"]` still gives the latest reading.
+    """
+
+    def __init__(self, stumps, capacity=256):
+        super().__init__(stumps)
+        self.capacity = capacity
+        stride = capacity * len(CHANNELS)
+        self.ring = array("h", bytes(2 * stride * len(self.names)))
+        self.times = array("d", bytes(8 * capacity * len(self.names)))
+        self.head = array("I", bytes(4 * len(self.names)))  # Next write position per stump
+        self.count = array("I", bytes(4 * len(self.names)))  # Samples held, up to capacity
+        self.ring_view = memoryview(self.ring)
+        self.latest_view = memoryview(self.readings)
+
+    def record(self, slot, now):
+        """Appends the current latest reading of a stump slot to its history"""
+        pos = self.head[slot]
+        width = len(CHANNELS)
+        base = (slot * self.capacity + pos) * width
+        self.ring_view[base:base + width] = self.latest_view[slot * width:slot * width + width]
+        self.times[slot * self.capacity + pos] = now
+        self.head[slot] = (pos + 1) % self.capacity
+        if self.count[slot] < self.capacity:
+            self.count[slot] += 1
+
+    def set(self, stump, values, now=None):
+        super().set(stump, values)
+        self.record(self.index[stump], time.time() if now is None else now)
+
+    def parse_frames(self, buf, updated, now=None):
+        start = len(updated)
+        super().parse_frames(buf, updated)
+        now = time.time() if now is None else now
+        for stump in updated[start:]:
+            self.record(self.index[stump], now)
+        return updated
+
+    def _segments(self, slot, n):
+        """Chronological (start, stop) sample positions covering the last n samples"""
+        n = min(n, self.count[slot])
+        start = (self.head[slot] - n) % self.capacity
+        if start + n <= self.capacity:
+            return [(start, start + n)] if n else []
+        return [(start, self.capacity), (0, self.head[slot])]
+
+    def window(self, stump, channel, n):
+        """Last n values of one channel as zero-copy memoryview segments, oldest first"""
+        slot = self.index[stump]
+        width = len(CHANNELS)
+        base = slot * self.capacity * width + CHANNEL_INDEX[channel]
+        return [self.ring_view[base + lo * width:base + hi * width:width] for lo, hi in self._segments(slot, n)]
+
+    def timestamps(self, stump, n):
+        """Timestamps of the last n samples, oldest first"""
+        slot = self.index[stump]
+        base = slot * self.capacity
+        return [t for lo, hi in self._segments(slot, n) for t in self.times[base + lo:base + hi]]
+
+    def last(self, stump, channel, n):
+        """Last n values of one channel as a list, oldest first"""
+        return [v for segment in self.window(stump, channel, n) for v in segment]
+
+    def stats(self, stump, channel, n):
+        """(min, max, mean) of one channel over the last n samples, or None if there is no history"""
+        segments = [s for s in self.window(stump, channel, n) if len(s)]
+        if not segments:
+            return None
+        total = sum(len(s) for s in segments)
+        return (min(min(s) for s in segments), max(max(s) for s in segments),
+                sum(sum(s) for s in segments) / total)
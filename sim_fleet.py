@@ -0,0 +1,191 @@
+import heapq
+import random
+from concurrent.futures import Future
+
+from sensor_frame import CHANNEL_INDEX
+
+INTRUSION, SENSOR_FAILURE, DESTRUCTION = "intrusion", "sensor_failure", "destruction"
+QUIET = (1, 1, 1, 1, 1)
+INTRUDER = (0, 0, 1, 1, 4)  # Beam broken, PIR and radar triggered, footsteps on the seismic sensor
+BACKUP_SENSORS = ("PIR", "Radar", "Seismic")
+
+
+class FleetEvent:
+    """One scripted event: `kind` on `stump` from `start` until `end` (None = permanent)"""
+
+    __slots__ = ("kind", "stump", "start", "end", "sensor")
+
+    def __init__(self, kind, stump, start, end=None, sensor=None):
+        self.kind = kind
+        self.stump = stump
+        self.start = start
+        self.end = end
+        self.sensor = sensor
+
+    def __repr__(self):
+        return f"FleetEvent({self.kind!r}, {self.stump!r}, {self.start}, {self.end}, {self.sensor!r})"
+
+
+class SimulatedFleet:
+    """A perimeter of simulated stumps driven by a script of timed events.
+
+    Intrusions break a stump's beam and trigger its motion sensors for a
+    while, sensor failures zero one backup sensor until it is reactivated
+    or the failure ends, and destruction zeroes every channel for good.
+    `readings` has the same {stump: [laser, photodiode, pir, radar, seismic]}
+    layout as esp32_sim.SimulatedESP32, so a simulated gateway can serve
+    it.  Time is simulated: advance(t) applies everything scheduled up to t.
+    """
+
+    def __init__(self, stump_count, seed=0):
+        self.names = [f"x{i + 1}" for i in range(stump_count)]
+        self.readings = {stump: list(QUIET) for stump in self.names}
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self.events = []  # Every scripted event, in script order
+        self.pending = []  # Heap of (time, tiebreak, starts, event)
+        self.intruding = {}  # stump -> number of intrusions in progress
+        self.failed = {}  # stump -> set of failed sensors
+        self.destroyed = set()
+        self.reactivations = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def script(self, kind, stump, start, duration=None, sensor=None):
+        """Schedules one event; returns it"""
+        if kind == SENSOR_FAILURE and sensor is None:
+            sensor = self.rng.choice(BACKUP_SENSORS)
+        event = FleetEvent(kind, stump, start, None if duration is None else start + duration, sensor)
+        self.events.append(event)
+        heapq.heappush(self.pending, (start, len(self.events), True, event))
+        if event.end is not None:
+            heapq.heappush(self.pending, (event.end, len(self.events), False, event))
+        return event
+
+    def randomize(self, duration, intrusions_per_hour=1.0, failures_per_hour=0.2, destroyed=0.01,
+                  intrusion_length=(5.0, 30.0), failure_length=(60.0, 600.0)):
+        """Scripts random events over `duration` seconds from now.
+
+        Rates are per stump; `destroyed` is the share of the fleet that is
+        destroyed at some point in the run.
+        """
+        hours = duration / 3600
+        for stump in self.names:
+            for _ in range(self._poisson(intrusions_per_hour * hours)):
+                self.script(INTRUSION, stump, self.now + self.rng.uniform(0, duration),
+                            self.rng.uniform(*intrusion_length))
+            for _ in range(self._poisson(failures_per_hour * hours)):
+                self.script(SENSOR_FAILURE, stump, self.now + self.rng.uniform(0, duration),
+                            self.rng.uniform(*failure_length))
+        for stump in self.rng.sample(self.names, int(destroyed * len(self.names))):
+            self.script(DESTRUCTION, stump, self.now + self.rng.uniform(0, duration))
+
+    def _poisson(self, mean):
+        count, t = 0, self.rng.expovariate(1.0)
+        while t < mean:
+            count += 1
+            t += self.rng.expovariate(1.0)
+        return count
+
+    def advance(self, now):
+        """Applies every event start and end scheduled up to `now`"""
+        changed = set()
+        while self.pending and self.pending[0][0] <= now:
+            _, _, starts, event = heapq.heappop(self.pending)
+            stump = event.stump
+            if event.kind == INTRUSION:
+                self.intruding[stump] = self.intruding.get(stump, 0) + (1 if starts else -1)
+            elif event.kind == SENSOR_FAILURE:
+                failed = self.failed.setdefault(stump, set())
+                if starts:
+                    failed.add(event.sensor)
+                else:
+                    failed.discard(event.sensor)
+            elif event.kind == DESTRUCTION:
+                self.destroyed.add(stump)
+            changed.add(stump)
+        self.now = now
+        for stump in changed:
+            self._update(stump)
+
+    def _update(self, stump):
+        if stump in self.destroyed:
+            values = [0, 0, 0, 0, 0]
+        else:
+            values = list(INTRUDER if self.intruding.get(stump) else QUIET)
+            for sensor in self.failed.get(stump, ()):
+                values[CHANNEL_INDEX[sensor]] = 0
+        self.readings[stump][:] = values
+
+    def reactivate(self, stump, sensor):
+        """A REACTIVATE command: brings a failed sensor back; returns False if the stump is destroyed"""
+        if stump in self.destroyed:
+            return False
+        if sensor in self.failed.get(stump, ()):
+            self.failed[stump].discard(sensor)
+            self.reactivations += 1
+            self._update(stump)
+        return True
+
+
+class FleetLink:
+    """In-process gateway serving a SimulatedFleet to a StumpSensorNetwork (built with link=FleetLink(fleet)).
+
+    Readings go straight into the network's store, skipping the serial
+    path, so it measures detection and processing alone; to include the
+    gateway round trip, open the network's ports through hal with a
+    sim_hardware.SimBackend(fleet) instead.  REACTIVATE reaches the fleet,
+    and LoRa sends succeed at once.
+    """
+
+    binary = False
+
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.stumps = fleet.names
+        self.commands = 0
+
+    def read_stumps(self, stumps, store):
+        readings = self.fleet.readings
+        updated = []
+        for stump in stumps:
+            store.set(stump, readings[stump])
+            updated.append(stump)
+        return updated
+
+    def submit(self, command, stump=None):
+        self.commands += 1
+        parts = command.split()
+        if parts[0] == "REACTIVATE":
+            response = "OK" if self.fleet.reactivate(parts[1], parts[2]) else "ERR"
+        elif parts[0] == "LORA_SEND":
+            response = "LORA_OK"
+        else:
+            response = "ERR"
+        future = Future()
+        future.set_result(response)
+        return future
+
+    def send_command(self, command, stump=None):
+        return self.submit(command, stump).result()
+
+    def close(self):
+        pass
+
+
+def run_fleet(network, fleet, duration, min_step=0.05):
+    """Drives network.check_stump_status() through `duration` simulated seconds; returns the sweep count.
+
+    The network's duty-cycle scheduler runs on the fleet's clock, and time
+    jumps straight to the next due stump, so quiet stretches cost nothing.
+    """
+    network.duty.set_clock(lambda: fleet.now)
+    end = fleet.now + duration
+    sweeps = 0
+    fleet.advance(fleet.now)
+    while fleet.now < end:
+        network.check_stump_status()
+        sweeps += 1
+        fleet.advance(min(fleet.now + max(network.duty.next_delay(), min_step), end))
+    return sweeps
@@ -0,0 +1,155 @@
+import random
+import threading
+
+from alarm_scheduler import PrintSink
+
+
+class SimPin:
+    """machine.Pin stand-in: holds its value and lets a test fire its interrupt"""
+
+    IN, OUT = 1, 3
+    IRQ_RISING = 1
+
+    def __init__(self, number=None, value=0):
+        self.number = number
+        self.state = value
+        self.handler = None
+
+    def value(self, v=None):
+        if v is None:
+            return self.state
+        self.state = v
+
+    def on(self):
+        self.state = 1
+
+    def off(self):
+        self.state = 0
+
+    def irq(self, handler=None, trigger=None):
+        self.handler = handler
+
+    def fire(self):
+        if self.handler is not None:
+            self.handler(self)
+
+
+class SimADC:
+    """machine.ADC stand-in: a true level plus Gaussian noise and occasional full-scale spikes"""
+
+    def __init__(self, level, sigma=0.0, spike_rate=0.0, seed=0):
+        self.level = level
+        self.sigma = sigma
+        self.spike_rate = spike_rate
+        self.rng = random.Random(seed)
+
+    def read(self):
+        if self.rng.random() < self.spike_rate:
+            return 4095
+        return min(4095, max(0, int(self.rng.gauss(self.level, self.sigma))))
+
+
+class SimTimer:
+    """machine.Timer stand-in; nothing runs on its own, call fire() to deliver one period"""
+
+    def __init__(self, period_ms, callback):
+        self.period_ms = period_ms
+        self.callback = callback
+
+    def fire(self):
+        self.callback(self)
+
+    def deinit(self):
+        self.callback = lambda timer: None
+
+
+class SimLoRa:
+    """SX127x-like radio: one receive buffer that a new packet overwrites if unread, sent packets are kept"""
+
+    def __init__(self, irq_pin=None):
+        self.irq_pin = irq_pin
+        self.buffer = None
+        self.lock = threading.Lock()
+        self.overwritten = 0
+        self.sent = []
+
+    def deliver(self, packet):
+        """A packet arrives over the air (raises the DIO0 interrupt)"""
+        with self.lock:
+            if self.buffer is not None:
+                self.overwritten += 1
+            self.buffer = packet
+        if self.irq_pin is not None:
+            self.irq_pin.fire()
+
+    def receive(self):
+        with self.lock:
+            packet, self.buffer = self.buffer, None
+        return packet
+
+    def send(self, packet):
+        self.sent.append(packet.encode() if isinstance(packet, str) else bytes(packet))
+
+
+class SimBackend:
+    """hal backend that simulates every device on the host.
+
+    Serial ports are served by an esp32_sim.SimulatedESP32 on a
+    pseudo-terminal; with a sim_fleet.SimulatedFleet the gateway reports
+    the fleet's stumps and scripted readings, and REACTIVATE reaches the
+    fleet.  Every port opened is a separate gateway, so a GatewayPool gets
+    one per shard.  Pins are shared per number, so a test can read an
+    output or fire an input interrupt.  ADC levels are given per pin
+    number (ADC counts).
+    """
+
+    def __init__(self, fleet=None, adc_levels=None, adc_sigma=40.0, sink=None, seed=0):
+        self.fleet = fleet
+        self.adc_levels = adc_levels or {}
+        self.adc_sigma = adc_sigma
+        self.sink = sink
+        self.seed = seed
+        self.pins = {}
+        self.gateways = []
+        self.radios = []
+        self.timers = []
+
+    def open_serial(self, port, baud_rate=115200, timeout=1):
+        import serial
+        from esp32_sim import SimulatedESP32
+        gateway = SimulatedESP32(stumps=None if self.fleet is None else self.fleet.names)
+        if self.fleet is not None:
+            gateway.readings = self.fleet.readings  # The gateway reports whatever the fleet script says
+            gateway.reactivate = self.fleet.reactivate
+        self.gateways.append(gateway.start())
+        return serial.Serial(gateway.port, baud_rate, timeout=timeout)
+
+    def close(self):
+        """Stops every simulated gateway"""
+        for gateway in self.gateways:
+            gateway.stop()
+        self.gateways = []
+
+    def pin(self, number, mode="in"):
+        if number not in self.pins:
+            self.pins[number] = SimPin(number, value=1 if mode == "in" else 0)  # Inputs idle high (beam intact)
+        return self.pins[number]
+
+    def adc(self, number):
+        return SimADC(self.adc_levels.get(number, 1700), self.adc_sigma, seed=self.seed + number)
+
+    def spi(self, bus):
+        return bus
+
+    def periodic(self, number, period_ms, callback):
+        timer = SimTimer(period_ms, callback)
+        self.timers.append(timer)
+        return timer
+
+    def lora(self, spi, cs, reset, irq):
+        radio = SimLoRa(irq)
+        self.radios.append(radio)
+        return radio
+
+    def sound_sink(self, **kwargs):
+        return PrintSink() if self.sink is None else self.sink
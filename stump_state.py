@@ -0,0 +1,195 @@
+import struct
+from array import array
+
+from lora_uplink import STATE_CODES, STATES
+
+ACTIVE, OFF, DESTROYED = range(3)  # Same 2-bit codes as the LoRa status bitmap
+ALARM_BIT = 4  # Set on top of the state code in delta records
+ABSENT = 0xFFFFFFFF
+
+
+class SlotSet:
+    """Set of slot numbers with O(1) add/remove/contains and O(size) iteration.
+
+    Members live densely in `items`; `position` maps a slot to its index
+    there (ABSENT if not a member), so removal swaps the last member in.
+    """
+
+    def __init__(self, capacity):
+        self.items = array("I")
+        self.position = array("I", [ABSENT] * capacity)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, slot):
+        return self.position[slot] != ABSENT
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, slot):
+        if self.position[slot] == ABSENT:
+            self.position[slot] = len(self.items)
+            self.items.append(slot)
+
+    def discard(self, slot):
+        i = self.position[slot]
+        if i != ABSENT:
+            last = self.items.pop()
+            if last != slot:
+                self.items[i] = last
+                self.position[last] = i
+            self.position[slot] = ABSENT
+
+
+class StumpStateTable:
+    """Every stump's state (active/off/destroyed) and alarm flag in one compact table.
+
+    States are a bytearray of small-int codes, with one SlotSet per state
+    and one for alarming stumps. Counts and member iteration are
+    O(1) and O(members) and never scan the table. Changes are tracked in a
+    dirty set, so sync messages are a full 2-bit snapshot (the LoRa bitmap
+    layout plus an alarm bitset) or a delta of just the changed stumps;
+    lora_uplink.LoRaUplink builds its status reports from that delta.
+    Reads like a dict of state strings, so `table[stump]` and
+    `table[stump] = "off"` work where a dict was used before.
+    """
+
+    def __init__(self, stumps):
+        self.names = list(stumps)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        count = len(self.names)
+        self.codes = bytearray(count)  # All ACTIVE
+        self.members = [SlotSet(count) for _ in STATES]
+        for slot in range(count):
+            self.members[ACTIVE].add(slot)
+        self.alarming = SlotSet(count)
+        self.dirty = SlotSet(count)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, stump):
+        return stump in self.index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def keys(self):
+        return self.names
+
+    def __getitem__(self, stump):
+        return STATES[self.codes[self.index[stump]]]
+
+    def __setitem__(self, stump, state):
+        self.set_state(stump, state)
+
+    def get(self, stump, default=None):
+        slot = self.index.get(stump)
+        return default if slot is None else STATES[self.codes[slot]]
+
+    def items(self):
+        return ((name, STATES[code]) for name, code in zip(self.names, self.codes))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def set_state(self, stump, state):
+        """Moves a stump to `state`; returns False if it was already there"""
+        slot = self.index[stump]
+        code = STATE_CODES[state]
+        old = self.codes[slot]
+        if old == code:
+            return False
+        self.members[old].discard(slot)
+        self.members[code].add(slot)
+        self.codes[slot] = code
+        self.dirty.add(slot)
+        return True
+
+    def is_active(self, stump):
+        return self.codes[self.index[stump]] == ACTIVE
+
+    def count(self, state="active"):
+        return len(self.members[STATE_CODES[state]])
+
+    def stumps_in(self, state="active", ordered=False):
+        """Names of the stumps in `state`; ordered=True lists them in table order"""
+        slots = self.members[STATE_CODES[state]]
+        if ordered:
+            slots = sorted(slots)
+        return [self.names[slot] for slot in slots]
+
+    def set_alarm(self, stump, on=True):
+        """Sets or clears a stump's alarm flag; returns False if it was unchanged"""
+        slot = self.index[stump]
+        if (slot in self.alarming) == on:
+            return False
+        if on:
+            self.alarming.add(slot)
+        else:
+            self.alarming.discard(slot)
+        self.dirty.add(slot)
+        return True
+
+    def is_alarming(self, stump):
+        return self.index[stump] in self.alarming
+
+    def alarm_count(self):
+        return len(self.alarming)
+
+    def alarming_stumps(self):
+        return [self.names[slot] for slot in self.alarming]
+
+    def snapshot(self):
+        """Full state: count, 2 bits per stump in table order, then one alarm bit per stump"""
+        count = len(self.names)
+        states = bytearray((count + 3) // 4)
+        for code in (OFF, DESTROYED):  # ACTIVE is code 0, already in place
+            for slot in self.members[code]:
+                states[slot >> 2] |= code << ((slot & 3) << 1)
+        alarms = bytearray((count + 7) // 8)
+        for slot in self.alarming:
+            alarms[slot >> 3] |= 1 << (slot & 7)
+        return struct.pack("<I", count) + states + alarms
+
+    def delta(self):
+        """Changed stumps since they were last acknowledged: count, then (slot, code | alarm bit) records"""
+        records = bytearray(struct.pack("<I", len(self.dirty)))
+        for slot in self.dirty:
+            records += struct.pack("<IB", slot, self.codes[slot] | (ALARM_BIT if slot in self.alarming else 0))
+        return bytes(records)
+
+    def acknowledge(self, delta):
+        """The peer applied `delta`; stumps that have not changed again since are no longer dirty"""
+        for slot, value in self.records(delta):
+            if self.codes[slot] | (ALARM_BIT if slot in self.alarming else 0) == value:
+                self.dirty.discard(slot)
+
+    def apply_snapshot(self, data):
+        """Replaces every state and alarm flag with a snapshot from the peer"""
+        count = struct.unpack_from("<I", data, 0)[0]
+        states = 4
+        alarms = states + (count + 3) // 4
+        for slot in range(min(count, len(self.names))):
+            self._apply(slot, (data[states + (slot >> 2)] >> ((slot & 3) << 1)) & 3,
+                        (data[alarms + (slot >> 3)] >> (slot & 7)) & 1)
+
+    def apply_delta(self, data):
+        """Applies a delta from the peer"""
+        for slot, value in self.records(data):
+            self._apply(slot, value & 3, value & ALARM_BIT)
+
+    def _apply(self, slot, code, alarm):
+        name = self.names[slot]
+        self.set_state(name, STATES[code])
+        self.set_alarm(name, bool(alarm))
+        self.dirty.discard(slot)  # Came from the peer, nothing to send back
+
+    @staticmethod
+    def records(delta):
+        """(slot, code | alarm bit) pairs of a delta"""
+        n = struct.unpack_from("<I", delta, 0)[0]
+        for i in range(n):
+            yield struct.unpack_from("<IB", delta, 4 + 5 * i)
@@ -0,0 +1,103 @@
+import socket
+import threading
+import time
+
+from wifi_uplink import ACK, FRAME_HEADER, HELLO, newer
+
+ACK_EVERY = 64  # Frames between acknowledgements while the reader is behind
+
+
+class SimulatedBaseServer:
+    """Local TCP stand-in for the base-camp server.
+
+    Decodes length-prefixed frames into `received` as (arrival time, payload),
+    skipping sequence numbers it already holds for the session, and sends
+    back the latest sequence number after every read (and every ACK_EVERY
+    frames while `frame_delay` holds the reader back).
+
+    stop() drops the listener and every connection, like the server going
+    away; start() brings it back on the same port.  `frame_delay` slows the
+    reader down to exercise back-pressure.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, frame_delay=0.0):
+        self.host = host
+        self.port = port
+        self.frame_delay = frame_delay
+        self.received = []
+        self.latest = {}  # Session id -> highest sequence number received
+        self.listener = None
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.port = self.listener.getsockname()[1]
+        self.listener.listen()
+        threading.Thread(target=self._accept, args=(self.listener,), daemon=True).start()
+        return self
+
+    def stop(self):
+        try:
+            self.listener.shutdown(socket.SHUT_RDWR)  # Wakes the blocked accept() so the port really closes
+        except OSError:
+            pass
+        self.listener.close()
+        with self.lock:
+            for conn in self.connections:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                conn.close()
+            self.connections = []
+
+    def _accept(self, listener):
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with self.lock:
+                self.connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        """Reads whatever has arrived and decodes every whole frame in it, acknowledging after each read"""
+        buffer, session, unacked = bytearray(), None, 0
+        try:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                buffer += data
+                if session is None:
+                    if len(buffer) < HELLO.size:
+                        continue
+                    session = HELLO.unpack_from(buffer)[0]
+                    del buffer[:HELLO.size]
+                offset = 0
+                while len(buffer) - offset >= FRAME_HEADER.size:
+                    seq, size = FRAME_HEADER.unpack_from(buffer, offset)
+                    end = offset + FRAME_HEADER.size + size
+                    if end > len(buffer):
+                        break
+                    latest = self.latest.get(session)
+                    if latest is None or newer(seq, latest):
+                        self.latest[session] = seq
+                        self.received.append((time.perf_counter(), bytes(buffer[offset + FRAME_HEADER.size:end])))
+                    offset = end
+                    unacked += 1
+                    if self.frame_delay:
+                        time.sleep(self.frame_delay)
+                        if unacked >= ACK_EVERY:
+                            conn.sendall(ACK.pack(self.latest[session]))
+                            unacked = 0
+                del buffer[:offset]
+                if unacked:
+                    conn.sendall(ACK.pack(self.latest[session]))
+                    unacked = 0
+        except OSError:
+            return
@@ -0,0 +1,209 @@
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+HELLO = struct.Struct(">I")  # Session id, first thing on every connection
+FRAME_HEADER = struct.Struct(">II")  # Big-endian sequence number and payload length before every message
+ACK = struct.Struct(">I")  # Highest sequence number the server holds for the session
+ACK_POLL = 0.05  # Seconds between checks for acknowledgements while idle
+
+
+def frame(seq, payload):
+    return FRAME_HEADER.pack(seq, len(payload)) + payload
+
+
+def newer(seq, than):
+    """Sequence number comparison that survives the 32-bit wrap"""
+    return 0 < (seq - than) & 0xFFFFFFFF < 0x80000000
+
+
+class WifiUplink:
+    """Background Wi-Fi uplink to the base-camp server.
+
+    Messages are queued without blocking the caller, sent length-prefixed
+    and batched (everything queued goes out in one sendall), and the link
+    reconnects with exponential backoff after any failure.  A message only
+    counts as sent once the server acknowledges its sequence number; until
+    then it is kept, and after a reconnect it goes out again (the server
+    discards sequence numbers it already holds for the session).  When the queue
+    is full the drop policy decides: "drop_oldest" (latest status wins),
+    "drop_newest", or "block" (back-pressure the caller up to `put_timeout`).
+    The worker thread and the connection are only created on first use.
+    """
+
+    def __init__(self, host, port, max_queue=256, batch_max=64, drop_policy="drop_oldest", put_timeout=1.0,
+                 connect_timeout=2.0, backoff_initial=0.5, backoff_max=30.0):
+        if drop_policy not in ("drop_oldest", "drop_newest", "block"):
+            raise ValueError(f"Unknown drop policy {drop_policy!r}")
+        self.address = (host, port)
+        self.max_queue = max_queue
+        self.batch_max = batch_max
+        self.drop_policy = drop_policy
+        self.put_timeout = put_timeout
+        self.connect_timeout = connect_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self.queue = deque()  # (sequence number, payload)
+        self.unacked = deque()  # Written but not yet acknowledged, oldest first
+        self.session = random.getrandbits(32)
+        self.seq = 0
+        self.acks = bytearray()
+        self.cond = threading.Condition()
+        self.stopping = threading.Event()  # Cuts reconnect backoff short; only close() sets it, not new messages
+        self.sock = None
+        self.worker = None
+        self.running = False
+        self.inflight = 0  # Messages taken off the queue but not yet written
+        self.sent = self.dropped = self.connects = 0  # sent: acknowledged by the server
+
+    @property
+    def connected(self):
+        return self.sock is not None
+
+    def send(self, payload):
+        """Queues one message; returns False if it was dropped by the queue policy"""
+        with self.cond:
+            if self.worker is None:
+                self._start()
+            if len(self.queue) >= self.max_queue:
+                if self.drop_policy == "drop_oldest":
+                    self.queue.popleft()
+                    self.dropped += 1
+                elif self.drop_policy == "block":
+                    deadline = time.monotonic() + self.put_timeout
+                    while len(self.queue) >= self.max_queue and self.running:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(remaining)
+                if len(self.queue) >= self.max_queue:
+                    self.dropped += 1
+                    return False
+            self.seq = (self.seq + 1) & 0xFFFFFFFF
+            self.queue.append((self.seq, payload))
+            self.cond.notify_all()
+        return True
+
+    def _start(self):
+        self.running = True
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def close(self, flush_timeout=2.0):
+        """Stops the uplink, giving queued messages up to `flush_timeout` seconds to be acknowledged.
+
+        Whatever is still unacknowledged after that is counted as dropped.
+        """
+        deadline = time.monotonic() + flush_timeout
+        with self.cond:
+            while (self.queue or self.inflight or self.unacked) and time.monotonic() < deadline:
+                self.cond.wait(deadline - time.monotonic())
+            self.running = False
+            self.cond.notify_all()
+        self.stopping.set()
+        if self.worker is not None:
+            self.worker.join()
+
+    def _connect(self):
+        backoff = self.backoff_initial
+        while self.running:
+            sock = None
+            try:
+                sock = socket.create_connection(self.address, timeout=self.connect_timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.sendall(HELLO.pack(self.session))
+                print(f"Connected to server at {self.address[0]}:{self.address[1]} (Wi-Fi Standby Mode Activated)")
+                return sock
+            except OSError as e:
+                if sock is not None:
+                    sock.close()
+                print(f"Wi-Fi Connection Failed: {e}; retrying in {backoff:.1f}s")
+                self.stopping.wait(backoff * random.uniform(0.8, 1.2))
+                backoff = min(backoff * 2, self.backoff_max)
+        return None
+
+    def _next_batch(self):
+        with self.cond:
+            while self.running and not self.queue:
+                if self.unacked:
+                    self.cond.wait(ACK_POLL)  # Wake up now and then to read acknowledgements
+                    break
+                self.cond.wait()
+            batch = [self.queue.popleft() for _ in range(min(len(self.queue), self.batch_max))]
+            self.inflight = len(batch)
+            self.cond.notify_all()  # Room for blocked senders
+        return batch
+
+    def _run(self):
+        while self.running:
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+            elif self.sock is not None:
+                self._read_acks()
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        with self.cond:
+            self.dropped += len(self.queue) + len(self.unacked)  # Never acknowledged
+            self.queue.clear()
+            self.unacked.clear()
+            self.cond.notify_all()
+
+    def _deliver(self, batch):
+        """Writes one batch, connecting first if needed; on failure it goes back on the queue"""
+        if self.sock is None:
+            self.sock = self._connect()
+            if self.sock is None:  # Stopping
+                with self.cond:
+                    self.queue.extendleft(reversed(batch))
+                    self.inflight = 0
+                return
+            self.connects += 1
+        with self.cond:
+            self.unacked.extend(batch)
+            self.inflight = 0
+        try:
+            self.sock.sendall(b"".join(frame(seq, payload) for seq, payload in batch))
+        except OSError as e:
+            print(f"Wi-Fi Send Failed: {e}; reconnecting")
+            self._disconnect()
+            return
+        self._read_acks()
+
+    def _read_acks(self):
+        """Counts every message up to the server's latest acknowledgement as sent"""
+        try:
+            while select.select([self.sock], [], [], 0)[0]:
+                data = self.sock.recv(4096)
+                if not data:
+                    raise OSError("connection closed by server")
+                self.acks += data
+        except OSError as e:
+            print(f"Wi-Fi Receive Failed: {e}; reconnecting")
+            self._disconnect()
+            return
+        count = len(self.acks) // ACK.size
+        if not count:
+            return
+        acked = ACK.unpack_from(self.acks, (count - 1) * ACK.size)[0]
+        del self.acks[:count * ACK.size]
+        with self.cond:
+            while self.unacked and not newer(self.unacked[0][0], acked):
+                self.unacked.popleft()
+                self.sent += 1
+            self.cond.notify_all()
+
+    def _disconnect(self):
+        """Drops the connection; everything it never acknowledged goes back to the front of the queue"""
+        self.sock.close()
+        self.sock = None
+        self.acks.clear()
+        with self.cond:
+            self.queue.extendleft(reversed(self.unacked))
+            self.unacked.clear()